@@ -1,5 +1,6 @@
 import asyncio
 import json
+import os
 from typing import Dict, List, Any
 from mcp.server.models import InitializationOptions
 from mcp.server import NotificationOptions, Server
@@ -7,6 +8,8 @@ from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 import logging
 
+from registry_store import RegistrySource
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ai_registry_mcp")
@@ -50,6 +53,13 @@ AI_REGISTRY = [
     }
 ]
 
+# Registry data file (see registry_store.py); the sample entries above are served without one
+AI_REGISTRY_PATH = os.getenv("AI_REGISTRY_PATH")
+AI_REGISTRY_RELOAD_INTERVAL = float(os.getenv("AI_REGISTRY_RELOAD_INTERVAL", "5"))
+
+# Current entries and search index, swapped in whole when the file changes
+registry = RegistrySource(AI_REGISTRY_PATH, fallback=AI_REGISTRY)
+
 # Create MCP server
 server = Server("ai-registry")
 
@@ -107,28 +117,16 @@ async def handle_list_tools() -> List[Tool]:
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Handle tool execution."""
+    # One registry version for the whole call, even if a reload lands meanwhile
+    registry_index = (await registry.snapshot()).index
     
     if name == "search_use_cases":
-        query = arguments.get("query", "").lower()
-        category = arguments.get("category", "").lower()
+        query = arguments.get("query", "")
+        category = arguments.get("category", "")
         limit = arguments.get("limit", 10)
         
-        results = []
-        for item in AI_REGISTRY:
-            # Check if query matches
-            if query and not any(query in field.lower() for field in [
-                item["company"], item["use_case"], item["implementation"], 
-                item["category"], " ".join(item["tags"])
-            ]):
-                continue
-            
-            # Check if category matches
-            if category and category not in item["category"].lower():
-                continue
-            
-            results.append(item)
-            
-        results = results[:limit]
+        # Ranked by relevance, best match first
+        results = registry_index.search(query, category, limit)
         
         return [TextContent(
             type="text",
@@ -144,7 +142,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
         )]
     
     elif name == "get_categories":
-        categories = sorted(set(item["category"] for item in AI_REGISTRY))
+        categories = registry_index.categories()
         return [TextContent(
             type="text",
             text=f"Available AI use case categories:\n\n" + "\n".join(f"- {cat}" for cat in categories)
@@ -152,7 +150,7 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
     
     elif name == "analyze_implementation":
         company = arguments.get("company", "")
-        item = next((i for i in AI_REGISTRY if i["company"].lower() == company.lower()), None)
+        item = registry_index.find_company(company)
         
         if not item:
             return [TextContent(
@@ -180,41 +178,200 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextCon
             text=f"Unknown tool: {name}"
         )]
 
-# Add health check endpoint for HTTP mode
-from fastapi import FastAPI
+# HTTP transport: health check plus MCP JSON-RPC over HTTP, served next to stdio
+import time
+import typing
+import uuid
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 import uvicorn
-import threading
+from mcp import types
+
+# "stdio" serves MCP on stdin/stdout and HTTP_PORT; "http" serves HTTP only
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+# Set to 0 when the server runs as a gateway-managed stdio subprocess
+HTTP_PORT = int(os.getenv("HTTP_PORT", "8000"))
+HTTP_KEEP_ALIVE = int(os.getenv("HTTP_KEEP_ALIVE", "75"))  # seconds an idle connection stays open
+MCP_SESSION_TTL = float(os.getenv("MCP_SESSION_TTL", "1800"))  # seconds an idle session is kept
+
+SESSION_HEADER = "Mcp-Session-Id"
+
+# Session id -> last request time
+sessions: Dict[str, float] = {}
 
 app = FastAPI()
 
+def initialization_options() -> InitializationOptions:
+    return InitializationOptions(
+        server_name="ai-registry",
+        server_version="1.0.0",
+        capabilities=server.get_capabilities(
+            notification_options=NotificationOptions(),
+            experimental_capabilities={}
+        )
+    )
+
+def request_types() -> Dict[str, Any]:
+    """JSON-RPC method name -> request model, for every request the server handles."""
+    return {
+        typing.get_args(request_type.model_fields["method"].annotation)[0]: request_type
+        for request_type in server.request_handlers
+    }
+
+def rpc_error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+async def handle_rpc(message: Any) -> Any:
+    """Answer one JSON-RPC message with the same handlers as the stdio transport."""
+    if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" or not isinstance(message.get("method"), str):
+        return rpc_error(None, -32600, "Invalid Request")
+    if "id" not in message:
+        # Notifications (e.g. notifications/initialized) need no answer
+        return None
+    request_id = message["id"]
+    
+    if message["method"] == "initialize":
+        options = initialization_options()
+        requested = (message.get("params") or {}).get("protocolVersion")
+        result = types.InitializeResult(
+            protocolVersion=requested if requested in ("2024-11-05", types.LATEST_PROTOCOL_VERSION) else types.LATEST_PROTOCOL_VERSION,
+            capabilities=options.capabilities,
+            serverInfo=types.Implementation(name=options.server_name, version=options.server_version)
+        )
+        return {"jsonrpc": "2.0", "id": request_id, "result": result.model_dump(by_alias=True, mode="json", exclude_none=True)}
+    
+    request_type = request_types().get(message["method"])
+    if request_type is None:
+        return rpc_error(request_id, -32601, f"Method not found: {message['method']}")
+    try:
+        request = request_type.model_validate({"method": message["method"], "params": message.get("params")})
+    except ValueError:
+        return rpc_error(request_id, -32602, f"Invalid params for {message['method']}")
+    try:
+        result = await server.request_handlers[request_type](request)
+    except Exception as e:
+        logger.error(f"Error handling {message['method']}: {e}")
+        return rpc_error(request_id, -32603, str(e))
+    return {"jsonrpc": "2.0", "id": request_id, "result": result.model_dump(by_alias=True, mode="json", exclude_none=True)}
+
+@app.post("/")
+@app.post("/mcp")
+async def mcp_http(request: Request):
+    """
+    MCP over HTTP: one JSON-RPC request, notification or batch per POST.
+    
+    Requests from all connections run concurrently, as do the requests of
+    a batch. ``initialize`` opens a session whose id is returned in the
+    Mcp-Session-Id header; requests without that header are served
+    statelessly, as the gateway sends them.
+    """
+    session_id = request.headers.get(SESSION_HEADER)
+    if session_id is not None:
+        if session_id not in sessions:
+            return JSONResponse(rpc_error(None, -32001, "Session not found"), status_code=404)
+        sessions[session_id] = time.monotonic()
+    
+    try:
+        body = json.loads(await request.body())
+    except ValueError:
+        return JSONResponse(rpc_error(None, -32700, "Parse error"), status_code=400)
+    
+    if isinstance(body, list):
+        if not body:
+            return JSONResponse(rpc_error(None, -32600, "Invalid Request"), status_code=400)
+        responses = [r for r in await asyncio.gather(*(handle_rpc(m) for m in body)) if r is not None]
+    else:
+        response = await handle_rpc(body)
+        responses = response
+    
+    headers = {}
+    if isinstance(body, dict) and body.get("method") == "initialize" and isinstance(responses, dict) and "result" in responses:
+        # Forget sessions that went quiet
+        now = time.monotonic()
+        for stale in [sid for sid, seen in sessions.items() if now - seen > MCP_SESSION_TTL]:
+            del sessions[stale]
+        session_id = uuid.uuid4().hex
+        sessions[session_id] = now
+        headers[SESSION_HEADER] = session_id
+    
+    if not responses:
+        # Only notifications
+        return Response(status_code=202, headers=headers)
+    return JSONResponse(responses, headers=headers)
+
+@app.delete("/mcp")
+async def end_mcp_session(request: Request):
+    """End the session named in the Mcp-Session-Id header."""
+    if sessions.pop(request.headers.get(SESSION_HEADER, ""), None) is None:
+        return Response(status_code=404)
+    return Response(status_code=204)
+
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "server": "ai-registry"}
+    current = registry.current
+    return {
+        "status": "healthy" if current else "loading",
+        "server": "ai-registry",
+        "entries": len(current.index) if current else 0,
+        "reloads": registry.reloads,
+        "sessions": len(sessions)
+    }
 
-def run_http_server():
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+def _log_load_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Loading the AI registry failed: {task.exception()!r}")
 
 async def main():
     """Run the MCP server."""
-    # Start HTTP health check in background
-    http_thread = threading.Thread(target=run_http_server, daemon=True)
-    http_thread.start()
+    # Load the registry in the background so the server answers right away;
+    # tool calls wait for the first load
+    loader = asyncio.create_task(registry.load())
+    loader.add_done_callback(_log_load_failure)
+    watcher = asyncio.create_task(registry.watch(AI_REGISTRY_RELOAD_INTERVAL))
+    http_task = None
     
-    # Run MCP server
-    logger.info("Starting AI Registry MCP Server...")
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="ai-registry",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={}
-                )
+    try:
+        # HTTP runs on this event loop, next to stdio, so both share the registry
+        http_server = None
+        if HTTP_PORT:
+            http_server = uvicorn.Server(uvicorn.Config(
+                app,
+                host="0.0.0.0",
+                port=HTTP_PORT,
+                log_level="info",
+                timeout_keep_alive=HTTP_KEEP_ALIVE,
+                # Access logs go to stdout, which belongs to the stdio transport
+                access_log=MCP_TRANSPORT == "http"
+            ))
+        
+        if MCP_TRANSPORT == "http":
+            if http_server is None:
+                raise SystemExit("MCP_TRANSPORT=http needs a nonzero HTTP_PORT")
+            logger.info(f"Starting AI Registry MCP Server on HTTP port {HTTP_PORT}...")
+            await http_server.serve()
+            return
+        
+        if http_server is not None:
+            http_task = asyncio.create_task(http_server.serve())
+        
+        # Run MCP server
+        logger.info("Starting AI Registry MCP Server...")
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                initialization_options()
             )
-        )
+        
+        # stdin closed: let the HTTP server finish its requests and stop too
+        if http_server is not None:
+            http_server.should_exit = True
+            await http_task
+    finally:
+        tasks = [task for task in (loader, watcher, http_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,215 @@
+"""
+Client-side load balancing across the replicas of a service.
+
+A service's replicas are taken from, in order: an ``endpoints`` list
+provided by the discovery registry, ``capabilities.api.replicas`` in its
+manifest, or every address its name resolves to (how ``docker compose
+--scale`` exposes replicas). Requests go to the replica with the fewest
+outstanding requests, either among all replicas (``least_outstanding``)
+or among two picked at random (``p2c``, the default), weighted by recent
+failures. Replicas whose circuit breaker is open are skipped, and a
+session key pins a client to one replica via rendezvous hashing, which
+moves as few sessions as possible when replicas change.
+
+Manifest settings:
+
+    capabilities:
+      api:
+        replicas: ["app-1:8000", "app-2:8000"]
+        load_balancing:
+          policy: p2c            # or least_outstanding
+          affinity: true         # honour the session affinity header
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import socket
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import httpx
+
+from circuit import CLOSED, OPEN, BreakerSet, CircuitBreaker, CircuitOpenError
+from upstream import origin
+
+logger = logging.getLogger("enhanced_gateway.balancer")
+
+P2C = "p2c"
+LEAST_OUTSTANDING = "least_outstanding"
+
+
+class Endpoint:
+    """One replica of a service."""
+
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url
+        self.breaker = breaker
+        self.outstanding = 0
+        self.requests = 0
+
+    def load(self) -> float:
+        # Each recent failure makes the replica count as that much busier
+        return (self.outstanding + 1) * (1 + self.breaker.failures_in_a_row)
+
+    def started(self) -> None:
+        self.outstanding += 1
+        self.requests += 1
+
+    def finished(self) -> None:
+        self.outstanding -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "circuit": self.breaker.stats(),
+        }
+
+
+def _api_settings(service: Any) -> Dict[str, Any]:
+    capabilities = getattr(service, "capabilities", None) or {}
+    return capabilities.get("api", {}) or {}
+
+
+def _as_url(address: str) -> str:
+    return (address if "://" in address else f"http://{address}").rstrip("/")
+
+
+def _breaker_key(url: str) -> str:
+    # The key UpstreamPool records responses under, e.g. http://svc:80 -> http://svc
+    return origin(httpx.URL(url))
+
+
+class ServiceBalancer:
+    """Replica sets of all services and the request routing between them."""
+
+    def __init__(self, breakers: BreakerSet):
+        self.breakers = breakers
+        self._endpoints: Dict[str, List[Endpoint]] = {}
+
+    async def _discover(self, service: Any) -> List[str]:
+        explicit = getattr(service, "endpoints", None) or _api_settings(service).get("replicas")
+        if explicit:
+            return [_as_url(address) for address in explicit]
+
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                service.name, service.api_port, type=socket.SOCK_STREAM
+            )
+        except OSError:
+            infos = []
+        addresses = sorted({info[4][0] for info in infos})
+        if len(addresses) <= 1:
+            # A single replica is addressed by name, keeping the Host header meaningful
+            return [f"http://{service.name}:{service.api_port}"]
+        return [
+            f"http://[{address}]:{service.api_port}" if ":" in address else f"http://{address}:{service.api_port}"
+            for address in addresses
+        ]
+
+    def _set_endpoints(self, name: str, urls: List[str]) -> List[Endpoint]:
+        current = {endpoint.url: endpoint for endpoint in self._endpoints.get(name, [])}
+        endpoints = [current.get(url) or Endpoint(url, self.breakers.get(_breaker_key(url))) for url in urls]
+        self._endpoints[name] = endpoints
+        if current and set(current) != set(urls):
+            logger.info(f"Service {name} now has {len(endpoints)} replicas")
+            self._release_breakers(endpoint.breaker.name for endpoint in current.values())
+        return endpoints
+
+    def _release_breakers(self, keys: Iterable[str]) -> None:
+        """Forget the breakers of replicas that no service uses any more."""
+        in_use: Set[str] = {
+            endpoint.breaker.name for endpoints in self._endpoints.values() for endpoint in endpoints
+        }
+        for key in set(keys) - in_use:
+            self.breakers.remove(key)
+
+    async def refresh(self, service: Any) -> List[Endpoint]:
+        """Re-discover a service's replicas, keeping the state of those that remain."""
+        return self._set_endpoints(service.name, await self._discover(service))
+
+    async def sync(self, services: Iterable[Any]) -> None:
+        """Refresh the replicas of every service and forget removed services."""
+        services = list(services)
+        names = {service.name for service in services}
+        for name in list(self._endpoints):
+            if name not in names:
+                removed = self._endpoints.pop(name)
+                self._release_breakers(endpoint.breaker.name for endpoint in removed)
+        await asyncio.gather(*(self.refresh(service) for service in services))
+
+    async def run(self, services: Callable[[], Iterable[Any]], interval: float) -> None:
+        """Follow replica changes every ``interval`` seconds until cancelled."""
+        while True:
+            try:
+                await self.sync(services())
+            except Exception as e:
+                logger.error(f"Replica discovery failed: {e}")
+            await asyncio.sleep(interval)
+
+    def endpoints(self, service: Any) -> List[Endpoint]:
+        endpoints = self._endpoints.get(service.name)
+        if not endpoints:
+            # Not discovered yet; address the service by name
+            endpoints = self._set_endpoints(service.name, [f"http://{service.name}:{service.api_port}"])
+        return endpoints
+
+    def pick(self, service: Any, affinity_key: Optional[str] = None) -> Endpoint:
+        """
+        Choose the replica for one request.
+
+        Raises:
+            CircuitOpenError: If every replica is ejected, without any network call.
+        """
+        endpoints = self.endpoints(service)
+        candidates = [endpoint for endpoint in endpoints if endpoint.breaker.available()]
+        if not candidates:
+            for endpoint in endpoints:
+                endpoint.breaker.rejected += 1
+            retry_after = min(endpoint.breaker.retry_after() for endpoint in endpoints)
+            raise CircuitOpenError(service.name, retry_after)
+
+        policy = _api_settings(service).get("load_balancing") or {}
+        if len(candidates) == 1:
+            chosen = candidates[0]
+        elif affinity_key and policy.get("affinity", True):
+            chosen = max(
+                candidates,
+                key=lambda endpoint: hashlib.blake2b(
+                    f"{affinity_key}|{endpoint.url}".encode(), digest_size=8
+                ).digest(),
+            )
+        elif policy.get("policy", P2C) == LEAST_OUTSTANDING or len(candidates) == 2:
+            # Shuffle first so ties do not always go to the first replica
+            chosen = min(random.sample(candidates, len(candidates)), key=Endpoint.load)
+        else:
+            chosen = min(random.sample(candidates, 2), key=Endpoint.load)
+
+        # Claims the trial call when the replica's breaker is half-open
+        chosen.breaker.allow()
+        return chosen
+
+    def circuit(self, service: Any) -> Dict[str, Any]:
+        """Overall breaker state of a service: open only when every replica is ejected."""
+        endpoints = self.endpoints(service)
+        states = [endpoint.breaker.stats()["state"] for endpoint in endpoints]
+        if all(state == CLOSED for state in states):
+            state = CLOSED
+        elif all(state == OPEN for state in states):
+            state = OPEN
+        else:
+            state = "degraded"
+        return {
+            "state": state,
+            "replicas": [
+                {"url": endpoint.url, **endpoint.breaker.stats()} for endpoint in endpoints
+            ],
+        }
+
+    def stats(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            name: [endpoint.stats() for endpoint in endpoints]
+            for name, endpoints in self._endpoints.items()
+        }
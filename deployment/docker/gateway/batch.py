@@ -0,0 +1,109 @@
+"""
+JSON-RPC batches of MCP tool calls.
+
+A batch is a JSON-RPC 2.0 batch (a list of requests) whose requests are
+``tools/call`` with the target service named in the params:
+
+    [
+      {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+       "params": {"service": "sales", "name": "search", "arguments": {...}, "timeout": 5}},
+      ...
+    ]
+
+Calls run concurrently, up to a limit per batch, each under its own
+timeout. A call that fails produces a JSON-RPC error response for its id
+without affecting the others; notifications (requests without an id) are
+run but get no response.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from stdio_pool import JSONRPCError
+
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+TIMEOUT_ERROR = -32001
+
+ToolDispatch = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def rpc_error(code: int, message: str, data: Any = None) -> JSONRPCError:
+    """Build the exception for a JSON-RPC error response."""
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return JSONRPCError(error)
+
+
+def _validate(call: Any, timeout: float) -> Tuple[Dict[str, Any], float]:
+    if not isinstance(call, dict) or call.get("jsonrpc") != "2.0" or not isinstance(call.get("method"), str):
+        raise rpc_error(INVALID_REQUEST, "Invalid Request")
+    if call["method"] != "tools/call":
+        raise rpc_error(METHOD_NOT_FOUND, f"Method not found: {call['method']}")
+    params = call.get("params")
+    if not isinstance(params, dict) or not isinstance(params.get("service"), str) or not isinstance(params.get("name"), str):
+        raise rpc_error(INVALID_PARAMS, "params must include 'service' and 'name'")
+    if not isinstance(params.get("arguments", {}), dict):
+        raise rpc_error(INVALID_PARAMS, "'arguments' must be an object")
+    try:
+        # A call may shorten its timeout, not extend it
+        call_timeout = min(float(params.get("timeout") or timeout), timeout)
+    except (TypeError, ValueError):
+        raise rpc_error(INVALID_PARAMS, "'timeout' must be a number of seconds")
+    return params, call_timeout
+
+
+async def _run_call(
+    call: Any,
+    dispatch: ToolDispatch,
+    timeout: float,
+    slots: asyncio.Semaphore,
+) -> Optional[Dict[str, Any]]:
+    call_id = call.get("id") if isinstance(call, dict) else None
+    call_timeout = timeout
+    try:
+        params, call_timeout = _validate(call, timeout)
+        async with slots:
+            result = await asyncio.wait_for(dispatch(params), call_timeout)
+        response = {"jsonrpc": "2.0", "id": call_id, "result": result}
+    except JSONRPCError as e:
+        response = {"jsonrpc": "2.0", "id": call_id, "error": e.error}
+    except asyncio.TimeoutError:
+        response = {"jsonrpc": "2.0", "id": call_id, "error": {"code": TIMEOUT_ERROR, "message": f"Timed out after {call_timeout}s"}}
+    except Exception as e:
+        response = {"jsonrpc": "2.0", "id": call_id, "error": {"code": SERVER_ERROR, "message": str(e)}}
+
+    if isinstance(call, dict) and "id" not in call:
+        # Notification: run, but never answer
+        return None
+    return response
+
+
+async def run_batch(
+    calls: List[Any],
+    dispatch: ToolDispatch,
+    timeout: float,
+    concurrency: int,
+) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Run every call and yield ``(position, response)`` as each one completes.
+
+    ``dispatch`` runs one call's params and returns its result, raising
+    ``JSONRPCError`` for an error response. Calls still running when the
+    caller stops iterating are cancelled.
+    """
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(position: int, call: Any) -> Tuple[int, Optional[Dict[str, Any]]]:
+        return position, await _run_call(call, dispatch, timeout, slots)
+
+    tasks = [asyncio.create_task(run(position, call)) for position, call in enumerate(calls)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
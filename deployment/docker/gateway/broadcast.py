@@ -0,0 +1,98 @@
+"""
+Broadcast hub for WebSocket subscribers.
+
+Each message is encoded once and the same text is queued for every
+subscriber. Queues are bounded: a subscriber that falls ``max_queue``
+messages behind is disconnected rather than buffered without limit.
+Since updates are sent as deltas, a dropped client cannot simply skip
+ahead; it reconnects and starts again from a full snapshot.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+logger = logging.getLogger("enhanced_gateway.broadcast")
+
+
+def encode(message: Dict[str, Any]) -> str:
+    """Encode a message as JSON text."""
+    if orjson is not None:
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(message, separators=(",", ":"))
+
+
+class Subscriber:
+    """One connected client's queue of encoded messages."""
+
+    def __init__(self, max_queue: int):
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=max_queue)
+        self.dropped = False
+
+    async def next(self) -> Optional[str]:
+        """Wait for the next message; ``None`` means the subscriber was dropped."""
+        if self.dropped:
+            return None
+        return await self.queue.get()
+
+    def _drop(self) -> None:
+        self.dropped = True
+        # Wake a waiting reader so it notices the drop
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class BroadcastHub:
+    """Fans encoded messages out to every subscriber."""
+
+    def __init__(self, max_queue: int = 64):
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscriber] = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.max_queue)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        """Encode ``message`` once and queue it for every subscriber."""
+        text = encode(message)
+        self.published += 1
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(text)
+            except asyncio.QueueFull:
+                logger.warning("Dropping slow WebSocket subscriber")
+                self.dropped += 1
+                self._subscribers.discard(subscriber)
+                subscriber._drop()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+def health_delta(previous: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Services whose status changed or that appeared, and those that disappeared."""
+    changed = {
+        name: result
+        for name, result in current.items()
+        if previous.get(name, {}).get("status") != result.get("status")
+    }
+    removed = [name for name in previous if name not in current]
+    return {"changed": changed, "removed": removed}
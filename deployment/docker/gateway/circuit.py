@@ -0,0 +1,186 @@
+"""
+Circuit breakers for upstream services.
+
+Each service endpoint (replica) gets a breaker that watches its recent
+calls. The breaker opens, ejecting the endpoint, when either the error
+rate over a rolling window or the number of consecutive failures
+crosses a threshold. After the open period one trial call is let
+through (half-open): success closes the breaker, failure opens it again
+for twice as long, up to a maximum, so an endpoint that stays down is
+ejected for longer and longer.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose endpoints are all ejected."""
+
+    def __init__(self, service: str, retry_after: float):
+        super().__init__(f"Circuit for {service} is open")
+        self.service = service
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Breaker for one endpoint.
+
+    Outcomes are counted in one-second buckets covering ``window``
+    seconds. The error-rate rule only applies once the window holds at
+    least ``min_requests`` calls.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: float = 30.0,
+        min_requests: int = 20,
+        error_rate: float = 0.5,
+        consecutive_failures: int = 5,
+        open_seconds: float = 10.0,
+        max_open_seconds: float = 300.0,
+    ):
+        self.name = name
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.consecutive_failures = consecutive_failures
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = CLOSED
+        self.failures_in_a_row = 0
+        self.ejections = 0
+        self.rejected = 0
+        self._open_until = 0.0
+        self._trial_started = 0.0
+        # [second, successes, failures]
+        self._buckets: Deque[List[int]] = deque()
+
+    def _bucket(self, now: float) -> List[int]:
+        second = int(now)
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+        while self._buckets and self._buckets[0][0] <= second - self.window:
+            self._buckets.popleft()
+        return self._buckets[-1]
+
+    def _window_counts(self, now: float):
+        cutoff = int(now) - self.window
+        successes = failures = 0
+        for second, ok, failed in self._buckets:
+            if second > cutoff:
+                successes += ok
+                failures += failed
+        return successes, failures
+
+    def allow(self) -> bool:
+        """Check whether a call may go ahead, moving to half-open when the open period is over."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN and now >= self._open_until:
+            self.state = HALF_OPEN
+            self._trial_started = 0.0
+        if self.state == HALF_OPEN:
+            # One trial call at a time; a trial that never reported back is replaced
+            if not self._trial_started or now - self._trial_started > self.open_seconds:
+                self._trial_started = now
+                return True
+        self.rejected += 1
+        return False
+
+    def available(self) -> bool:
+        """Check, without claiming a half-open trial, whether ``allow`` would admit a call."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            return now >= self._open_until
+        return not self._trial_started or now - self._trial_started > self.open_seconds
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a call may go ahead."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def retry_after(self) -> float:
+        return max(0.0, self._open_until - time.monotonic())
+
+    def record_success(self) -> None:
+        if self.state == OPEN:
+            return
+        self._bucket(time.monotonic())[1] += 1
+        self.failures_in_a_row = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.ejections = 0
+            self._buckets.clear()
+
+    def record_failure(self) -> None:
+        if self.state == OPEN:
+            return
+        now = time.monotonic()
+        self._bucket(now)[2] += 1
+        self.failures_in_a_row += 1
+        if self.state == HALF_OPEN:
+            self._open(now)
+            return
+
+        successes, failures = self._window_counts(now)
+        total = successes + failures
+        if self.failures_in_a_row >= self.consecutive_failures or (
+            total >= self.min_requests and failures / total >= self.error_rate
+        ):
+            self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.ejections += 1
+        duration = min(self.open_seconds * 2 ** (self.ejections - 1), self.max_open_seconds)
+        self.state = OPEN
+        self._open_until = now + duration
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        successes, failures = self._window_counts(now)
+        total = successes + failures
+        if self.state == OPEN and now >= self._open_until:
+            state = HALF_OPEN  # the next call will be the trial
+        else:
+            state = self.state
+        return {
+            "state": state,
+            "error_rate": round(failures / total, 3) if total else 0.0,
+            "window_requests": total,
+            "consecutive_failures": self.failures_in_a_row,
+            "ejections": self.ejections,
+            "retry_after": round(self.retry_after(), 1) if state == OPEN else 0.0,
+            "rejected": self.rejected,
+        }
+
+
+class BreakerSet:
+    """Circuit breakers keyed by endpoint URL, created on first use."""
+
+    def __init__(self, **settings: Any):
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **self.settings)
+            self._breakers[name] = breaker
+        return breaker
+
+    def remove(self, name: str) -> None:
+        self._breakers.pop(name, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
@@ -10,31 +10,164 @@ This gateway automatically discovers apps using manifests and provides:
 """
 
 import asyncio
+import json
+import math
 import sys
 import os
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 
 # Add core to Python path
 sys.path.insert(0, '/app')
 
-from fastapi import FastAPI, HTTPException, Request, WebSocket
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 import httpx
 
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library decoder
+    orjson = None
+
 from core.discovery import initialize_service_discovery, get_registry
+# The app's one-pass encoder (src/new_project/core/serialization.py), copied into the image
+from serialization import FastJSONResponse
+from balancer import ServiceBalancer
+from batch import INVALID_PARAMS, METHOD_NOT_FOUND, SERVER_ERROR, rpc_error, run_batch
+from broadcast import BroadcastHub, encode, health_delta
+from circuit import BreakerSet, CircuitOpenError
+from health import HealthMonitor
+from response_cache import CachedResponse, ResponseCache
+from stdio_pool import JSONRPCError, StdioMCPError, StdioMCPPools
+from tool_catalog import ToolCatalog
+from upstream import UpstreamPool, forward_headers
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("enhanced_gateway")
 
+# Tool listing cache (seconds)
+TOOLS_CACHE_TTL = float(os.getenv("TOOLS_CACHE_TTL", "60"))
+TOOLS_STALE_TTL = float(os.getenv("TOOLS_STALE_TTL", "300"))
+TOOLS_DEADLINE = float(os.getenv("TOOLS_DEADLINE", "2"))
+TOOLS_REFRESH_INTERVAL = float(os.getenv("TOOLS_REFRESH_INTERVAL", "30"))
+
+# Background health checks (seconds)
+HEALTH_MIN_INTERVAL = float(os.getenv("HEALTH_MIN_INTERVAL", "5"))
+HEALTH_MAX_INTERVAL = float(os.getenv("HEALTH_MAX_INTERVAL", "60"))
+HEALTH_TIMEOUT = float(os.getenv("HEALTH_TIMEOUT", "5"))
+SERVICE_HEALTH_PATH = os.getenv("SERVICE_HEALTH_PATH", "/health")
+
+# Replica load balancing
+LB_REFRESH_INTERVAL = float(os.getenv("LB_REFRESH_INTERVAL", "15"))  # seconds between replica lookups
+LB_AFFINITY_HEADER = os.getenv("LB_AFFINITY_HEADER", "X-Session-ID")
+
+# /ws/gateway fan-out
+WS_HEARTBEAT_INTERVAL = float(os.getenv("WS_HEARTBEAT_INTERVAL", "30"))
+WS_MAX_QUEUE = int(os.getenv("WS_MAX_QUEUE", "64"))  # messages a client may fall behind
+
+# Proxied GET response cache (0 bytes disables it; no directory keeps it in memory only)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", "")
+RESPONSE_CACHE_DISK_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# /api/v1/tools/batch
+BATCH_MAX_CALLS = int(os.getenv("BATCH_MAX_CALLS", "100"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))  # calls in flight per batch
+BATCH_CALL_TIMEOUT = float(os.getenv("BATCH_CALL_TIMEOUT", "30"))  # seconds, upper bound per call
+
+# Stdio MCP server processes (defaults; the manifest may override per service)
+STDIO_POOL_SIZE = int(os.getenv("STDIO_POOL_SIZE", "2"))
+STDIO_MAX_CONCURRENCY = int(os.getenv("STDIO_MAX_CONCURRENCY", "8"))  # in-flight requests per process
+STDIO_TIMEOUT = float(os.getenv("STDIO_TIMEOUT", "30"))
+
+# Global registry
+registry = None
+
+# Shared HTTP clients, one per upstream service, with a circuit breaker per endpoint
+upstreams = UpstreamPool(BreakerSet(
+    window=float(os.getenv("CIRCUIT_WINDOW", "30")),
+    min_requests=int(os.getenv("CIRCUIT_MIN_REQUESTS", "20")),
+    error_rate=float(os.getenv("CIRCUIT_ERROR_RATE", "0.5")),
+    consecutive_failures=int(os.getenv("CIRCUIT_CONSECUTIVE_FAILURES", "5")),
+    open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "10")),
+    max_open_seconds=float(os.getenv("CIRCUIT_MAX_OPEN_SECONDS", "300"))
+))
+
+# Replicas per service and the choice between them; each replica has its own breaker
+balancer = ServiceBalancer(upstreams.breakers)
+
+# Upstream GET responses, reused as their Cache-Control / ETag headers allow
+response_cache = ResponseCache(
+    max_bytes=RESPONSE_CACHE_MAX_BYTES,
+    max_entry_bytes=RESPONSE_CACHE_MAX_ENTRY_BYTES,
+    directory=RESPONSE_CACHE_DIR or None,
+    max_disk_bytes=RESPONSE_CACHE_DISK_MAX_BYTES
+)
+
+# Long-lived processes of stdio MCP services, started on first use
+stdio_pools = StdioMCPPools(
+    default_size=STDIO_POOL_SIZE,
+    default_max_concurrency=STDIO_MAX_CONCURRENCY,
+    timeout=STDIO_TIMEOUT
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize service discovery on startup and close upstream clients on shutdown."""
+    global registry
+    logger.info("🚀 Starting Enhanced Enterprise Gateway...")
+    
+    # Initialize service discovery with mounted apps directory
+    apps_path = Path("/apps")
+    if not apps_path.exists():
+        logger.warning(f"Mounted apps directory not found at {apps_path}, trying local path...")
+        apps_path = Path("apps")
+    
+    registry = await initialize_service_discovery()
+    await asyncio.to_thread(response_cache.load_disk_index)
+    
+    logger.info(f"📋 Discovered {len(registry.services)} services")
+    for name, app in registry.services.items():
+        logger.info(f"  - {name} ({app.type}): API={app.has_api}, MCP={app.has_mcp}")
+    
+    # Keep tool listings warm, following services as they come and go
+    catalog_task = asyncio.create_task(
+        tool_catalog.run(lambda: registry.get_mcp_services(), TOOLS_REFRESH_INTERVAL)
+    )
+    # Probe services in the background; endpoints read the shared snapshot
+    health_task = asyncio.create_task(
+        health_monitor.run(lambda: registry.services.values())
+    )
+    broadcast_task = asyncio.create_task(broadcast_health())
+    balancer_task = asyncio.create_task(
+        balancer.run(lambda: registry.get_api_services(), LB_REFRESH_INTERVAL)
+    )
+    
+    yield
+    
+    balancer_task.cancel()
+    catalog_task.cancel()
+    health_task.cancel()
+    broadcast_task.cancel()
+    await upstreams.aclose()
+    await stdio_pools.aclose()
+
+
+# Endpoints returning plain dicts still go through jsonable_encoder;
+# those with large bodies return FastJSONResponse directly to skip it
 app = FastAPI(
     title="Enhanced MCP Enterprise Gateway", 
     version="2.0.0",
-    description="Service discovery and orchestration for MCP apps"
+    description="Service discovery and orchestration for MCP apps",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS
@@ -46,8 +179,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global registry
-registry = None
+
+async def probe_service_health(service) -> Dict[str, Any]:
+    """Probe one service's health endpoint over its pooled connection, or its stdio processes."""
+    if not service.has_api:
+        # Stdio services have no HTTP endpoint; report on their server processes
+        return stdio_pools.health(service)
+    
+    # Probes bypass the breaker so a recovered service is noticed, but failures still count
+    client = upstreams.client_for(service)
+    try:
+        response = await client.get(SERVICE_HEALTH_PATH)
+    except Exception:
+        upstreams.record_error(service.name, str(client.base_url).rstrip("/"))
+        raise
+    return {
+        "status": "healthy" if response.status_code == 200 else "unhealthy",
+        "status_code": response.status_code
+    }
+
+
+# Shared health snapshot, refreshed by one background scheduler
+health_monitor = HealthMonitor(
+    probe_service_health,
+    min_interval=HEALTH_MIN_INTERVAL,
+    max_interval=HEALTH_MAX_INTERVAL,
+    timeout=HEALTH_TIMEOUT
+)
+
+
+# Fan-out of health updates to /ws/gateway clients
+gateway_hub = BroadcastHub(max_queue=WS_MAX_QUEUE)
+
+
+async def broadcast_health():
+    """Publish health changes to all WebSocket clients, computed once per change."""
+    previous: Dict[str, Dict[str, Any]] = {}
+    version = health_monitor.version
+    while True:
+        current_version = await health_monitor.wait_for_change(version, timeout=WS_HEARTBEAT_INTERVAL)
+        timestamp = asyncio.get_event_loop().time()
+        if current_version == version:
+            gateway_hub.publish({"type": "heartbeat", "version": version, "timestamp": timestamp})
+            continue
+        
+        version = current_version
+        current = dict(health_monitor.snapshot())
+        delta = health_delta(previous, current)
+        previous = current
+        if delta["changed"] or delta["removed"]:
+            gateway_hub.publish({"type": "health_delta", "version": version, "timestamp": timestamp, **delta})
+
+
+def circuit_open_response(e: CircuitOpenError) -> HTTPException:
+    """503 telling the client when the breaker will let a trial call through."""
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
 
 
 class MCPRequest(BaseModel):
@@ -58,26 +248,6 @@ class MCPRequest(BaseModel):
     params: Optional[Dict[str, Any]] = None
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize service discovery on startup."""
-    global registry
-    logger.info("🚀 Starting Enhanced Enterprise Gateway...")
-    
-    # Initialize service discovery with mounted apps directory
-    from pathlib import Path
-    apps_path = Path("/apps")
-    if not apps_path.exists():
-        logger.warning(f"Mounted apps directory not found at {apps_path}, trying local path...")
-        apps_path = Path("apps")
-    
-    registry = await initialize_service_discovery()
-    
-    logger.info(f"📋 Discovered {len(registry.services)} services")
-    for name, app in registry.services.items():
-        logger.info(f"  - {name} ({app.type}): API={app.has_api}, MCP={app.has_mcp}")
-
-
 @app.get("/health")
 async def health_check():
     """Gateway health check."""
@@ -95,7 +265,7 @@ async def get_discovery_info():
     if not registry:
         raise HTTPException(status_code=503, detail="Service discovery not initialized")
     
-    return {
+    return FastJSONResponse(content={
         "apps_discovered": len(registry.services),
         "api_services": len(registry.get_api_services()),
         "mcp_services": len(registry.get_mcp_services()),
@@ -106,11 +276,12 @@ async def get_discovery_info():
                 "description": app.description,
                 "has_api": app.has_api,
                 "has_mcp": app.has_mcp,
-                "tags": app.tags
+                "tags": app.tags,
+                "circuit": balancer.circuit(app) if app.has_api else None
             }
             for name, app in registry.services.items()
         }
-    }
+    })
 
 
 @app.get("/api/v1/services")
@@ -119,8 +290,8 @@ async def list_services():
     if not registry:
         raise HTTPException(status_code=503, detail="Service discovery not initialized")
     
-    # Get current health status
-    health_status = await registry.check_all_health()
+    # Latest results of the background health checks
+    health_status = health_monitor.snapshot()
     
     services = {}
     for name, app in registry.services.items():
@@ -137,7 +308,7 @@ async def list_services():
             "tools": app.mcp_tools if app.has_mcp else []
         }
     
-    return services
+    return FastJSONResponse(content=services)
 
 
 @app.get("/api/v1/services/api")
@@ -147,9 +318,9 @@ async def list_api_services():
         raise HTTPException(status_code=503, detail="Service discovery not initialized")
     
     api_services = registry.get_api_services()
-    health_status = await registry.check_all_health()
+    health_status = health_monitor.snapshot()
     
-    return {
+    return FastJSONResponse(content={
         service.name: {
             "port": service.api_port,
             "endpoints": service.api_endpoints,
@@ -157,7 +328,7 @@ async def list_api_services():
             "url": f"http://{service.name}:{service.api_port}"
         }
         for service in api_services
-    }
+    })
 
 
 @app.get("/api/v1/services/mcp")
@@ -167,16 +338,80 @@ async def list_mcp_services():
         raise HTTPException(status_code=503, detail="Service discovery not initialized")
     
     mcp_services = registry.get_mcp_services()
-    health_status = await registry.check_all_health()
+    health_status = health_monitor.snapshot()
     
-    return {
+    return FastJSONResponse(content={
         service.name: {
             "tools": service.mcp_tools,
             "protocol": service.capabilities.get("mcp", {}).get("protocol", "stdio"),
             "health": health_status.get(service.name, {"status": "unknown"})
         }
         for service in mcp_services
+    })
+
+
+async def fetch_service_tools(service) -> Any:
+    """Get the tool listing of one MCP service, raising if it cannot be fetched."""
+    if not service.has_api:
+        pool = stdio_pools.get(service)
+        if pool is not None:
+            result = await pool.call("tools/list")
+            return result.get("tools", []) if result else []
+        # Without a command to run, use manifest info
+        return [
+            {"name": tool, "description": f"Tool from {service.name}"}
+            for tool in service.mcp_tools
+        ]
+    
+    # Check if service supports HTTP-based MCP
+    client = upstreams.client_for(service)
+    endpoint = balancer.pick(service)
+    mcp_request = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/list"
     }
+    
+    endpoint.started()
+    try:
+        response = await client.post(
+            f"{endpoint.url}/",
+            json=mcp_request,
+            headers={"Content-Type": "application/json"}
+        )
+    except Exception:
+        upstreams.record_error(service.name, endpoint.url)
+        raise
+    finally:
+        endpoint.finished()
+    
+    if response.status_code == 200:
+        data = response.json()
+        if "result" in data and "tools" in data["result"]:
+            return data["result"]["tools"]
+        # Fallback to manifest tools
+        return [
+            {"name": tool, "description": f"Tool from {service.name}"}
+            for tool in service.mcp_tools
+        ]
+    
+    # Try REST API fallback
+    try:
+        rest_response = await client.get(f"{endpoint.url}/tools")
+    except Exception:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    if rest_response.status_code == 200:
+        return rest_response.json()
+    raise RuntimeError(f"HTTP {response.status_code}")
+
+
+# Tool listings per service, served from memory
+tool_catalog = ToolCatalog(
+    fetch_service_tools,
+    ttl=TOOLS_CACHE_TTL,
+    stale_ttl=TOOLS_STALE_TTL,
+    deadline=TOOLS_DEADLINE
+)
 
 
 @app.get("/api/v1/tools")
@@ -185,62 +420,118 @@ async def list_all_tools():
     if not registry:
         raise HTTPException(status_code=503, detail="Service discovery not initialized")
     
-    all_tools = {}
-    mcp_services = registry.get_mcp_services()
+    all_tools, partial = await tool_catalog.get_all(registry.get_mcp_services())
     
-    # For each MCP service, try to get tools via MCP protocol
-    async with httpx.AsyncClient() as client:
-        for service in mcp_services:
-            try:
-                # Check if service supports HTTP-based MCP
-                if service.has_api:
-                    mcp_request = {
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "tools/list"
-                    }
-                    
-                    response = await client.post(
-                        f"http://{service.name}:{service.api_port}/",
-                        json=mcp_request,
-                        timeout=10.0,
-                        headers={"Content-Type": "application/json"}
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "result" in data and "tools" in data["result"]:
-                            all_tools[service.name] = data["result"]["tools"]
-                        else:
-                            # Fallback to manifest tools
-                            all_tools[service.name] = [
-                                {"name": tool, "description": f"Tool from {service.name}"}
-                                for tool in service.mcp_tools
-                            ]
-                    else:
-                        # Try REST API fallback
-                        try:
-                            rest_response = await client.get(
-                                f"http://{service.name}:{service.api_port}/tools",
-                                timeout=10.0
-                            )
-                            if rest_response.status_code == 200:
-                                all_tools[service.name] = rest_response.json()
-                            else:
-                                all_tools[service.name] = {"error": f"HTTP {response.status_code}"}
-                        except Exception:
-                            all_tools[service.name] = {"error": f"HTTP {response.status_code}"}
-                else:
-                    # For stdio MCP services, use manifest info
-                    all_tools[service.name] = [
-                        {"name": tool, "description": f"Tool from {service.name}"}
-                        for tool in service.mcp_tools
-                    ]
-                    
-            except Exception as e:
-                all_tools[service.name] = {"error": str(e)}
-    
-    return all_tools
+    # Services that missed the deadline are listed so clients can retry them
+    headers = {"X-Partial-Results": ",".join(partial)} if partial else None
+    return FastJSONResponse(content=all_tools, headers=headers)
+
+
+@app.get("/api/v1/tools/cache")
+async def get_tool_cache_stats():
+    """Tool listing cache counters and per-service listing age."""
+    return tool_catalog.stats()
+
+
+async def post_tool_call(service, tool_name: str, arguments: dict) -> httpx.Response:
+    """Send a tools/call to one replica of an HTTP MCP service over its pooled client."""
+    mcp_request = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {
+            "name": tool_name,
+            "arguments": arguments
+        }
+    }
+    
+    endpoint = balancer.pick(service)
+    client = upstreams.client_for(service)
+    endpoint.started()
+    try:
+        return await client.post(
+            f"{endpoint.url}/",
+            json=mcp_request,
+            headers={"Content-Type": "application/json"}
+        )
+    except Exception:
+        upstreams.record_error(service.name, endpoint.url)
+        raise
+    finally:
+        endpoint.finished()
+
+
+async def dispatch_tool_call(params: dict) -> Any:
+    """Run one call of a batch and return its JSON-RPC result."""
+    service = registry.get_service(params["service"])
+    if not service or not service.has_mcp:
+        raise rpc_error(INVALID_PARAMS, f"Service {params['service']} not found or provides no MCP tools")
+    arguments = params.get("arguments", {})
+    
+    if service.has_api:
+        try:
+            response = await post_tool_call(service, params["name"], arguments)
+        except CircuitOpenError as e:
+            raise rpc_error(SERVER_ERROR, str(e), {"retry_after": max(1, math.ceil(e.retry_after))})
+        try:
+            data = orjson.loads(response.content) if orjson is not None else response.json()
+        except ValueError:
+            raise rpc_error(SERVER_ERROR, f"Service {service.name} answered HTTP {response.status_code}")
+        if isinstance(data, dict) and "error" in data:
+            raise JSONRPCError(data["error"])
+        if not isinstance(data, dict) or "result" not in data:
+            raise rpc_error(SERVER_ERROR, f"Service {service.name} answered HTTP {response.status_code}")
+        return data["result"]
+    
+    pool = stdio_pools.get(service)
+    if pool is None:
+        raise rpc_error(METHOD_NOT_FOUND, f"Service {service.name} does not declare a stdio MCP command")
+    return await pool.call("tools/call", {"name": params["name"], "arguments": arguments})
+
+
+@app.post("/api/v1/tools/batch")
+async def execute_tool_batch(request: Request, stream: bool = False):
+    """
+    Execute a JSON-RPC batch of tool calls across services.
+    
+    Calls run concurrently, each with its own timeout, over the same pooled
+    upstream connections as single calls. Responses come back as one JSON
+    array in request order, or with ``?stream=true`` as newline-delimited
+    JSON, one response per line as each call completes.
+    """
+    if not registry:
+        raise HTTPException(status_code=503, detail="Service discovery not initialized")
+    
+    body = await request.body()
+    try:
+        calls = orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError:
+        return FastJSONResponse(content={"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}})
+    single = not isinstance(calls, list)
+    if single:
+        calls = [calls]
+    if not calls:
+        return FastJSONResponse(content={"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}})
+    if len(calls) > BATCH_MAX_CALLS:
+        raise HTTPException(status_code=413, detail=f"Batch has {len(calls)} calls; the limit is {BATCH_MAX_CALLS}")
+    
+    responses = run_batch(calls, dispatch_tool_call, BATCH_CALL_TIMEOUT, BATCH_CONCURRENCY)
+    
+    if stream:
+        async def lines():
+            async for _, response in responses:
+                if response is not None:
+                    yield encode(response) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    ordered: List[Optional[dict]] = [None] * len(calls)
+    async for position, response in responses:
+        ordered[position] = response
+    ordered = [response for response in ordered if response is not None]
+    if not ordered:
+        # Only notifications: nothing to answer
+        return Response(status_code=204)
+    return FastJSONResponse(content=ordered[0] if single else ordered)
 
 
 @app.post("/api/v1/tools/{service_name}/{tool_name}")
@@ -258,34 +549,49 @@ async def execute_tool(service_name: str, tool_name: str, payload: dict):
     
     # Try to execute via HTTP MCP protocol
     if service.has_api:
-        mcp_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": payload
-            }
-        }
-        
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"http://{service.name}:{service.api_port}/",
-                    json=mcp_request,
-                    timeout=30.0,
-                    headers={"Content-Type": "application/json"}
-                )
-                return response.json()
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=str(e))
-    else:
-        raise HTTPException(status_code=501, detail=f"Stdio MCP execution not yet supported")
+        try:
+            response = await post_tool_call(service, tool_name, payload)
+        except CircuitOpenError as e:
+            raise circuit_open_response(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        # Relay the upstream JSON-RPC body as-is instead of decoding and re-encoding it
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type="application/json"
+        )
+    
+    # Stdio services: multiplex the call over the service's running processes
+    pool = stdio_pools.get(service)
+    if pool is None:
+        raise HTTPException(
+            status_code=501,
+            detail=f"Service {service_name} does not declare a stdio MCP command"
+        )
+    
+    try:
+        result = await pool.call("tools/call", {"name": tool_name, "arguments": payload})
+    except JSONRPCError as e:
+        return FastJSONResponse(content={"jsonrpc": "2.0", "id": 1, "error": e.error})
+    except StdioMCPError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return FastJSONResponse(content={"jsonrpc": "2.0", "id": 1, "result": result})
+
+
+PROXY_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"]
 
 
-@app.get("/api/v1/proxy/{service_name}")
-async def proxy_api_request(service_name: str, request: Request):
-    """Proxy API requests to registered services."""
+@app.api_route("/api/v1/proxy/{service_name}", methods=PROXY_METHODS)
+@app.api_route("/api/v1/proxy/{service_name}/{path:path}", methods=PROXY_METHODS)
+async def proxy_api_request(service_name: str, request: Request, path: str = ""):
+    """
+    Proxy API requests to registered services.
+    
+    Request and response bodies are streamed chunk by chunk, and the
+    upstream body is relayed as received (still compressed if it was), so
+    memory use per request does not grow with the payload size.
+    """
     if not registry:
         raise HTTPException(status_code=503, detail="Service discovery not initialized")
     
@@ -296,57 +602,193 @@ async def proxy_api_request(service_name: str, request: Request):
     if not service.has_api:
         raise HTTPException(status_code=400, detail=f"Service {service_name} does not provide API")
     
-    # Extract path after service name
-    original_path = str(request.url.path)
-    proxy_path = original_path.replace(f"/api/v1/proxy/{service_name}", "", 1)
-    if not proxy_path:
-        proxy_path = "/"
+    # Only stream a request body when the client announced one
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+    cache_key = f"{service.name}/{path}"
+    
+    if request.method == "GET" and not has_body and response_cache.enabled:
+        return await proxy_cached_get(service, request, path, cache_key)
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        # A write through the gateway makes cached reads of that path stale
+        response_cache.invalidate(cache_key)
     
-    # Forward request to service
-    target_url = f"http://{service.name}:{service.api_port}{proxy_path}"
+    try:
+        endpoint = balancer.pick(service, request.headers.get(LB_AFFINITY_HEADER))
+    except CircuitOpenError as e:
+        raise circuit_open_response(e)
+    
+    # Forward request to the chosen replica over the service's pooled connection
+    client = upstreams.client_for(service)
+    upstream_request = client.build_request(
+        method=request.method,
+        url=f"{endpoint.url}/{path}",
+        params=request.query_params,
+        headers=forward_headers(request.headers.items(), drop=["host"]),
+        content=request.stream() if has_body else None
+    )
+    endpoint.started()
+    try:
+        upstream_response = await client.send(upstream_request, stream=True)
+    except httpx.HTTPError as e:
+        endpoint.finished()
+        upstreams.record_error(service.name, endpoint.url)
+        raise HTTPException(status_code=502, detail=f"Upstream {service_name} failed: {e}")
     
-    async with httpx.AsyncClient() as client:
+    return stream_upstream_response(upstream_response, endpoint)
+
+
+def stream_upstream_response(upstream_response: httpx.Response, endpoint, cache_status: Optional[str] = None):
+    """Relay an open upstream response chunk by chunk, releasing it when done."""
+    async def relay():
+        # Also runs when the client disconnects or reading the upstream fails,
+        # so the pooled connection and the replica's outstanding count are released
         try:
-            response = await client.request(
-                method=request.method,
-                url=target_url,
-                params=request.query_params,
-                headers=request.headers,
-                content=await request.body(),
-                timeout=30.0
-            )
-            
-            return JSONResponse(
-                content=response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text,
-                status_code=response.status_code,
-                headers=dict(response.headers)
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+            async for chunk in upstream_response.aiter_raw():
+                yield chunk
+        finally:
+            try:
+                await upstream_response.aclose()
+            finally:
+                endpoint.finished()
+    
+    response = StreamingResponse(relay(), status_code=upstream_response.status_code)
+    response.raw_headers = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in forward_headers(upstream_response.headers.multi_items())
+    ]
+    if cache_status:
+        response.raw_headers.append((b"x-cache", cache_status.encode("latin-1")))
+    return response
+
+
+# Client validators are answered from the cache, not forwarded
+CONDITIONAL_HEADERS = ["host", "if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range"]
+
+
+async def proxy_cached_get(service, request: Request, path: str, cache_key: str):
+    """Serve a proxied GET from the response cache, going upstream only on a miss or to revalidate."""
+    query = str(request.query_params)
+    if query:
+        cache_key = f"{cache_key}?{query}"
+    endpoint = None
+    
+    async def fetch(validators: Dict[str, str]) -> httpx.Response:
+        nonlocal endpoint
+        endpoint = balancer.pick(service, request.headers.get(LB_AFFINITY_HEADER))
+        client = upstreams.client_for(service)
+        headers = forward_headers(request.headers.items(), drop=CONDITIONAL_HEADERS)
+        upstream_request = client.build_request(
+            method="GET",
+            url=f"{endpoint.url}/{path}",
+            params=request.query_params,
+            headers=headers + list(validators.items())
+        )
+        endpoint.started()
+        try:
+            return await client.send(upstream_request, stream=True)
+        except httpx.HTTPError:
+            endpoint.finished()
+            upstreams.record_error(service.name, endpoint.url)
+            endpoint = None
+            raise
+    
+    streaming = False
+    try:
+        result, cache_status = await response_cache.fetch(cache_key, request.headers, fetch)
+        if not isinstance(result, CachedResponse):
+            streaming = True
+            return stream_upstream_response(result, endpoint, cache_status)
+    except CircuitOpenError as e:
+        raise circuit_open_response(e)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Upstream {service.name} failed: {e}")
+    finally:
+        if endpoint is not None and not streaming:
+            endpoint.finished()
+    
+    headers = forward_headers(result.headers)
+    headers.append(("age", str(int(result.age()))))
+    headers.append(("x-cache", cache_status))
+    etag = result.etag
+    if etag and etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        # The client already has this version
+        response = Response(status_code=304)
+        headers = [(name, value) for name, value in headers if name.lower() not in ("content-length", "content-encoding")]
+    else:
+        # Stored headers already carry the length of the stored (raw) body
+        response = Response(content=result.body, status_code=result.status)
+    response.raw_headers = [
+        (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers
+    ]
+    return response
+
+
+@app.get("/api/v1/health/scheduler")
+async def get_health_scheduler_stats():
+    """Probe counters and the current check interval per service."""
+    return health_monitor.stats()
+
+
+@app.get("/api/v1/upstreams")
+async def get_upstream_stats():
+    """Connection pool usage, request counters and replicas per upstream service."""
+    return {"upstreams": upstreams.stats(), "replicas": balancer.stats()}
+
+
+@app.get("/api/v1/cache")
+async def get_response_cache_stats():
+    """Proxied GET response cache usage and hit counters."""
+    return response_cache.stats()
+
+
+@app.get("/api/v1/stdio")
+async def get_stdio_stats():
+    """Running processes, in-flight requests and restarts per stdio MCP service."""
+    return stdio_pools.stats()
 
 
 @app.websocket("/ws/gateway")
 async def gateway_websocket(websocket: WebSocket):
-    """WebSocket endpoint for real-time gateway updates."""
+    """
+    WebSocket endpoint for real-time gateway updates.
+    
+    Clients receive a full ``health_update`` snapshot on connect, then
+    ``health_delta`` messages with the services whose status changed or
+    that were removed, and a ``heartbeat`` when nothing changed for a
+    while. Deltas carry full service entries, so applying one twice is
+    harmless.
+    """
     await websocket.accept()
+    subscriber = gateway_hub.subscribe()
     
     try:
+        await websocket.send_text(encode({
+            "type": "health_update",
+            "version": health_monitor.version,
+            "services": health_monitor.snapshot() if registry else {},
+            "timestamp": asyncio.get_event_loop().time()
+        }))
+        
         while True:
-            # Send periodic health updates
-            if registry:
-                health_status = await registry.check_all_health()
-                await websocket.send_json({
-                    "type": "health_update",
-                    "services": health_status,
-                    "timestamp": asyncio.get_event_loop().time()
-                })
-            
-            await asyncio.sleep(30)  # Send updates every 30 seconds
+            message = await subscriber.next()
+            if message is None:
+                # Fell too far behind; the client reconnects for a fresh snapshot
+                await websocket.close(code=1013, reason="Subscriber too slow")
+                return
+            await websocket.send_text(message)
             
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        await websocket.close()
+        gateway_hub.unsubscribe(subscriber)
+
+
+@app.get("/api/v1/ws/stats")
+async def get_websocket_stats():
+    """Connected WebSocket subscribers and fan-out counters."""
+    return gateway_hub.stats()
 
 
 @app.get("/")
@@ -373,7 +815,8 @@ async def root():
             "/api/v1/discovery",
             "/api/v1/services",
             "/api/v1/tools",
-            "/api/v1/proxy/{service_name}",
+            "/api/v1/proxy/{service_name}/{path}",
+            "/api/v1/upstreams",
             "/ws/gateway"
         ]
     }
@@ -0,0 +1,169 @@
+"""
+Background health checking for discovered services.
+
+One scheduler probes every service on its own timer and keeps the latest
+results in a shared snapshot; endpoints and WebSocket clients read that
+snapshot instead of probing services themselves. A service that keeps
+reporting the same healthy status is probed less and less often, while
+a failing or changing service is probed at the fastest rate. Intervals
+are jittered so probes of different services do not line up.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger("enhanced_gateway.health")
+
+HealthProbe = Callable[[Any], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class _ServiceSchedule:
+    interval: float
+    status: Optional[str] = None
+    task: Optional[asyncio.Task] = None
+
+
+class HealthMonitor:
+    """
+    Probes services in the background and publishes a shared health snapshot.
+
+    ``probe`` returns a dict with at least a ``status`` key for one service.
+    Stable healthy services back off from ``min_interval`` by ``backoff``
+    per probe up to ``max_interval``.
+    """
+
+    def __init__(
+        self,
+        probe: HealthProbe,
+        min_interval: float = 5.0,
+        max_interval: float = 60.0,
+        backoff: float = 1.5,
+        jitter: float = 0.2,
+        timeout: float = 5.0,
+    ):
+        self.probe = probe
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self._snapshot: Dict[str, Dict[str, Any]] = {}
+        self._schedules: Dict[str, _ServiceSchedule] = {}
+        self._changed = asyncio.Event()
+        self.version = 0
+        self.probes = 0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get the latest health result of every service."""
+        return self._snapshot
+
+    async def wait_for_change(self, version: int, timeout: Optional[float] = None) -> int:
+        """
+        Wait until a service changes status after ``version`` and return the current version.
+
+        Returns early with an unchanged version when ``timeout`` expires.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.version <= version:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self.version
+
+    def _publish(self, name: str, result: Optional[Dict[str, Any]]) -> None:
+        previous = self._snapshot.get(name)
+        if result is None:
+            self._snapshot.pop(name, None)
+        else:
+            self._snapshot[name] = result
+        if previous is not None and result is not None and previous.get("status") == result.get("status"):
+            # Only status changes (and services coming or going) count as a new version
+            return
+        self.version += 1
+        # Wake every waiter, then re-arm for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _next_interval(self, schedule: _ServiceSchedule, status: str) -> float:
+        if status == "healthy" and status == schedule.status:
+            interval = min(schedule.interval * self.backoff, self.max_interval)
+        else:
+            interval = self.min_interval
+        schedule.status = status
+        schedule.interval = interval
+        return interval
+
+    async def check(self, service: Any) -> Dict[str, Any]:
+        """Probe one service now and publish the result."""
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self.probe(service), self.timeout)
+        except asyncio.TimeoutError:
+            result = {"status": "unhealthy", "error": f"no response within {self.timeout}s"}
+        except Exception as e:
+            result = {"status": "unhealthy", "error": str(e)}
+        self.probes += 1
+        result = {
+            **result,
+            "checked_at": time.time(),
+            "probe_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        schedule = self._schedules.get(service.name)
+        if schedule is not None:
+            result["next_check_in"] = round(self._next_interval(schedule, result.get("status")), 1)
+        if self._snapshot.get(service.name, {}).get("status") != result.get("status"):
+            logger.info(f"Service {service.name} is now {result.get('status')}")
+        self._publish(service.name, result)
+        return result
+
+    async def _watch(self, service: Any) -> None:
+        # Spread the first probes of all services over one interval
+        await asyncio.sleep(random.uniform(0, self.min_interval))
+        while True:
+            await self.check(service)
+            interval = self._schedules[service.name].interval
+            await asyncio.sleep(interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def sync(self, services: Iterable[Any]) -> None:
+        """Start watching new services and stop watching removed ones."""
+        services = {service.name: service for service in services}
+        for name in list(self._schedules):
+            if name not in services:
+                self._schedules.pop(name).task.cancel()
+                self._publish(name, None)
+        for name, service in services.items():
+            if name not in self._schedules:
+                schedule = _ServiceSchedule(interval=self.min_interval)
+                self._schedules[name] = schedule
+                schedule.task = asyncio.create_task(self._watch(service))
+
+    async def run(self, services: Callable[[], Iterable[Any]], interval: float = 30.0) -> None:
+        """Follow ``services()`` every ``interval`` seconds until cancelled."""
+        try:
+            while True:
+                try:
+                    self.sync(services())
+                except Exception as e:
+                    logger.error(f"Health monitor sync failed: {e}")
+                await asyncio.sleep(interval)
+        finally:
+            for schedule in self._schedules.values():
+                schedule.task.cancel()
+            self._schedules.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get probe counters and the current interval per service."""
+        return {
+            "probes": self.probes,
+            "version": self.version,
+            "intervals": {name: round(schedule.interval, 1) for name, schedule in self._schedules.items()},
+        }
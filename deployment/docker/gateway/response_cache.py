@@ -0,0 +1,503 @@
+"""
+HTTP response cache for proxied GET requests.
+
+Follows the upstream's caching headers the way a shared cache would
+(RFC 9111): responses are stored only when their ``Cache-Control`` /
+``Expires`` headers give them a freshness lifetime or they carry a
+validator (``ETag`` / ``Last-Modified``); ``no-store``, ``private``,
+``Vary: *`` and ``Set-Cookie`` responses are never stored. Stale entries
+with a validator are revalidated with a conditional request, so an
+unchanged resource costs the upstream a 304 instead of a full body.
+Concurrent misses for the same URL share one upstream request. A request
+still in flight when its key is invalidated is answered for its caller
+but not stored or shared.
+
+Entries are kept in memory within a byte budget, least recently used
+first out. With a cache directory set, entries are also written to disk
+and survive restarts; the disk tier has its own byte budget.
+"""
+
+import asyncio
+import calendar
+import email.utils
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import httpx
+
+logger = logging.getLogger("enhanced_gateway.cache")
+
+# Status codes a cache may store without explicit permission (RFC 9110 section 15.1)
+CACHEABLE_STATUSES = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+
+# Headers that a 304 response must not overwrite on the stored response
+NOT_UPDATED_BY_304 = {"content-length", "content-encoding", "transfer-encoding"}
+
+UpstreamFetch = Callable[[Dict[str, str]], Awaitable[httpx.Response]]
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into lower-cased directives and their values."""
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return calendar.timegm(parsed[:9]) - (parsed[9] or 0)
+
+
+@dataclass
+class CachedResponse:
+    """A stored upstream response and what is needed to judge its freshness."""
+
+    key: str
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    stored_at: float
+    lifetime: float
+    initial_age: float = 0.0
+    vary: Dict[str, str] = field(default_factory=dict)
+    no_cache: bool = False
+
+    def header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        for header, value in self.headers:
+            if header.lower() == name:
+                return value
+        return None
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.header("etag")
+
+    def age(self) -> float:
+        return self.initial_age + max(0.0, time.time() - self.stored_at)
+
+    def is_fresh(self) -> bool:
+        return not self.no_cache and self.age() < self.lifetime
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this response."""
+        headers = {}
+        if self.etag:
+            headers["if-none-match"] = self.etag
+        last_modified = self.header("last-modified")
+        if last_modified:
+            headers["if-modified-since"] = last_modified
+        return headers
+
+    def size(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers)
+
+    def to_disk(self) -> bytes:
+        meta = {
+            "key": self.key,
+            "status": self.status,
+            "headers": self.headers,
+            "stored_at": self.stored_at,
+            "lifetime": self.lifetime,
+            "initial_age": self.initial_age,
+            "vary": self.vary,
+            "no_cache": self.no_cache,
+        }
+        return json.dumps(meta, separators=(",", ":")).encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def from_disk(cls, data: bytes) -> "CachedResponse":
+        meta, _, body = data.partition(b"\n")
+        meta = json.loads(meta)
+        meta["headers"] = [tuple(header) for header in meta["headers"]]
+        return cls(body=body, **meta)
+
+
+def freshness(headers: httpx.Headers, now: float) -> Tuple[Optional[float], float]:
+    """
+    Freshness lifetime and current age of a response, per RFC 9111 section 4.2.
+
+    The lifetime is ``None`` when the response gives none.
+    """
+    directives = parse_cache_control(headers.get("cache-control"))
+    age = _seconds(headers.get("age")) or 0.0
+    date = _http_date(headers.get("date"))
+    if date is not None:
+        age = max(age, now - date)
+
+    lifetime = _seconds(directives.get("s-maxage"))
+    if lifetime is None:
+        lifetime = _seconds(directives.get("max-age"))
+    if lifetime is None and "expires" in headers:
+        expires = _http_date(headers.get("expires"))
+        # An invalid Expires value means already expired
+        lifetime = max(0.0, expires - (date or now)) if expires is not None else 0.0
+    return lifetime, age
+
+
+class ResponseCache:
+    """
+    Memory (and optionally disk) cache of upstream GET responses.
+
+    ``max_entry_bytes`` bounds a single response; larger responses are
+    streamed through without being stored.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+        directory: Optional[str] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        # File name -> (key, size), oldest write first
+        self._disk: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._disk_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    # Disk tier
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    @staticmethod
+    def _filename(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest() + ".cache"
+
+    def load_disk_index(self) -> None:
+        """Index the entries already on disk; blocking, run it in a thread."""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".cache"):
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    key = json.loads(f.readline())["key"]
+                stat = entry.stat()
+            except (OSError, ValueError, KeyError):
+                continue
+            files.append((stat.st_mtime, entry.name, key, stat.st_size))
+        for _, filename, key, size in sorted(files):
+            self._disk[filename] = (key, size)
+            self._disk_bytes += size
+        logger.info(f"Response cache has {len(self._disk)} entries on disk ({self._disk_bytes} bytes)")
+
+    def _read_disk(self, filename: str) -> bytes:
+        with open(self._path(filename), "rb") as f:
+            return f.read()
+
+    def _write_disk(self, filename: str, data: bytes) -> None:
+        path = self._path(filename)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _remove_disk(self, filename: str) -> None:
+        try:
+            os.remove(self._path(filename))
+        except OSError:
+            pass
+
+    async def _save(self, entry: CachedResponse, leader: asyncio.Future) -> None:
+        filename = self._filename(entry.key)
+        data = entry.to_disk()
+        try:
+            await asyncio.to_thread(self._write_disk, filename, data)
+        except OSError as e:
+            logger.warning(f"Could not write cached response to disk: {e}")
+            return
+        if self._inflight.get(entry.key) is not leader:
+            # Invalidated while the file was being written
+            await asyncio.to_thread(self._remove_disk, filename)
+            return
+        previous = self._disk.pop(filename, None)
+        if previous:
+            self._disk_bytes -= previous[1]
+        self._disk[filename] = (entry.key, len(data))
+        self._disk_bytes += len(data)
+        stale = []
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            old, (_, size) = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            stale.append(old)
+        if stale:
+            await asyncio.to_thread(lambda: [self._remove_disk(name) for name in stale])
+
+    async def _load(self, key: str) -> Optional[CachedResponse]:
+        filename = self._filename(key)
+        if filename not in self._disk:
+            return None
+        try:
+            data = await asyncio.to_thread(self._read_disk, filename)
+            entry = CachedResponse.from_disk(data)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Dropping unreadable cached response {filename}: {e}")
+            self._drop_disk(filename)
+            return None
+        if entry.key != key:
+            return None
+        return entry
+
+    def _drop_disk(self, filename: str) -> None:
+        record = self._disk.pop(filename, None)
+        if record:
+            self._disk_bytes -= record[1]
+            self._remove_disk(filename)
+
+    # Memory tier
+
+    def _put(self, entry: CachedResponse) -> None:
+        self._discard(entry.key)
+        self._entries[entry.key] = entry
+        self._bytes += entry.size()
+        while self._bytes > self.max_bytes and self._entries:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.size()
+            self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Get the stored response for ``key`` from memory, falling back to disk."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.directory:
+            entry = await self._load(key)
+            if entry is not None:
+                self._put(entry)
+        return entry
+
+    @staticmethod
+    def _matches(key: str, path: str) -> bool:
+        return key == path or key.startswith(path + "?")
+
+    def invalidate(self, path: str) -> int:
+        """
+        Drop the entries for ``path`` with any query string, e.g. after a write to it.
+
+        Requests for it that are still in flight are not stored when they
+        finish, and requests waiting on them go upstream themselves.
+        """
+        keys = [key for key in self._entries if self._matches(key, path)]
+        for key in keys:
+            self._discard(key)
+        files = [name for name, (key, _) in self._disk.items() if self._matches(key, path)]
+        for filename in files:
+            self._drop_disk(filename)
+        for key in [key for key in self._inflight if self._matches(key, path)]:
+            del self._inflight[key]
+        return len(keys) + len(files)
+
+    # HTTP semantics
+
+    def _storable(self, request_headers: Mapping[str, str], response: httpx.Response) -> bool:
+        if response.status_code not in CACHEABLE_STATUSES:
+            return False
+        directives = parse_cache_control(response.headers.get("cache-control"))
+        if "no-store" in directives or "private" in directives:
+            return False
+        if response.headers.get("vary", "").strip() == "*" or "set-cookie" in response.headers:
+            return False
+        if "authorization" in request_headers and not (
+            "public" in directives or "s-maxage" in directives or "must-revalidate" in directives
+        ):
+            return False
+        # Unknown or large bodies are streamed through rather than buffered
+        length = response.headers.get("content-length")
+        if length is None or not length.isdigit() or int(length) > self.max_entry_bytes:
+            return False
+        lifetime, _ = freshness(response.headers, time.time())
+        return lifetime is not None or "etag" in response.headers or "last-modified" in response.headers
+
+    def _entry(self, key: str, request_headers: Mapping[str, str], response: httpx.Response, body: bytes) -> CachedResponse:
+        now = time.time()
+        lifetime, age = freshness(response.headers, now)
+        directives = parse_cache_control(response.headers.get("cache-control"))
+        vary = {
+            name.strip().lower(): request_headers.get(name.strip().lower(), "")
+            for name in response.headers.get("vary", "").split(",")
+            if name.strip()
+        }
+        return CachedResponse(
+            key=key,
+            status=response.status_code,
+            headers=[(name, value) for name, value in response.headers.multi_items() if name.lower() != "age"],
+            body=body,
+            stored_at=now,
+            lifetime=lifetime or 0.0,
+            initial_age=age,
+            vary=vary,
+            no_cache="no-cache" in directives,
+        )
+
+    async def _store(self, entry: CachedResponse, leader: asyncio.Future) -> None:
+        # Not if the key was invalidated while the upstream request ran
+        if self._inflight.get(entry.key) is not leader:
+            return
+        self._put(entry)
+        if self.directory:
+            await self._save(entry, leader)
+
+    async def _refresh(self, entry: CachedResponse, response: httpx.Response, leader: asyncio.Future) -> CachedResponse:
+        # Update the stored headers from the 304 (RFC 9111 section 4.3.4)
+        updated = {name.lower() for name in response.headers if name.lower() not in NOT_UPDATED_BY_304}
+        headers = [(name, value) for name, value in entry.headers if name.lower() not in updated]
+        headers += [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() in updated and name.lower() != "age"
+        ]
+        merged = httpx.Headers(headers)
+        lifetime, age = freshness(merged, time.time())
+        refreshed = CachedResponse(
+            key=entry.key,
+            status=entry.status,
+            headers=headers,
+            body=entry.body,
+            stored_at=time.time(),
+            lifetime=lifetime or 0.0,
+            initial_age=age,
+            vary=entry.vary,
+            no_cache="no-cache" in parse_cache_control(merged.get("cache-control")),
+        )
+        await self._store(refreshed, leader)
+        return refreshed
+
+    async def _fetch(
+        self,
+        key: str,
+        request_headers: Mapping[str, str],
+        stale: Optional[CachedResponse],
+        fetch: UpstreamFetch,
+        leader: asyncio.Future,
+    ) -> Tuple[Union[CachedResponse, httpx.Response], str]:
+        validators = stale.validators() if stale is not None else {}
+        response = await fetch(validators)
+        if response.status_code == 304 and stale is not None:
+            await response.aclose()
+            self.revalidated += 1
+            return await self._refresh(stale, response, leader), "REVALIDATED"
+        self.misses += 1
+        if not self._storable(request_headers, response):
+            # Caller streams it through, and owns closing it
+            return response, "BYPASS"
+        try:
+            # Stored as received (still compressed if it was), like the proxy relays it
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+        finally:
+            await response.aclose()
+        entry = self._entry(key, request_headers, response, body)
+        await self._store(entry, leader)
+        return entry, "MISS"
+
+    async def fetch(
+        self,
+        key: str,
+        request_headers: Mapping[str, str],
+        fetch: UpstreamFetch,
+    ) -> Tuple[Union[CachedResponse, httpx.Response], str]:
+        """
+        Serve a GET from the cache or from ``fetch``, which sends the upstream request.
+
+        ``fetch`` receives the conditional headers to add and returns the
+        upstream response opened with ``stream=True``. Returns the cached
+        response, or the still-open upstream response when it cannot be
+        stored, together with a cache status (``HIT``, ``MISS``,
+        ``REVALIDATED`` or ``BYPASS``).
+        """
+        request_directives = parse_cache_control(request_headers.get("cache-control"))
+        if "no-store" in request_directives:
+            return await fetch({}), "BYPASS"
+
+        entry = await self.get(key)
+        if entry is not None and not self._same_variant(entry, request_headers):
+            # Stored for a different variant; the new response replaces it
+            entry = None
+        if entry is not None and entry.is_fresh() and "no-cache" not in request_directives:
+            self.hits += 1
+            return entry, "HIT"
+
+        # One upstream request per key at a time; others wait for its result
+        leader = self._inflight.get(key)
+        if leader is not None:
+            self.coalesced += 1
+            shared = await asyncio.shield(leader)
+            if shared is not None and self._same_variant(shared, request_headers):
+                return shared, "HIT"
+            # Not stored (or failed); this request goes upstream itself
+            return await fetch({}), "BYPASS"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        result = None
+        try:
+            result, status = await self._fetch(key, request_headers, entry, fetch, future)
+            return result, status
+        finally:
+            # Waiters only share a response that was stored
+            shared = self._inflight.get(key) is future and isinstance(result, CachedResponse)
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            future.set_result(result if shared else None)
+
+    @staticmethod
+    def _same_variant(entry: CachedResponse, request_headers: Mapping[str, str]) -> bool:
+        return all(request_headers.get(name, "") == value for name, value in entry.vary.items())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
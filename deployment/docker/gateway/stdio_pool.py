@@ -0,0 +1,390 @@
+"""
+Pools of long-lived stdio MCP server processes.
+
+Stdio-only MCP services (such as ``ai_registry_server.py``) speak
+newline-delimited JSON-RPC on stdin/stdout. Instead of spawning a server
+per call, the gateway keeps a few of them running per service, performs
+the MCP ``initialize`` handshake once per process, and multiplexes
+concurrent requests over each process, matching responses to requests
+by JSON-RPC id. Requests the server sends itself (e.g. sampling or
+roots/list) are answered with an error, except ping; they are never
+mistaken for responses. Crashed processes are restarted with backoff.
+
+A service opts in by declaring the command in its manifest:
+
+    capabilities:
+      mcp:
+        protocol: stdio
+        command: ["python", "/app/ai_registry_server.py"]
+        env: {HTTP_PORT: "0"}  # added to the gateway's environment
+        pool_size: 2            # processes
+        max_concurrency: 8      # in-flight requests per process
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import shlex
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("enhanced_gateway.stdio")
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+# Largest single JSON-RPC message read from a server
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+METHOD_NOT_FOUND = -32601
+
+
+class StdioMCPError(Exception):
+    """Raised when a stdio MCP server is unavailable or does not answer in time."""
+
+
+class JSONRPCError(Exception):
+    """Error object returned by the server for one request."""
+
+    def __init__(self, error: Dict[str, Any]):
+        super().__init__(error.get("message", "JSON-RPC error"))
+        self.error = error
+
+
+class StdioMCPProcess:
+    """One running MCP server and the requests waiting on it."""
+
+    def __init__(
+        self,
+        name: str,
+        command: List[str],
+        max_concurrency: int,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._stopping = False
+        self.ready = False
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process else None
+
+    async def start(self, timeout: float) -> None:
+        """Spawn the server and complete the MCP handshake."""
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            cwd=self.cwd,
+            env=self.env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            # Server logs go to the gateway's stderr
+            stderr=None,
+            limit=MAX_MESSAGE_BYTES,
+        )
+        self._reader = asyncio.create_task(self._read_responses())
+        await self._send_and_wait("initialize", {
+            "protocolVersion": MCP_PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "enhanced-gateway", "version": "2.0.0"},
+        }, timeout)
+        await self._write({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        self.ready = True
+        logger.info(f"Started stdio MCP server for {self.name} (pid {self.pid})")
+
+    async def wait(self) -> int:
+        """Wait for the process to exit and return its exit code."""
+        return await self._process.wait()
+
+    async def _write(self, message: Dict[str, Any]) -> None:
+        line = json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+        async with self._write_lock:
+            self._process.stdin.write(line)
+            await self._process.stdin.drain()
+
+    def _reply(self, request_id: Any, result: Any = None, error: Optional[Dict[str, Any]] = None) -> None:
+        # One buffered write of a whole line cannot interleave with _write's
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id}
+        if error is not None:
+            message["error"] = error
+        else:
+            message["result"] = result
+        try:
+            self._process.stdin.write(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _handle_server_message(self, message: Dict[str, Any]) -> None:
+        """Answer a request the server sent on its own; its notifications are ignored."""
+        if "id" not in message:
+            return
+        if message["method"] == "ping":
+            self._reply(message["id"], result={})
+        else:
+            # The gateway offers no client capabilities (sampling, roots, ...)
+            self._reply(message["id"], error={
+                "code": METHOD_NOT_FOUND,
+                "message": f"Method not supported by the gateway: {message['method']}",
+            })
+
+    async def _read_responses(self) -> None:
+        try:
+            while True:
+                line = await self._process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Ignoring non-JSON output from {self.name}: {line[:200]!r}")
+                    continue
+                if not isinstance(message, dict):
+                    logger.warning(f"Ignoring unexpected message from {self.name}: {line[:200]!r}")
+                    continue
+                if "method" in message:
+                    # A server-initiated request may reuse one of our ids
+                    self._handle_server_message(message)
+                    continue
+                if "id" not in message or ("result" not in message and "error" not in message):
+                    continue
+                future = self._pending.pop(message["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except Exception as e:
+            logger.error(f"Reading from stdio MCP server {self.name} failed: {e}")
+        finally:
+            self.ready = False
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(StdioMCPError(f"MCP server for {self.name} exited"))
+            self._pending.clear()
+            if not self._stopping and self._process.returncode is None:
+                # Nobody reads its output any more; end it so the pool restarts it
+                logger.warning(f"Killing stdio MCP server for {self.name} (pid {self.pid}) after its output stopped")
+                try:
+                    self._process.kill()
+                except ProcessLookupError:
+                    pass
+
+    async def _send_and_wait(self, method: str, params: Optional[Dict[str, Any]], timeout: float) -> Any:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        try:
+            await self._write(message)
+            response = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise StdioMCPError(f"MCP server for {self.name} did not answer {method} within {timeout}s")
+        except (BrokenPipeError, ConnectionResetError):
+            raise StdioMCPError(f"MCP server for {self.name} is not running")
+        finally:
+            self._pending.pop(request_id, None)
+        if "error" in response:
+            raise JSONRPCError(response["error"])
+        return response.get("result")
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]], timeout: float) -> Any:
+        """Send one request, waiting for a free slot on this process first."""
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            self.in_flight += 1
+            self.requests += 1
+            return await self._send_and_wait(method, params, timeout)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def load(self) -> float:
+        # Requests queued for a slot count too, so bursts spread across processes
+        return (self.in_flight + self.waiting) / self.max_concurrency
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        self.ready = False
+        self._stopping = True
+        if self._process is None or self._process.returncode is not None:
+            return
+        self._process.stdin.close()
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout)
+        except asyncio.TimeoutError:
+            self._process.kill()
+            await self._process.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": self.pid,
+            "ready": self.ready,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "requests": self.requests,
+        }
+
+
+class StdioMCPPool:
+    """Supervised processes of one stdio MCP service."""
+
+    def __init__(
+        self,
+        name: str,
+        command: List[str],
+        size: int = 2,
+        max_concurrency: int = 8,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        timeout: float = 30.0,
+        max_backoff: float = 30.0,
+    ):
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.size = size
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.restarts = 0
+        self._processes: List[Optional[StdioMCPProcess]] = [None] * size
+        self._ready = asyncio.Event()
+        self._supervisors = [asyncio.create_task(self._supervise(slot)) for slot in range(size)]
+
+    async def _supervise(self, slot: int) -> None:
+        backoff = 0.5
+        while True:
+            process = StdioMCPProcess(self.name, self.command, self.max_concurrency, self.cwd, self.env)
+            self._processes[slot] = process
+            try:
+                await process.start(self.timeout)
+                self._ready.set()
+                backoff = 0.5
+                code = await process.wait()
+                logger.warning(f"Stdio MCP server for {self.name} (pid {process.pid}) exited with code {code}")
+            except asyncio.CancelledError:
+                await process.stop()
+                raise
+            except Exception as e:
+                logger.error(f"Starting stdio MCP server for {self.name} failed: {e}")
+                await process.stop()
+
+            if not any(p is not None and p.ready for p in self._processes):
+                self._ready.clear()
+            self.restarts += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def call(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Send a request to the least busy ready process.
+
+        Raises:
+            StdioMCPError: If no process becomes ready or the request times out.
+            JSONRPCError: If the server answers with an error.
+        """
+        if not self._ready.is_set():
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.timeout)
+            except asyncio.TimeoutError:
+                raise StdioMCPError(f"No MCP server process for {self.name} is running")
+        ready = [process for process in self._processes if process is not None and process.ready]
+        if not ready:
+            raise StdioMCPError(f"No MCP server process for {self.name} is running")
+        process = min(ready, key=StdioMCPProcess.load)
+        return await process.request(method, params, self.timeout)
+
+    async def aclose(self) -> None:
+        for task in self._supervisors:
+            task.cancel()
+        await asyncio.gather(*self._supervisors, return_exceptions=True)
+
+    def health(self) -> Dict[str, Any]:
+        """Status from the processes' readiness: healthy, degraded or unhealthy."""
+        ready = sum(1 for process in self._processes if process is not None and process.ready)
+        if ready == self.size:
+            status = "healthy"
+        elif ready:
+            status = "degraded"
+        else:
+            status = "unhealthy"
+        return {"status": status, "ready": ready, "size": self.size, "restarts": self.restarts}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "command": self.command,
+            "restarts": self.restarts,
+            "processes": [process.stats() for process in self._processes if process is not None],
+        }
+
+
+class StdioMCPPools:
+    """Process pools of all stdio MCP services, started on first use."""
+
+    def __init__(self, default_size: int = 2, default_max_concurrency: int = 8, timeout: float = 30.0):
+        self.default_size = default_size
+        self.default_max_concurrency = default_max_concurrency
+        self.timeout = timeout
+        self._pools: Dict[str, StdioMCPPool] = {}
+
+    @staticmethod
+    def _settings(service: Any) -> Dict[str, Any]:
+        capabilities = getattr(service, "capabilities", None) or {}
+        return capabilities.get("mcp", {}) or {}
+
+    def configured(self, service: Any) -> bool:
+        """Check whether the service declares a stdio command."""
+        return bool(self._settings(service).get("command"))
+
+    def get(self, service: Any) -> Optional[StdioMCPPool]:
+        """Get the service's pool, starting it on first use; None if it has no command."""
+        pool = self._pools.get(service.name)
+        if pool is None:
+            settings = self._settings(service)
+            command = settings.get("command")
+            if not command:
+                return None
+            if isinstance(command, str):
+                command = shlex.split(command)
+            pool = StdioMCPPool(
+                service.name,
+                command,
+                size=int(settings.get("pool_size", self.default_size)),
+                max_concurrency=int(settings.get("max_concurrency", self.default_max_concurrency)),
+                cwd=settings.get("cwd") or os.getcwd(),
+                env={**os.environ, **{k: str(v) for k, v in (settings.get("env") or {}).items()}},
+                timeout=float(settings.get("timeout", self.timeout)),
+            )
+            self._pools[service.name] = pool
+        return pool
+
+    def health(self, service: Any) -> Dict[str, Any]:
+        """Health of the service's pool, without starting it."""
+        pool = self._pools.get(service.name)
+        if pool is None:
+            # Processes start on the first tool call
+            return {"status": "idle" if self.configured(service) else "unknown"}
+        return pool.health()
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(pool.aclose() for pool in self._pools.values()))
+        self._pools.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pool.stats() for name, pool in self._pools.items()}
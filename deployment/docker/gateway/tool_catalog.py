@@ -0,0 +1,170 @@
+"""
+Cached aggregation of MCP tool listings.
+
+Tool listings change rarely, so the gateway keeps them in memory per
+service. A listing is served as-is while fresh; once it is older than
+``ttl`` it is still served (stale-while-revalidate) while a refresh runs
+in the background, until it is older than ``ttl + stale_ttl``. Services
+without a usable listing are queried concurrently, bounded by a global
+deadline, and whatever has not answered by then is reported as partial.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("enhanced_gateway.tools")
+
+ToolFetcher = Callable[[Any], Awaitable[Any]]
+
+
+@dataclass
+class CatalogEntry:
+    """Last known tool listing of one service."""
+
+    tools: Any
+    fetched_at: float
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class ToolCatalog:
+    """
+    In-memory tool listings per service, refreshed in the background.
+
+    ``fetch`` returns the listing of one service and raises on failure;
+    failed refreshes keep the previous listing.
+    """
+
+    def __init__(
+        self,
+        fetch: ToolFetcher,
+        ttl: float = 60.0,
+        stale_ttl: float = 300.0,
+        deadline: float = 2.0,
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.deadline = deadline
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._errors: Dict[str, str] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.timeouts = 0
+
+    def _refresh(self, service: Any) -> asyncio.Task:
+        """Start a refresh of one service unless one is already running."""
+        task = self._refreshing.get(service.name)
+        if task is None:
+            task = asyncio.create_task(self._fetch_into_cache(service))
+            self._refreshing[service.name] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(service.name, None))
+        return task
+
+    async def _fetch_into_cache(self, service: Any) -> None:
+        try:
+            tools = await self.fetch(service)
+        except Exception as e:
+            logger.warning(f"Refreshing tools of {service.name} failed: {e}")
+            self._errors[service.name] = str(e)
+            return
+        self._entries[service.name] = CatalogEntry(tools, time.monotonic())
+        self._errors.pop(service.name, None)
+
+    async def get_all(self, services: Iterable[Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Get the tool listings of ``services`` and the names of services left out.
+
+        Cached listings are returned immediately. Missing or expired ones
+        are fetched concurrently and waited for at most ``deadline``
+        seconds; fetches still running after that complete in the
+        background and land in the cache for the next call.
+        """
+        results: Dict[str, Any] = {}
+        pending: Dict[str, asyncio.Task] = {}
+
+        for service in services:
+            entry = self._entries.get(service.name)
+            age = entry.age() if entry else None
+            if entry is not None and age < self.ttl:
+                self.hits += 1
+                results[service.name] = entry.tools
+            elif entry is not None and age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                results[service.name] = entry.tools
+                self._refresh(service)
+            else:
+                self.misses += 1
+                pending[service.name] = self._refresh(service)
+
+        if pending:
+            # shield keeps the fetches running when the deadline passes
+            await asyncio.wait(
+                [asyncio.shield(task) for task in pending.values()], timeout=self.deadline
+            )
+
+        partial = []
+        for name, task in pending.items():
+            entry = self._entries.get(name)
+            if task.done() and entry is not None:
+                results[name] = entry.tools
+            elif task.done():
+                results[name] = {"error": self._errors.get(name, "unavailable")}
+            else:
+                self.timeouts += 1
+                results[name] = {"error": f"no response within {self.deadline}s"}
+                partial.append(name)
+        return results, partial
+
+    async def sync(self, services: Iterable[Any]) -> None:
+        """
+        Bring the catalog in line with the current set of services.
+
+        Listings of services that disappeared are dropped and listings
+        that are missing or past ``ttl`` are refreshed in the background.
+        """
+        services = list(services)
+        names = {service.name for service in services}
+        for name in list(self._entries):
+            if name not in names:
+                del self._entries[name]
+                self._errors.pop(name, None)
+
+        for service in services:
+            entry = self._entries.get(service.name)
+            if entry is None or entry.age() >= self.ttl:
+                self._refresh(service)
+
+    async def run(self, services: Callable[[], Iterable[Any]], interval: float) -> None:
+        """Keep the catalog warm by syncing with ``services()`` every ``interval`` seconds."""
+        while True:
+            try:
+                await self.sync(services())
+            except Exception as e:
+                logger.error(f"Tool catalog sync failed: {e}")
+            await asyncio.sleep(interval)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget the listing of one service, or of all services."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters and the age of each listing."""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "timeouts": self.timeouts,
+            "refreshing": sorted(self._refreshing),
+            "ages": {name: round(entry.age(), 1) for name, entry in self._entries.items()},
+            "errors": dict(self._errors),
+        }
@@ -0,0 +1,184 @@
+"""
+Pooled HTTP clients for upstream services.
+
+The gateway keeps one long-lived httpx client per discovered service, so
+proxy and tool calls reuse keep-alive connections instead of opening a
+new connection and pool per request. Timeouts and connection limits
+can be tuned per service in its manifest:
+
+    capabilities:
+      api:
+        timeouts:          # seconds
+          connect: 2
+          read: 30
+          write: 30
+          pool: 5
+        connection_limits:
+          max_connections: 100
+          max_keepalive_connections: 20
+          keepalive_expiry: 30
+        http2: true
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from circuit import BreakerSet
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 support in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger("enhanced_gateway.upstream")
+
+DEFAULT_TIMEOUTS = {"connect": 5.0, "read": 30.0, "write": 30.0, "pool": 5.0}
+DEFAULT_LIMITS = {"max_connections": 100, "max_keepalive_connections": 20, "keepalive_expiry": 30.0}
+
+# Connection-specific headers that must not be forwarded by a proxy (RFC 9110 section 7.6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+def forward_headers(headers: Iterable[Tuple[str, str]], drop: Iterable[str] = ()) -> List[Tuple[str, str]]:
+    """
+    Filter hop-by-hop headers, plus any named in ``connection`` or ``drop``.
+
+    Headers are kept as a list so repeated ones (e.g. ``set-cookie``) survive.
+    """
+    headers = list(headers)
+    excluded = HOP_BY_HOP_HEADERS | {name.lower() for name in drop}
+    for name, value in headers:
+        if name.lower() == "connection":
+            excluded |= {token.strip().lower() for token in value.split(",")}
+    return [(name, value) for name, value in headers if name.lower() not in excluded]
+
+
+def _api_settings(service: Any) -> Dict[str, Any]:
+    capabilities = getattr(service, "capabilities", None) or {}
+    return capabilities.get("api", {}) or {}
+
+
+def service_base_url(service: Any) -> str:
+    """Get the base URL of a service's API."""
+    return f"http://{service.name}:{service.api_port}"
+
+
+def origin(url: httpx.URL) -> str:
+    """Scheme, host and port of a URL, as used to key endpoint breakers."""
+    return f"{url.scheme}://{url.netloc.decode('ascii')}"
+
+
+class UpstreamPool:
+    """
+    One shared ``httpx.AsyncClient`` per upstream service.
+
+    Clients are created on first use and closed together on shutdown.
+    HTTP/2 is negotiated when the ``h2`` package is installed and the
+    upstream supports it (over TLS); otherwise keep-alive HTTP/1.1 is used.
+
+    Every response and transport error is reported to the circuit breaker
+    of the endpoint that handled it.
+    """
+
+    def __init__(self, breakers: Optional[BreakerSet] = None):
+        self.breakers = breakers or BreakerSet()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._requests: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+
+    def client_for(self, service: Any) -> httpx.AsyncClient:
+        """Get the shared client for a service, creating it on first use."""
+        client = self._clients.get(service.name)
+        if client is None or client.is_closed:
+            client = self._create_client(service)
+            self._clients[service.name] = client
+        return client
+
+    def _create_client(self, service: Any) -> httpx.AsyncClient:
+        settings = _api_settings(service)
+        timeouts = {**DEFAULT_TIMEOUTS, **(settings.get("timeouts") or {})}
+        limits = {**DEFAULT_LIMITS, **(settings.get("connection_limits") or {})}
+        http2 = HTTP2_AVAILABLE and settings.get("http2", True)
+
+        logger.info(f"Creating pooled client for {service.name} (http2={http2}, limits={limits})")
+        return httpx.AsyncClient(
+            base_url=service_base_url(service),
+            timeout=httpx.Timeout(**timeouts),
+            limits=httpx.Limits(**limits),
+            http2=http2,
+            event_hooks={
+                "request": [self._count_request(service.name)],
+                "response": [self._count_response(service.name)],
+            },
+        )
+
+    def _count_request(self, name: str):
+        async def hook(request: httpx.Request) -> None:
+            self._requests[name] = self._requests.get(name, 0) + 1
+        return hook
+
+    def _count_response(self, name: str):
+        async def hook(response: httpx.Response) -> None:
+            breaker = self.breakers.get(origin(response.request.url))
+            if response.status_code >= 500:
+                self._errors[name] = self._errors.get(name, 0) + 1
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return hook
+
+    def record_error(self, name: str, endpoint_url: str) -> None:
+        """Count a request that failed without a response (timeout, refused connection)."""
+        self._errors[name] = self._errors.get(name, 0) + 1
+        self.breakers.get(origin(httpx.URL(endpoint_url))).record_failure()
+
+    async def remove(self, name: str) -> None:
+        """Close and forget a service's client, e.g. after it was deregistered."""
+        client = self._clients.pop(name, None)
+        if client is not None:
+            await client.aclose()
+
+    async def aclose(self) -> None:
+        """Close every client."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-service request counters and connection pool usage."""
+        stats = {}
+        for name, client in self._clients.items():
+            stats[name] = {
+                "base_url": str(client.base_url),
+                "requests": self._requests.get(name, 0),
+                "errors": self._errors.get(name, 0),
+                **self._pool_usage(client),
+            }
+        return stats
+
+    @staticmethod
+    def _pool_usage(client: httpx.AsyncClient) -> Dict[str, Optional[int]]:
+        # httpx does not expose pool state publicly; read it from httpcore when present
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {"connections": None, "idle_connections": None, "http2_connections": None}
+        return {
+            "connections": len(connections),
+            "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+            "http2_connections": sum(
+                1 for connection in connections if "HTTP/2" in connection.info()
+            ),
+        }
@@ -0,0 +1,314 @@
+"""
+In-memory search index for AI registry use cases.
+
+Every entry's text fields are tokenized once, into an inverted index
+plus category and company lookups. Queries are ranked with BM25, with
+matches in the company, use case, category and tags weighted above the
+implementation text. The last query term also matches as a prefix, so
+partial words ("predict", "fin") still find entries.
+
+Each term's postings hold the entry's precomputed BM25 term weight and
+are also kept sorted by that weight. A query over long postings lists
+reads the best postings of each term first and stops once no unread
+entry can reach the top ``limit`` (the threshold algorithm) instead of
+scoring every match; short lists are simply scored in full.
+
+Adding, updating or removing an entry only touches that entry's
+postings, so the index stays current without full rebuilds. Weights
+depend on the average entry length; they are recomputed when it drifts
+by more than a quarter.
+"""
+
+import bisect
+import heapq
+import itertools
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Recompute term weights once the average entry length moves this much
+REWEIGH_DRIFT = 0.25
+
+# Queries matching fewer postings than this are scored exhaustively
+EXHAUSTIVE_POSTINGS = 4096
+
+# A partial last term matches at most this many indexed terms, and needs two characters
+MAX_PREFIX_TERMS = 32
+MIN_PREFIX_LENGTH = 2
+
+# Term frequency multiplier per field
+FIELD_WEIGHTS = {
+    "company": 2.0,
+    "use_case": 3.0,
+    "category": 2.0,
+    "tags": 2.0,
+    "implementation": 1.0,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _field_text(entry: Dict[str, Any], field: str) -> str:
+    value = entry.get(field) or ""
+    return " ".join(value) if isinstance(value, list) else str(value)
+
+
+class RegistryIndex:
+    """
+    Inverted index over registry entries with BM25 ranking.
+
+    Entries are identified by the integer id returned from ``add``;
+    results keep insertion order when scores tie. With ``resolve``, the
+    entries passed to the constructor are not kept in memory: they are
+    fetched by id, which is their position, whenever they are needed.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Dict[str, Any]] = (),
+        k1: float = 1.2,
+        b: float = 0.75,
+        resolve: Optional[Callable[[int], Dict[str, Any]]] = None,
+    ):
+        self.k1 = k1
+        self.b = b
+        self._resolve = resolve
+        # Entry id -> entry, or None when it is fetched through ``resolve``
+        self._entries: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._next_id = 0
+        # term -> {entry id: weighted term frequency}
+        self._frequencies: Dict[str, Dict[int, float]] = {}
+        # term -> {entry id: BM25 term weight}, and the same sorted by (-weight, id)
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._ranked: Dict[str, List[Tuple[float, int]]] = {}
+        # Sorted vocabulary for prefix matching
+        self._terms: List[str] = []
+        self._lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        # Average length the current weights were computed with
+        self._weighed_length = 0.0
+        self._categories: Dict[str, Set[int]] = {}
+        self._category_names: Dict[str, str] = {}
+        self._companies: Dict[str, Set[int]] = {}
+        self.add_many(entries, keep=resolve is None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        return [self._entry(entry_id) for entry_id in self._entries]
+
+    def _entry(self, entry_id: int) -> Dict[str, Any]:
+        entry = self._entries[entry_id]
+        return entry if entry is not None else self._resolve(entry_id)
+
+    # Maintenance
+
+    def add(self, entry: Dict[str, Any]) -> int:
+        """Index a new entry and return its id."""
+        entry_id = self._next_id
+        self._next_id += 1
+        self._index(entry_id, entry)
+        return entry_id
+
+    def add_many(self, entries: Iterable[Dict[str, Any]], keep: bool = True) -> List[int]:
+        """Index several entries; into an empty index, weights are computed once at the end."""
+        if self._entries:
+            return [self.add(entry) for entry in entries]
+        ids = []
+        for entry in entries:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index(entry_id, entry, weigh=False, keep=keep)
+            ids.append(entry_id)
+        if self._entries:
+            self._reweigh(self._total_length / len(self._entries))
+        return ids
+
+    def update(self, entry_id: int, entry: Dict[str, Any]) -> None:
+        """Replace the entry with ``entry_id``, re-indexing only that entry."""
+        self.remove(entry_id)
+        self._index(entry_id, entry)
+
+    def remove(self, entry_id: int) -> None:
+        if entry_id not in self._entries:
+            return
+        entry = self._entry(entry_id)
+        del self._entries[entry_id]
+        for term in self._weighted_terms(entry):
+            postings = self._postings[term]
+            ranked = self._ranked[term]
+            del ranked[bisect.bisect_left(ranked, (-postings.pop(entry_id), entry_id))]
+            del self._frequencies[term][entry_id]
+            if not postings:
+                del self._postings[term]
+                del self._ranked[term]
+                del self._frequencies[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+        self._total_length -= self._lengths.pop(entry_id)
+        self._check_drift()
+
+        category = _field_text(entry, "category").lower()
+        members = self._categories.get(category)
+        if members is not None:
+            members.discard(entry_id)
+            if not members:
+                del self._categories[category]
+                del self._category_names[category]
+        company = _field_text(entry, "company").lower()
+        members = self._companies.get(company)
+        if members is not None:
+            members.discard(entry_id)
+            if not members:
+                del self._companies[company]
+
+    def _weighted_terms(self, entry: Dict[str, Any]) -> Counter:
+        terms: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(_field_text(entry, field)):
+                terms[term] += weight
+        return terms
+
+    def _weight(self, frequency: float, length: float) -> float:
+        norm = self.k1 * (1 - self.b + self.b * length / (self._weighed_length or length or 1.0))
+        return frequency * (self.k1 + 1) / (frequency + norm)
+
+    def _check_drift(self) -> None:
+        if not self._entries:
+            self._weighed_length = 0.0
+            return
+        average = self._total_length / len(self._entries)
+        if not self._weighed_length:
+            self._weighed_length = average
+        elif abs(average - self._weighed_length) > REWEIGH_DRIFT * self._weighed_length:
+            self._reweigh(average)
+
+    def _reweigh(self, average: float) -> None:
+        self._weighed_length = average
+        for term, frequencies in self._frequencies.items():
+            postings = self._postings[term] = {
+                entry_id: self._weight(frequency, self._lengths[entry_id])
+                for entry_id, frequency in frequencies.items()
+            }
+            self._ranked[term] = sorted((-weight, entry_id) for entry_id, weight in postings.items())
+
+    def _index(self, entry_id: int, entry: Dict[str, Any], weigh: bool = True, keep: bool = True) -> None:
+        self._entries[entry_id] = entry if keep else None
+        terms = self._weighted_terms(entry)
+        length = sum(terms.values())
+        self._lengths[entry_id] = length
+        self._total_length += length
+        if weigh:
+            self._check_drift()
+        for term, frequency in terms.items():
+            frequencies = self._frequencies.get(term)
+            if frequencies is None:
+                frequencies = self._frequencies[term] = {}
+                self._postings[term] = {}
+                self._ranked[term] = []
+                bisect.insort(self._terms, term)
+            frequencies[entry_id] = frequency
+            if weigh:
+                weight = self._weight(frequency, length)
+                self._postings[term][entry_id] = weight
+                bisect.insort(self._ranked[term], (-weight, entry_id))
+
+        category = _field_text(entry, "category")
+        self._categories.setdefault(category.lower(), set()).add(entry_id)
+        self._category_names.setdefault(category.lower(), category)
+        self._companies.setdefault(_field_text(entry, "company").lower(), set()).add(entry_id)
+
+    # Lookups
+
+    def categories(self) -> List[str]:
+        return sorted(self._category_names.values())
+
+    def find_company(self, company: str) -> Optional[Dict[str, Any]]:
+        members = self._companies.get(company.lower())
+        return self._entry(min(members)) if members else None
+
+    def _category_members(self, category: str) -> Set[int]:
+        category = category.lower()
+        if category in self._categories:
+            return self._categories[category]
+        # Partial names match any category containing them, as before
+        matches = [ids for name, ids in self._categories.items() if category in name]
+        if len(matches) == 1:
+            return matches[0]
+        return set().union(*matches)
+
+    def _expand(self, term: str) -> List[str]:
+        if len(term) < MIN_PREFIX_LENGTH:
+            return [term] if term in self._postings else []
+        start = bisect.bisect_left(self._terms, term)
+        end = bisect.bisect_left(self._terms, term + "\uffff", start, min(start + MAX_PREFIX_TERMS, len(self._terms)))
+        return self._terms[start:end]
+
+    def search(self, query: str = "", category: str = "", limit: int = 10) -> List[Dict[str, Any]]:
+        """Best ``limit`` entries for ``query``, optionally only within ``category``."""
+        if limit <= 0:
+            return []
+        allowed = self._category_members(category) if category else None
+        terms = tokenize(query)
+        if not terms:
+            ids = (entry_id for entry_id in self._entries if allowed is None or entry_id in allowed)
+            return [self._entry(entry_id) for entry_id in itertools.islice(ids, limit)]
+
+        # The last term may still be being typed
+        query_terms = {term: 1.0 for term in terms[:-1] if term in self._postings}
+        for term in self._expand(terms[-1]):
+            query_terms.setdefault(term, 1.0 if term == terms[-1] else 0.5)
+        if not query_terms:
+            return []
+
+        count = len(self._entries)
+        lists = []
+        for term, boost in query_terms.items():
+            postings = self._postings[term]
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            lists.append((boost * idf, self._ranked[term], postings))
+
+        if sum(len(postings) for _, _, postings in lists) <= EXHAUSTIVE_POSTINGS:
+            scores: Dict[int, float] = {}
+            for factor, _, postings in lists:
+                for entry_id, weight in postings.items():
+                    if allowed is None or entry_id in allowed:
+                        scores[entry_id] = scores.get(entry_id, 0.0) + factor * weight
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [self._entry(entry_id) for entry_id, _ in top]
+
+        # Read every term's postings best-first, one rank at a time. Entries
+        # not seen yet score at most the sum of the weights at the current
+        # rank, so once the k-th best score reaches that, nothing can beat it.
+        best: List[Tuple[float, int]] = []  # min-heap of (score, -entry id)
+        seen: Set[int] = set()
+        depth = 0
+        while True:
+            threshold = 0.0
+            remaining = False
+            for factor, ranked, _ in lists:
+                if depth >= len(ranked):
+                    continue
+                remaining = True
+                weight, entry_id = ranked[depth]
+                threshold -= factor * weight
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                if allowed is not None and entry_id not in allowed:
+                    continue
+                score = sum(f * postings.get(entry_id, 0.0) for f, _, postings in lists)
+                if len(best) < limit:
+                    heapq.heappush(best, (score, -entry_id))
+                elif (score, -entry_id) > best[0]:
+                    heapq.heapreplace(best, (score, -entry_id))
+            if not remaining or (len(best) >= limit and best[0][0] >= threshold):
+                break
+            depth += 1
+
+        return [self._entry(-entry_id) for _, entry_id in sorted(best, reverse=True)]
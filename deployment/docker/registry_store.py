@@ -0,0 +1,185 @@
+"""
+On-disk data for the AI registry server.
+
+Registry entries live in a compact binary file that the server maps into
+memory instead of parsing at startup:
+
+    magic (8 bytes) | entry count (uint64) | count + 1 offsets (uint64) | entries
+
+Each entry is UTF-8 JSON; entry ``i`` spans ``offsets[i]:offsets[i + 1]``
+relative to the start of the entries. Opening the file reads only the
+header, entries are decoded when accessed, and every server process
+mapping the same file shares its pages through the OS page cache. The
+search index keeps only term statistics per entry and decodes entries
+from the file when they are returned.
+
+``RegistrySource`` keeps the current entries and their search index and
+reloads both when the file changes. A reload builds the new index in a
+worker thread and then swaps it in with one assignment, so tool calls in
+progress finish on the snapshot they started with.
+
+Convert a JSON list of entries with:
+
+    python registry_store.py registry.json registry.bin
+"""
+
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from registry_index import RegistryIndex
+
+logger = logging.getLogger("ai_registry_mcp.store")
+
+MAGIC = b"AIREG\x00\x01\x00"
+HEADER = struct.Struct("<8sQ")
+OFFSET = struct.Struct("<Q")
+
+
+class RegistryStore:
+    """Read-only, memory-mapped registry file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self._count = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a registry data file")
+            self._data_start = HEADER.size + OFFSET.size * (self._count + 1)
+            if self._offset(self._count) > len(self._map):
+                raise ValueError(f"{path} is truncated")
+        except (struct.error, ValueError) as e:
+            self._map.close()
+            raise ValueError(f"Invalid registry data file {path}: {e}")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _offset(self, index: int) -> int:
+        return self._data_start + OFFSET.unpack_from(self._map, HEADER.size + OFFSET.size * index)[0]
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return json.loads(self._map[self._offset(index):self._offset(index + 1)])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._count):
+            yield self[index]
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def write_store(path: str, entries: Iterable[Dict[str, Any]]) -> int:
+    """Write ``entries`` to a registry file, replacing any existing file atomically."""
+    records = [json.dumps(entry, separators=(",", ":"), ensure_ascii=False).encode("utf-8") for entry in entries]
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(records)))
+        f.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+        f.writelines(records)
+    # Readers keep the old file mapped until they reload
+    os.replace(tmp, path)
+    return len(records)
+
+
+class RegistrySnapshot:
+    """Entries and search index from one version of the registry file."""
+
+    def __init__(self, index: RegistryIndex, store: Optional[RegistryStore] = None, version: Any = None):
+        self.index = index
+        self.store = store
+        self.version = version
+
+
+class RegistrySource:
+    """
+    The registry the server answers from, reloaded when its file changes.
+
+    Without a ``path`` (or until the file exists, or if it cannot be read
+    at startup) the built-in ``fallback`` entries are served. Once loaded,
+    the data is kept if the file is removed or a new version is unreadable.
+    """
+
+    def __init__(self, path: Optional[str], fallback: Iterable[Dict[str, Any]] = ()):
+        self.path = path
+        self.fallback = list(fallback)
+        self.current: Optional[RegistrySnapshot] = None
+        self.reloads = 0
+        self._ready = asyncio.Event()
+
+    def _file_version(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except (OSError, TypeError):
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _build(self, version: Any) -> RegistrySnapshot:
+        if version is None:
+            return RegistrySnapshot(RegistryIndex(self.fallback))
+        if self.path.endswith(".json"):
+            # Plain JSON lists are handy in development, but are parsed into memory
+            with open(self.path, "rb") as f:
+                return RegistrySnapshot(RegistryIndex(json.load(f)), None, version)
+        store = RegistryStore(self.path)
+        return RegistrySnapshot(RegistryIndex(store, resolve=store.__getitem__), store, version)
+
+    async def load(self) -> RegistrySnapshot:
+        """(Re)load the registry if its file changed and return the current snapshot."""
+        version = self._file_version()
+        if self.current is not None and (version is None or version == self.current.version):
+            return self.current
+        try:
+            snapshot = await asyncio.to_thread(self._build, version)
+        except (OSError, ValueError) as e:
+            if self.current is None:
+                logger.error(f"Serving built-in registry data; reading {self.path} failed: {e}")
+                snapshot = await asyncio.to_thread(self._build, None)
+                # Retry once the file changes
+                snapshot.version = version
+            else:
+                logger.error(f"Keeping the loaded registry; reading {self.path} failed: {e}")
+                # Do not retry until the file changes again
+                self.current.version = version
+                return self.current
+        if self.current is not None:
+            self.reloads += 1
+        self.current = snapshot
+        self._ready.set()
+        logger.info(f"Loaded {len(snapshot.index)} registry entries from {self.path if version else 'built-in data'}")
+        return snapshot
+
+    async def snapshot(self) -> RegistrySnapshot:
+        """The registry to answer one call from, waiting for the first load if needed."""
+        await self._ready.wait()
+        return self.current
+
+    async def watch(self, interval: float) -> None:
+        """Reload whenever the file changes, checking every ``interval`` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Registry reload failed: {e}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python registry_store.py <entries.json> <registry.bin>")
+    with open(sys.argv[1], "rb") as f:
+        count = write_store(sys.argv[2], json.load(f))
+    print(f"Wrote {count} entries to {sys.argv[2]}")
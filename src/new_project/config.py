@@ -31,6 +31,11 @@ class AppConfig:
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
     api_port: int = int(os.getenv("API_PORT", "8000"))
     api_prefix: str = "/api/v1"
+    gateway_workers: int = int(os.getenv("GATEWAY_WORKERS", "0"))  # 0 = one per CPU
+    gateway_reuse_port: bool = os.getenv("GATEWAY_REUSE_PORT", "False").lower() == "true"
+    gateway_graceful_timeout: int = int(os.getenv("GATEWAY_GRACEFUL_TIMEOUT", "30"))  # seconds
+    gateway_restart_backoff: float = float(os.getenv("GATEWAY_RESTART_BACKOFF", "1"))  # seconds, doubled per startup crash
+    gateway_max_startup_failures: int = int(os.getenv("GATEWAY_MAX_STARTUP_FAILURES", "5"))
     
     # Security
     secret_key: Optional[str] = os.getenv("SECRET_KEY")
@@ -40,6 +45,35 @@ class AppConfig:
     sdk_log_level: str = os.getenv("SDK_LOG_LEVEL", "INFO")
     sdk_enable_monitoring: bool = os.getenv("SDK_ENABLE_MONITORING", "True").lower() == "true"
     sdk_max_concurrency: int = int(os.getenv("SDK_MAX_CONCURRENCY", "10"))
+    sdk_retry_after: int = int(os.getenv("SDK_RETRY_AFTER", "1"))  # seconds
+    workflow_cache_size: int = int(os.getenv("WORKFLOW_CACHE_SIZE", "128"))
+    workflow_preload: list = field(default_factory=lambda: [
+        name for name in os.getenv("WORKFLOW_PRELOAD", "get_status").split(",") if name
+    ])  # workflows imported and built at startup
+    result_cache_size: int = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+    result_cache_ttl: float = float(os.getenv("RESULT_CACHE_TTL", "1.0"))  # seconds, for workflows that opt in
+    # Profiling starts process-wide memory tracing and writes a file per run; keep it off in production
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    profile_dir: str = os.getenv("PROFILE_DIR", "data/outputs/profiles")
+    profile_max_files: int = int(os.getenv("PROFILE_MAX_FILES", "100"))  # oldest profiles are deleted beyond this
+    job_workers: int = int(os.getenv("JOB_WORKERS", "4"))
+    job_queue_size: int = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+    job_retention: int = int(os.getenv("JOB_RETENTION", "1000"))  # finished runs kept for polling
+    job_slot_timeout: float = float(os.getenv("JOB_SLOT_TIMEOUT", "300"))  # seconds a run may retry for an execution slot
+    # Admission control: "class:weight:max_queue_depth" entries and "workflow:class" assignments
+    admission_classes: dict = field(default_factory=lambda: {
+        name: (float(weight), int(depth))
+        for name, weight, depth in (
+            entry.split(":") for entry in os.getenv("ADMISSION_CLASSES", "interactive:8:100,batch:1:50").split(",") if entry
+        )
+    })
+    admission_default_class: str = os.getenv("ADMISSION_DEFAULT_CLASS", "batch")
+    admission_queue_timeout: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))  # seconds
+    workflow_priorities: dict = field(default_factory=lambda: dict(
+        entry.split(":") for entry in os.getenv("WORKFLOW_PRIORITIES", "get_status:interactive").split(",") if entry
+    ))
+    tenant_header: str = os.getenv("TENANT_HEADER", "X-Tenant-ID")
+    tenant_max_concurrency: int = int(os.getenv("TENANT_MAX_CONCURRENCY", "0"))  # 0 = unlimited
     
     # Service Configuration
     rag_enabled: bool = os.getenv("RAG_ENABLED", "True").lower() == "true"
@@ -4,6 +4,7 @@ Core business logic package.
 This package contains the core business logic for the app:
 - models.py: Data models and entities
 - services.py: Business logic and operations
+- search.py: Indexed search used by the services
 """
 
 from .models import BaseModel
@@ -0,0 +1,188 @@
+"""
+Admission control for workflow executions.
+
+Execution slots are shared between priority classes. When every slot is
+busy, requests wait in a queue per class and freed slots are handed out
+by weighted fair queuing, so a burst in a low-weight class (e.g. batch
+analytics) cannot starve a high-weight one (e.g. interactive status
+checks). Each tenant can be capped to a number of concurrent runs, and a
+class sheds new requests once its queue is full.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional, Tuple
+
+from .executor import ExecutorSaturatedError
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejectedError(ExecutorSaturatedError):
+    """Raised when a request is shed or waits longer than the queue timeout."""
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(retry_after, f"Request rejected by admission control: {reason}")
+        self.reason = reason
+
+
+@dataclass
+class PriorityClass:
+    """A class of workflows sharing one queue and one fair-share weight."""
+
+    name: str
+    weight: float = 1.0
+    max_queue_depth: int = 100
+    # Stride-scheduling state: lower pass value is served first
+    pass_value: float = 0.0
+    waiters: Deque[Tuple[asyncio.Future, Optional[str]]] = field(default_factory=deque)
+    active: int = 0
+    admitted: int = 0
+    shed: int = 0
+    timed_out: int = 0
+
+
+class AdmissionController:
+    """
+    Hands out ``capacity`` execution slots across priority classes.
+
+    Slots are granted immediately while free; otherwise the request
+    queues in its class. Whenever a slot frees up, the eligible class with
+    the lowest pass value is served and its pass advances by
+    ``1 / weight``, so classes receive slots in proportion to their
+    weights while they all have waiters.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        classes: Dict[str, Tuple[float, int]],
+        default_class: str,
+        tenant_limit: int = 0,
+        queue_timeout: float = 30.0,
+        retry_after: int = 1,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if default_class not in classes:
+            raise ValueError(f"Default priority class '{default_class}' is not configured")
+        self.capacity = capacity
+        self.default_class = default_class
+        self.tenant_limit = tenant_limit
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.classes: Dict[str, PriorityClass] = {
+            name: PriorityClass(name, weight, depth) for name, (weight, depth) in classes.items()
+        }
+        self.active = 0
+        self._tenants: Dict[str, int] = {}
+
+    def _class_for(self, name: Optional[str]) -> PriorityClass:
+        return self.classes.get(name or self.default_class) or self.classes[self.default_class]
+
+    def _tenant_allowed(self, tenant: Optional[str]) -> bool:
+        if not self.tenant_limit or tenant is None:
+            return True
+        return self._tenants.get(tenant, 0) < self.tenant_limit
+
+    def _grant(self, priority: PriorityClass, tenant: Optional[str]) -> None:
+        self.active += 1
+        priority.active += 1
+        priority.admitted += 1
+        if tenant is not None:
+            self._tenants[tenant] = self._tenants.get(tenant, 0) + 1
+
+    async def acquire(self, priority_name: Optional[str] = None, tenant: Optional[str] = None) -> str:
+        """
+        Wait for an execution slot and return the priority class it was granted under.
+
+        Raises:
+            AdmissionRejectedError: If the class queue is full or the wait times out.
+        """
+        priority = self._class_for(priority_name)
+
+        if self.active < self.capacity and not priority.waiters and self._tenant_allowed(tenant):
+            self._grant(priority, tenant)
+            return priority.name
+
+        if len(priority.waiters) >= priority.max_queue_depth:
+            priority.shed += 1
+            raise AdmissionRejectedError(self.retry_after, f"{priority.name} queue is full")
+
+        if not priority.waiters:
+            # A class returning from idle must not cash in credit built up while idle
+            busy = [other.pass_value for other in self.classes.values() if other.waiters]
+            if busy:
+                priority.pass_value = max(priority.pass_value, min(busy))
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (future, tenant)
+        priority.waiters.append(waiter)
+        # Waiters held back by their tenant limit must not block this one from a free slot
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # Granted in the same tick the timeout fired; keep the slot
+                return priority.name
+            priority.waiters.remove(waiter)
+            priority.timed_out += 1
+            raise AdmissionRejectedError(self.retry_after, f"waited over {self.queue_timeout}s")
+        except asyncio.CancelledError:
+            if future.done():
+                self.release(priority.name, tenant)
+            else:
+                priority.waiters.remove(waiter)
+            raise
+        return priority.name
+
+    def release(self, priority_name: str, tenant: Optional[str] = None) -> None:
+        """Return a slot acquired with ``acquire`` and hand it to the next waiter."""
+        priority = self._class_for(priority_name)
+        self.active -= 1
+        priority.active -= 1
+        if tenant is not None:
+            remaining = self._tenants.get(tenant, 1) - 1
+            if remaining:
+                self._tenants[tenant] = remaining
+            else:
+                self._tenants.pop(tenant, None)
+        self._dispatch()
+
+    def _next_waiter(self, priority: PriorityClass) -> Optional[Tuple[asyncio.Future, Optional[str]]]:
+        for waiter in priority.waiters:
+            if self._tenant_allowed(waiter[1]):
+                return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        while self.active < self.capacity:
+            best = None
+            for priority in self.classes.values():
+                if not priority.waiters or (best and priority.pass_value >= best[0].pass_value):
+                    continue
+                waiter = self._next_waiter(priority)
+                if waiter is not None:
+                    best = (priority, waiter)
+            if best is None:
+                return
+
+            priority, waiter = best
+            priority.waiters.remove(waiter)
+            priority.pass_value += 1.0 / priority.weight
+            self._grant(priority, waiter[1])
+            waiter[0].set_result(None)
+
+    def stats(self) -> Dict[str, int]:
+        """Get admission counters, flattened per priority class."""
+        stats = {"active": self.active, "capacity": self.capacity}
+        for priority in self.classes.values():
+            stats[f"{priority.name}_active"] = priority.active
+            stats[f"{priority.name}_queued"] = len(priority.waiters)
+            stats[f"{priority.name}_admitted"] = priority.admitted
+            stats[f"{priority.name}_shed"] = priority.shed
+            stats[f"{priority.name}_timed_out"] = priority.timed_out
+        return stats
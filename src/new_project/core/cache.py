@@ -0,0 +1,123 @@
+"""
+Result caching for idempotent workflow executions.
+
+Workflows that opt in have their results cached by a canonical hash of
+the request body. Identical requests that arrive while a run is still in
+progress share that run instead of starting their own.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+def canonical_key(namespace: str, *parts: Any) -> str:
+    """
+    Build a cache key from a namespace and a hash of JSON-serializable parts.
+
+    The hash does not depend on dict ordering, and keys of one namespace
+    share the ``"{namespace}:"`` prefix so they can be invalidated together.
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class ResultCache:
+    """
+    TTL and LRU bounded cache with single-flight computation.
+
+    The first caller for a key runs ``compute``; concurrent callers for
+    the same key await that same run. Failed runs are not cached, and
+    their error is raised to every caller that was waiting on them.
+    """
+
+    HIT = "hit"
+    MISS = "miss"
+    COALESCED = "coalesced"
+
+    def __init__(self, max_size: int = 1024):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, "asyncio.Task[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get_or_compute(
+        self, key: str, ttl: float, compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, str]:
+        """
+        Return ``(value, status)`` where status is ``hit``, ``miss`` or ``coalesced``.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value, self.HIT
+            del self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            # Shield so one caller disconnecting does not cancel the shared run
+            return await asyncio.shield(task), self.COALESCED
+
+        self.misses += 1
+        task = asyncio.ensure_future(compute())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, ttl, done))
+        return await asyncio.shield(task), self.MISS
+
+    def _finish(self, key: str, ttl: float, task: "asyncio.Task[Any]") -> None:
+        if self._in_flight.get(key) is not task:
+            # Invalidated while running: the result may already be stale
+            return
+        del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._entries[key] = (time.monotonic() + ttl, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, prefix: Optional[str] = None) -> int:
+        """
+        Drop cached results whose key starts with ``prefix``, or all of them.
+
+        Runs still in progress for those keys finish for their current
+        callers, but their results are not cached and later callers start
+        a new run. Returns the number of cached results dropped.
+        """
+        if prefix is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._in_flight.clear()
+            return removed
+
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            del self._entries[key]
+        for key in [key for key in self._in_flight if key.startswith(prefix)]:
+            del self._in_flight[key]
+        return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "max_size": self.max_size,
+        }
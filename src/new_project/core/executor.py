@@ -0,0 +1,190 @@
+"""
+Non-blocking workflow execution for the gateway.
+
+The gateway's request handlers run on the event loop, so workflows must
+never be executed on it directly. This module runs workflows containing
+async nodes on the SDK's AsyncLocalRuntime and runs all other workflows
+on a bounded thread pool, rejecting new work once every slot is taken.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from kailash.nodes.base_async import AsyncNode
+from kailash.runtime.async_local import AsyncLocalRuntime
+from kailash.runtime.local import LocalRuntime
+from kailash.tracking.manager import TaskManager
+from kailash.tracking.models import TaskRun
+from kailash.workflow.graph import Workflow
+
+from .metrics import GatewayMetrics
+from .tracking import NodeCallback, NodeEventTaskManager
+
+if TYPE_CHECKING:
+    from .admission import AdmissionController
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when every execution slot is in use."""
+
+    def __init__(self, retry_after: int, message: str = "Workflow executor is saturated"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_async_workflow(workflow: Workflow) -> bool:
+    """Check whether a workflow contains nodes with native async execution."""
+    return any(isinstance(node, AsyncNode) for node in workflow._node_instances.values())
+
+
+class WorkflowExecutor:
+    """
+    Runs workflows without blocking the event loop.
+
+    At most ``max_concurrency`` workflows run at once across both runtimes.
+    Sync workflows get a thread from a pool of the same size, and each
+    thread keeps its own LocalRuntime so runs never share runtime state.
+
+    Without an admission controller, runs beyond ``max_concurrency`` are
+    rejected immediately. With one, they wait for a slot according to
+    its priority classes and tenant limits.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        retry_after: int = 1,
+        metrics: Optional[GatewayMetrics] = None,
+        admission: Optional["AdmissionController"] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if admission is not None and admission.capacity > max_concurrency:
+            raise ValueError("admission capacity cannot exceed max_concurrency")
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.metrics = metrics
+        self.admission = admission
+        self.in_flight = 0
+        self.rejected = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="workflow"
+        )
+        self._local = threading.local()
+        self._async_runtime = AsyncLocalRuntime(max_concurrent_nodes=max_concurrency)
+
+    def _get_runtime(self) -> LocalRuntime:
+        """Get the LocalRuntime owned by the current worker thread."""
+        runtime = getattr(self._local, "runtime", None)
+        if runtime is None:
+            runtime = LocalRuntime()
+            self._local.runtime = runtime
+        return runtime
+
+    def _execute_sync(
+        self,
+        workflow: Workflow,
+        parameters: Dict[str, Any],
+        task_manager: Optional[TaskManager],
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        # The request body is workflow input, never runtime options
+        return self._get_runtime().execute(workflow, task_manager=task_manager, parameters=parameters)
+
+    def _node_tracker(
+        self,
+        name: str,
+        on_node_finished: Optional[NodeCallback],
+        on_node_started: Optional[NodeCallback],
+    ) -> Optional[TaskManager]:
+        """Build a TaskManager reporting node progress to metrics and the caller."""
+        metrics = self.metrics
+        if metrics is None and on_node_finished is None and on_node_started is None:
+            return None
+
+        def callback(task: TaskRun) -> None:
+            if metrics is not None:
+                metrics.observe_node(name, task)
+            if on_node_finished is not None:
+                on_node_finished(task)
+
+        return NodeEventTaskManager(callback, on_node_started=on_node_started)
+
+    async def execute(
+        self,
+        workflow: Workflow,
+        parameters: Optional[Dict[str, Any]] = None,
+        name: str = "unknown",
+        on_node_finished: Optional[NodeCallback] = None,
+        on_node_started: Optional[NodeCallback] = None,
+        priority: Optional[str] = None,
+        tenant: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Execute a workflow and return ``(results, run_id)``.
+
+        ``name`` labels the run in metrics. ``on_node_started`` and
+        ``on_node_finished`` are called from the worker thread as each node
+        of a sync workflow starts and finishes; the async runtime does not
+        report node progress. ``priority`` and ``tenant`` are passed to the
+        admission controller when one is configured.
+
+        Raises:
+            ExecutorSaturatedError: If no slot is available; an
+                ``AdmissionRejectedError`` when an admission controller is used.
+        """
+        if self.admission is not None:
+            try:
+                granted = await self.admission.acquire(priority, tenant)
+            except ExecutorSaturatedError:
+                self.rejected += 1
+                raise
+        elif self.in_flight >= self.max_concurrency:
+            # The check and increment happen on the event loop thread, so no lock is needed
+            self.rejected += 1
+            raise ExecutorSaturatedError(self.retry_after)
+
+        parameters = parameters or {}
+        self.in_flight += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            if is_async_workflow(workflow):
+                result = await self._async_runtime.execute_workflow_async(
+                    workflow, inputs=parameters
+                )
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._pool,
+                    self._execute_sync,
+                    workflow,
+                    parameters,
+                    self._node_tracker(name, on_node_finished, on_node_started),
+                )
+            ok = True
+            return result
+        finally:
+            self.in_flight -= 1
+            if self.admission is not None:
+                self.admission.release(granted, tenant)
+            if self.metrics is not None:
+                self.metrics.observe_workflow(name, time.perf_counter() - start, ok)
+
+    def stats(self) -> Dict[str, int]:
+        """Get executor counters."""
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Wait for running workflows and release the worker threads."""
+        self._pool.shutdown(wait=True)
+        logger.info("Workflow executor shut down")
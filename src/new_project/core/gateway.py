@@ -6,15 +6,25 @@ to serve Kailash SDK workflows with health checks and monitoring.
 """
 
 import os
+import json
+import asyncio
 import logging
 from typing import Dict, Any, Optional
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from kailash.workflow.builder import WorkflowBuilder
-from kailash.runtime.local import LocalRuntime
+from .. import workflows
+from ..config import config
+from .admission import AdmissionController
+from .cache import ResultCache, canonical_key
+from .executor import ExecutorSaturatedError, WorkflowExecutor
+from .jobs import JobManager, JobQueueFullError
+from .metrics import GatewayMetrics, MetricsMiddleware, StatsCollector
+from .profiler import WorkflowProfiler
+from .registry import WorkflowRegistry
+from .serialization import NDJSON_MEDIA_TYPE, FastJSONResponse, iter_ndjson
 
 # Configure logging
 logging.basicConfig(
@@ -23,24 +33,95 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global runtime instance
-runtime = None
+# Global executor instance
+executor = None
+
+# Orders executions by priority class once every executor slot is busy
+admission = None
+
+# Background runs submitted via /workflows/{workflow_name}/submit
+job_manager = None
+
+# Built workflows are cached here and reused across requests
+workflow_registry = WorkflowRegistry(max_size=config.workflow_cache_size)
+workflow_registry.discover(workflows.__name__)
+
+# Results of workflows registered with a cache_ttl
+result_cache = ResultCache(max_size=config.result_cache_size)
+
+# Prometheus metrics served on /metrics
+gateway_metrics = GatewayMetrics()
+gateway_metrics.set_app_info("kailash_sdk_template", "1.0.0", os.getenv("ENVIRONMENT", "development"))
+gateway_metrics.track_in_flight(lambda: executor.in_flight if executor else 0)
+gateway_metrics.add_collector(
+    StatsCollector("workflow_cache", workflow_registry.stats, counters={"hits", "misses", "evictions"})
+)
+gateway_metrics.add_collector(
+    StatsCollector("workflow_result_cache", result_cache.stats, counters={"hits", "misses", "coalesced", "evictions"})
+)
+gateway_metrics.add_collector(
+    StatsCollector("workflow_executor", lambda: executor.stats() if executor else None, counters={"rejected"})
+)
+gateway_metrics.add_collector(
+    StatsCollector(
+        "workflow_admission",
+        lambda: admission.stats() if admission else None,
+        counters={
+            f"{name}_{counter}"
+            for name in config.admission_classes
+            for counter in ("admitted", "shed", "timed_out")
+        }
+    )
+)
+gateway_metrics.add_collector(
+    StatsCollector("workflow_jobs", lambda: job_manager.stats() if job_manager else None)
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
-    global runtime
+    global executor, job_manager, admission
     
     # Startup
     logger.info("Starting Kailash SDK Template Gateway")
-    runtime = LocalRuntime()
-    logger.info("LocalRuntime initialized")
+    admission = AdmissionController(
+        capacity=config.sdk_max_concurrency,
+        classes=config.admission_classes,
+        default_class=config.admission_default_class,
+        tenant_limit=config.tenant_max_concurrency,
+        queue_timeout=config.admission_queue_timeout,
+        retry_after=config.sdk_retry_after
+    )
+    executor = WorkflowExecutor(
+        max_concurrency=config.sdk_max_concurrency,
+        retry_after=config.sdk_retry_after,
+        metrics=gateway_metrics,
+        admission=admission
+    )
+    logger.info(f"WorkflowExecutor initialized (max_concurrency={config.sdk_max_concurrency})")
+    job_manager = JobManager(
+        executor,
+        workflow_registry,
+        workers=config.job_workers,
+        max_queue_size=config.job_queue_size,
+        max_retained=config.job_retention,
+        priorities=config.workflow_priorities,
+        slot_timeout=config.job_slot_timeout
+    )
+    await job_manager.start()
+    workflow_registry.warm(config.workflow_preload)
+    for spec in workflow_registry.list_workflows():
+        gateway_metrics.register_workflow(spec.name)
     
     yield
     
     # Shutdown
     logger.info("Shutting down Kailash SDK Template Gateway")
-    runtime = None
+    await job_manager.stop()
+    job_manager = None
+    executor.shutdown()
+    executor = None
+    admission = None
 
 # Create FastAPI app
 app = FastAPI(
@@ -50,6 +131,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Record request latency per route
+app.add_middleware(MetricsMiddleware, metrics=gateway_metrics)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -59,30 +143,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def create_sample_workflow() -> WorkflowBuilder:
-    """Create a sample workflow for testing"""
-    workflow = WorkflowBuilder()
-    
-    # Add a simple status check workflow
-    workflow.add_node(
-        "PythonCodeNode", 
-        "status_check",
-        {
-            "code": """
-import time
-import os
+def profiling_requested(request: Request) -> bool:
+    """Check the X-Profile header and the profile query flag"""
+    if not config.profiling_enabled:
+        return False
+    flag = request.headers.get("x-profile") or request.query_params.get("profile") or ""
+    return flag.lower() in ("1", "true", "yes")
 
-result = {
-    "status": "healthy",
-    "timestamp": time.time(),
-    "environment": os.getenv("ENVIRONMENT", "development"),
-    "message": "Kailash SDK Template is running successfully"
-}
-"""
-        }
-    )
-    
-    return workflow
+def workflow_response(request: Request, payload: Dict[str, Any]) -> Response:
+    """Encode a response carrying workflow results, as NDJSON if the client accepts it"""
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        header = {key: value for key, value in payload.items() if key != "results"}
+        return StreamingResponse(
+            iter_ndjson(header, payload.get("results") or {}),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+    return FastJSONResponse(content=payload)
 
 @app.get("/")
 async def root():
@@ -105,67 +181,179 @@ async def health_check():
 @app.post("/workflows/{workflow_name}/execute")
 async def execute_workflow(workflow_name: str, request: Request):
     """Execute a workflow by name"""
-    global runtime
+    global executor
     
-    if runtime is None:
+    if executor is None:
         raise HTTPException(status_code=500, detail="Runtime not initialized")
     
     try:
         # Get request body
         request_body = await request.json() if request.headers.get("content-type") == "application/json" else {}
         
-        # For demo purposes, we'll handle a few sample workflows
-        if workflow_name == "get_status":
-            workflow = create_sample_workflow()
-            results, run_id = runtime.execute(workflow.build(), **request_body)
+        spec = workflow_registry.get_spec(workflow_name)
+        if spec is not None:
+            workflow = workflow_registry.get(workflow_name)
+            priority = config.workflow_priorities.get(workflow_name)
+            tenant = request.headers.get(config.tenant_header)
             
-            return {
+            if profiling_requested(request):
+                # Profiled runs always execute so the profile reflects real work
+                with WorkflowProfiler(workflow_name, workflow) as profiler:
+                    results, run_id = await executor.execute(
+                        workflow,
+                        request_body,
+                        workflow_name,
+                        on_node_finished=profiler.on_node_finished,
+                        on_node_started=profiler.on_node_started,
+                        priority=priority,
+                        tenant=tenant
+                    )
+                profile = profiler.summary(results)
+                profile_path = await asyncio.to_thread(
+                    profiler.write_collapsed, config.profile_dir, run_id or "unknown", config.profile_max_files
+                )
+                profile["profile_path"] = str(profile_path)
+                
+                return workflow_response(request, {
+                    "workflow": workflow_name,
+                    "run_id": run_id,
+                    "results": results,
+                    "status": "completed",
+                    "cache": None,
+                    "profile": profile
+                })
+            
+            if spec.cache_ttl:
+                key = canonical_key(workflow_name, spec.version, request_body)
+                (results, run_id), cache_status = await result_cache.get_or_compute(
+                    key,
+                    spec.cache_ttl,
+                    lambda: executor.execute(
+                        workflow, request_body, workflow_name, priority=priority, tenant=tenant
+                    )
+                )
+            else:
+                results, run_id = await executor.execute(
+                    workflow, request_body, workflow_name, priority=priority, tenant=tenant
+                )
+                cache_status = None
+            
+            return workflow_response(request, {
                 "workflow": workflow_name,
                 "run_id": run_id,
                 "results": results,
-                "status": "completed"
-            }
+                "status": "completed",
+                "cache": cache_status
+            })
         else:
             # For other workflows, return a placeholder response
             return {
                 "workflow": workflow_name,
                 "message": f"Workflow '{workflow_name}' is not implemented yet",
                 "status": "placeholder",
-                "available_workflows": ["get_status"]
+                "available_workflows": workflow_registry.names()
             }
             
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error executing workflow {workflow_name}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/workflows/{workflow_name}/submit", status_code=202)
+async def submit_workflow(workflow_name: str, request: Request):
+    """Queue a workflow run and return its run_id without waiting for it"""
+    if job_manager is None:
+        raise HTTPException(status_code=500, detail="Runtime not initialized")
+    
+    request_body = await request.json() if request.headers.get("content-type") == "application/json" else {}
+    
+    try:
+        job = job_manager.submit(workflow_name, request_body)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Workflow '{workflow_name}' not found")
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(config.sdk_retry_after)}
+        )
+    
+    return {
+        "workflow": workflow_name,
+        "run_id": job.run_id,
+        "status": job.status.value,
+        "status_url": f"/runs/{job.run_id}",
+        "events_url": f"/runs/{job.run_id}/events"
+    }
+
+@app.get("/runs/{run_id}")
+async def get_run(run_id: str, request: Request):
+    """Get the status and results of a submitted run"""
+    job = job_manager.get(run_id) if job_manager else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found")
+    
+    return workflow_response(request, job.to_dict())
+
+@app.get("/runs/{run_id}/events")
+async def stream_run_events(run_id: str):
+    """Stream node-completion events of a submitted run as Server-Sent Events"""
+    job = job_manager.get(run_id) if job_manager else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found")
+    
+    async def event_stream():
+        async for event in job_manager.subscribe(run_id):
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/workflows")
 async def list_workflows():
     """List available workflows"""
+    loaded = {spec.name: spec for spec in workflow_registry.list_workflows()}
     return {
         "workflows": [
             {
-                "name": "get_status",
-                "description": "Get application status and health information",
-                "endpoint": "/workflows/get_status/execute"
+                "name": name,
+                "version": loaded[name].version if name in loaded else None,
+                "description": loaded[name].description if name in loaded else None,
+                "loaded": name in loaded,
+                "endpoint": f"/workflows/{name}/execute"
             }
+            for name in workflow_registry.names()
         ]
     }
 
+@app.post("/workflows/cache/invalidate")
+async def invalidate_workflow_cache(workflow_name: Optional[str] = None):
+    """Drop cached workflow builds and results, e.g. after a redeploy"""
+    if workflow_name is not None and not workflow_registry.has(workflow_name):
+        raise HTTPException(status_code=404, detail=f"Workflow '{workflow_name}' not found")
+    
+    removed = workflow_registry.invalidate(workflow_name)
+    results_removed = result_cache.invalidate(f"{workflow_name}:" if workflow_name else None)
+    return {
+        "workflow": workflow_name,
+        "invalidated": removed,
+        "results_invalidated": results_removed,
+        "cache": workflow_registry.stats()
+    }
+
 @app.get("/metrics")
 async def metrics():
     """Metrics endpoint for Prometheus"""
-    # Basic metrics - in production, you'd use proper Prometheus metrics
-    return {
-        "app_info": {
-            "name": "kailash_sdk_template",
-            "version": "1.0.0",
-            "environment": os.getenv("ENVIRONMENT", "development")
-        },
-        "runtime_info": {
-            "runtime_active": runtime is not None,
-            "python_version": platform.python_version() if 'platform' in globals() else "unknown"
-        }
-    }
+    payload, content_type = gateway_metrics.render()
+    return Response(content=payload, media_type=content_type)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,262 @@
+"""
+Background job queue for long-running workflow executions.
+
+Runs submitted through the gateway are queued here and picked up by a
+fixed number of worker tasks, so the HTTP request returns as soon as the
+run is accepted. Clients poll a run for its status or subscribe to its
+node-completion events.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from kailash.tracking.models import TaskRun
+
+from .executor import ExecutorSaturatedError, WorkflowExecutor
+from .registry import WorkflowRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a submitted run."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue has no room for another run."""
+
+
+@dataclass
+class Job:
+    """A workflow run submitted for background execution."""
+
+    run_id: str
+    workflow_name: str
+    parameters: Dict[str, Any]
+    status: JobStatus = JobStatus.QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    workflow_run_id: Optional[str] = None
+    results: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    subscribers: List[asyncio.Queue] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Record an event and deliver it to current subscribers."""
+        self.events.append(event)
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "workflow": self.workflow_name,
+            "status": self.status.value,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "workflow_run_id": self.workflow_run_id,
+            "results": self.results,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Bounded in-process job queue served by a pool of worker tasks.
+
+    Finished jobs are retained for polling up to ``max_retained`` entries,
+    after which the oldest finished jobs are forgotten. ``priorities`` maps
+    workflow names to the admission class their runs execute under.
+
+    A run that finds the executor saturated, or is rejected by admission
+    control, is retried until ``slot_timeout`` seconds have passed and then
+    fails with the rejection as its error.
+    """
+
+    def __init__(
+        self,
+        executor: WorkflowExecutor,
+        registry: WorkflowRegistry,
+        workers: int = 4,
+        max_queue_size: int = 100,
+        max_retained: int = 1000,
+        priorities: Optional[Dict[str, str]] = None,
+        slot_timeout: float = 300.0,
+    ):
+        self.executor = executor
+        self.registry = registry
+        self.priorities = priorities or {}
+        self.workers = workers
+        self.max_retained = max_retained
+        self.slot_timeout = slot_timeout
+        self._queue: "asyncio.Queue[Job]" = asyncio.Queue(maxsize=max_queue_size)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} job workers")
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, workflow_name: str, parameters: Dict[str, Any]) -> Job:
+        """
+        Queue a run of a registered workflow.
+
+        Raises:
+            KeyError: If the workflow is not registered.
+            JobQueueFullError: If the queue is at capacity.
+        """
+        if not self.registry.has(workflow_name):
+            raise KeyError(workflow_name)
+
+        job = Job(run_id=str(uuid.uuid4()), workflow_name=workflow_name, parameters=parameters)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue is full ({self._queue.maxsize} runs)")
+
+        self._jobs[job.run_id] = job
+        self._evict_finished()
+        return job
+
+    def get(self, run_id: str) -> Optional[Job]:
+        """Get a job by run ID."""
+        return self._jobs.get(run_id)
+
+    async def subscribe(self, run_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a job's events, replaying past ones first, until the job finishes.
+
+        Raises:
+            KeyError: If the run ID is unknown.
+        """
+        job = self._jobs.get(run_id)
+        if job is None:
+            raise KeyError(run_id)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in job.events:
+            queue.put_nowait(event)
+        if job.done:
+            queue.put_nowait(None)
+        else:
+            job.subscribers.append(queue)
+
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            if queue in job.subscribers:
+                job.subscribers.remove(queue)
+
+    def stats(self) -> Dict[str, int]:
+        """Get queue counters."""
+        return {
+            "queued": self._queue.qsize(),
+            "max_queue_size": self._queue.maxsize,
+            "workers": self.workers,
+            "retained": len(self._jobs),
+        }
+
+    def _evict_finished(self) -> None:
+        if len(self._jobs) <= self.max_retained:
+            return
+        for run_id in [run_id for run_id, job in self._jobs.items() if job.done]:
+            del self._jobs[run_id]
+            if len(self._jobs) <= self.max_retained:
+                break
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Job worker failed on run {job.run_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        loop = asyncio.get_running_loop()
+
+        def on_node_finished(task: TaskRun) -> None:
+            # Called from the executor's worker thread
+            event = {
+                "type": "node_finished",
+                "node_id": task.node_id,
+                "status": task.status.value,
+                "error": task.error,
+                "timestamp": time.time(),
+            }
+            loop.call_soon_threadsafe(job.publish, event)
+
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        job.publish({"type": "run_started", "timestamp": job.started_at})
+
+        try:
+            workflow = self.registry.get(job.workflow_name)
+            deadline = time.monotonic() + self.slot_timeout
+            while True:
+                try:
+                    results, workflow_run_id = await self.executor.execute(
+                        workflow,
+                        job.parameters,
+                        job.workflow_name,
+                        on_node_finished,
+                        priority=self.priorities.get(job.workflow_name),
+                    )
+                    break
+                except ExecutorSaturatedError as e:
+                    # Shedding must reach background runs too, not keep them queueing forever
+                    if time.monotonic() + e.retry_after > deadline:
+                        raise ExecutorSaturatedError(
+                            e.retry_after,
+                            f"No execution slot within {self.slot_timeout:g}s: {e}"
+                        ) from e
+                    await asyncio.sleep(e.retry_after)
+            job.results = results
+            job.workflow_run_id = workflow_run_id
+            job.status = JobStatus.COMPLETED
+        except Exception as e:
+            logger.error(f"Error executing run {job.run_id} of {job.workflow_name}: {e}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+
+        # Let node events queued from the worker thread land before the final one
+        await asyncio.sleep(0)
+        job.finished_at = time.time()
+        job.publish({"type": f"run_{job.status.value}", "timestamp": job.finished_at})
+        for queue in job.subscribers:
+            queue.put_nowait(None)
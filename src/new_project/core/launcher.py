@@ -0,0 +1,348 @@
+"""
+Production launcher for the gateway.
+
+Runs the gateway app in several worker processes supervised by a master
+process. Each worker runs the app lifespan (workflow preload, executor and
+job workers) before it starts accepting connections, crashed workers are
+replaced, and SIGHUP replaces workers one at a time so the gateway keeps
+serving throughout a restart. The restart advances one step per
+supervisor tick, so workers that crash meanwhile are still replaced.
+
+Workers that crash before finishing startup are restarted with exponential
+backoff; after too many such crashes in a row (e.g. a broken import or bad
+configuration) the launcher stops and exits with an error instead of
+forking in a loop.
+
+Usage:
+    python -m src.new_project.core.launcher --workers 4 --reuse-port
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import uvicorn
+
+from ..config import config
+
+logger = logging.getLogger(__name__)
+
+APP_PATH = "src.new_project.core.gateway:app"
+
+
+def default_worker_count() -> int:
+    """Use the configured worker count, or one worker per CPU."""
+    return config.gateway_workers or os.cpu_count() or 1
+
+
+def bind_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    """
+    Create a bound TCP socket.
+
+    With ``reuse_port`` every worker binds its own socket to the same port
+    and the kernel balances connections between them. Such a socket is not
+    put in listening state here: uvicorn does that after the app lifespan
+    has started, so the kernel never routes connections to a cold worker.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not supported on this platform")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+class _WarmServer(uvicorn.Server):
+    """uvicorn server that reports when its lifespan startup has finished."""
+
+    def __init__(self, server_config: uvicorn.Config, ready):
+        super().__init__(server_config)
+        self.ready = ready
+
+    async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        await super().startup(sockets)
+        if not self.should_exit:
+            self.ready.set()
+
+
+def _run_worker(
+    app_path: str,
+    sock: Optional[socket.socket],
+    host: str,
+    port: int,
+    reuse_port: bool,
+    graceful_timeout: int,
+    ready,
+) -> None:
+    """Worker process entry point."""
+    if sock is None:
+        sock = bind_socket(host, port, reuse_port)
+
+    server_config = uvicorn.Config(
+        app_path,
+        log_level=config.sdk_log_level.lower(),
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+    _WarmServer(server_config, ready).run(sockets=[sock])
+
+
+@dataclass
+class _Worker:
+    process: multiprocessing.Process
+    ready: object
+    # Consecutive crashes before startup finished, in this worker's slot
+    failures: int = 0
+    # When a dead worker is due to be replaced
+    restart_at: Optional[float] = None
+
+
+class GatewayLauncher:
+    """
+    Pre-forking supervisor for gateway worker processes.
+
+    Signals:
+        SIGTERM / SIGINT: stop all workers gracefully and exit.
+        SIGHUP: rolling restart, one worker at a time.
+    """
+
+    def __init__(
+        self,
+        app_path: str = APP_PATH,
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = 1,
+        reuse_port: bool = False,
+        graceful_timeout: int = 30,
+        startup_timeout: int = 120,
+        restart_backoff: float = 1.0,
+        max_restart_backoff: float = 30.0,
+        max_startup_failures: int = 5,
+    ):
+        self.app_path = app_path
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.reuse_port = reuse_port
+        self.graceful_timeout = graceful_timeout
+        self.startup_timeout = startup_timeout
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.max_startup_failures = max(1, max_startup_failures)
+        # spawn avoids inheriting the master's threads and SDK state
+        self._context = multiprocessing.get_context("spawn")
+        self._socket: Optional[socket.socket] = None
+        self._workers: List[_Worker] = []
+        self._should_exit = False
+        self._should_reload = False
+        self._failed = False
+        # Rolling restart state: slots still to replace, and the warming successor
+        self._reload_slots: List[int] = []
+        self._successor: Optional[Tuple[int, _Worker, float]] = None
+        # Stopped workers not yet reaped, with the time to kill them
+        self._retiring: List[Tuple[_Worker, float]] = []
+
+    def run(self) -> int:
+        """
+        Start the workers and supervise them until told to stop.
+
+        Returns the exit status: 1 if the launcher gave up because workers
+        kept crashing during startup, otherwise 0.
+        """
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        if not self.reuse_port:
+            # One listening socket shared by all workers
+            self._socket = bind_socket(self.host, self.port, reuse_port=False)
+            self._socket.listen(2048)
+
+        mode = "SO_REUSEPORT" if self.reuse_port else "shared socket"
+        logger.info(
+            f"Starting {self.workers} gateway workers on {self.host}:{self.port} ({mode})"
+        )
+        for _ in range(self.workers):
+            self._workers.append(self._spawn())
+
+        try:
+            while not self._should_exit:
+                if self._should_reload:
+                    self._should_reload = False
+                    logger.info("Rolling restart of gateway workers")
+                    # A reload during a restart starts over with every slot
+                    self._reload_slots = list(range(len(self._workers)))
+                self._replace_dead_workers()
+                self._step_rolling_restart()
+                self._reap_retiring()
+                time.sleep(0.5)
+        finally:
+            self._stop_all()
+            if self._socket is not None:
+                self._socket.close()
+        return 1 if self._failed else 0
+
+    def _handle_exit(self, signum, frame) -> None:
+        self._should_exit = True
+
+    def _handle_reload(self, signum, frame) -> None:
+        self._should_reload = True
+
+    def _spawn(self, failures: int = 0) -> _Worker:
+        ready = self._context.Event()
+        process = self._context.Process(
+            target=_run_worker,
+            args=(
+                self.app_path,
+                self._socket,
+                self.host,
+                self.port,
+                self.reuse_port,
+                self.graceful_timeout,
+                ready,
+            ),
+            daemon=False,
+        )
+        process.start()
+        return _Worker(process, ready, failures)
+
+    def _stop(self, worker: _Worker) -> None:
+        """Stop a worker gracefully, killing it if it overruns the grace period."""
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.process.join(self.graceful_timeout + 5)
+        if worker.process.is_alive():
+            logger.warning(f"Worker {worker.process.pid} did not exit in time, killing it")
+            worker.process.kill()
+            worker.process.join()
+
+    def _retire(self, worker: _Worker) -> None:
+        """Ask a worker to stop without waiting for it; it is reaped by _reap_retiring."""
+        if worker.process.is_alive():
+            worker.process.terminate()
+        self._retiring.append((worker, time.monotonic() + self.graceful_timeout + 5))
+
+    def _reap_retiring(self) -> None:
+        now = time.monotonic()
+        remaining = []
+        for worker, kill_at in self._retiring:
+            if not worker.process.is_alive():
+                worker.process.join()
+                continue
+            if now >= kill_at:
+                logger.warning(f"Worker {worker.process.pid} did not exit in time, killing it")
+                worker.process.kill()
+            remaining.append((worker, kill_at))
+        self._retiring = remaining
+
+    def _stop_all(self) -> None:
+        logger.info("Stopping gateway workers")
+        workers = self._workers + [worker for worker, _ in self._retiring]
+        if self._successor is not None:
+            workers.append(self._successor[1])
+        for worker in workers:
+            if worker.process.is_alive():
+                worker.process.terminate()
+        for worker in workers:
+            self._stop(worker)
+        self._workers = []
+        self._retiring = []
+        self._successor = None
+        self._reload_slots = []
+
+    def _replace_dead_workers(self) -> None:
+        now = time.monotonic()
+        for index, worker in enumerate(self._workers):
+            if self._should_exit or worker.process.is_alive():
+                continue
+            if worker.restart_at is None:
+                # A worker that started serving resets its slot's failure count
+                failures = 0 if worker.ready.is_set() else worker.failures + 1
+                if failures >= self.max_startup_failures:
+                    logger.error(
+                        f"Workers crashed {failures} times in a row during startup "
+                        f"(last exit code {worker.process.exitcode}), stopping the launcher"
+                    )
+                    self._failed = True
+                    self._should_exit = True
+                    return
+                delay = 0.0
+                if failures:
+                    delay = min(self.max_restart_backoff, self.restart_backoff * 2 ** (failures - 1))
+                logger.warning(
+                    f"Worker {worker.process.pid} exited with code {worker.process.exitcode}, "
+                    f"restarting in {delay:.1f}s"
+                )
+                worker.failures = failures
+                worker.restart_at = now + delay
+            if now >= worker.restart_at:
+                self._workers[index] = self._spawn(worker.failures)
+
+    def _step_rolling_restart(self) -> None:
+        """
+        Advance the rolling restart by one step, without blocking.
+
+        Each slot's worker is replaced once its successor has finished
+        warming up; the old worker is then stopped in the background.
+        """
+        if self._should_exit:
+            return
+        if self._successor is None:
+            if not self._reload_slots:
+                return
+            index = self._reload_slots.pop(0)
+            self._successor = (index, self._spawn(), time.monotonic() + self.startup_timeout)
+            return
+
+        index, new, deadline = self._successor
+        if new.ready.is_set():
+            self._successor = None
+            old = self._workers[index]
+            self._workers[index] = new
+            self._retire(old)
+            if not self._reload_slots:
+                logger.info("Rolling restart complete")
+        elif not new.process.is_alive() or time.monotonic() >= deadline:
+            logger.error("Replacement worker failed to start, aborting rolling restart")
+            self._successor = None
+            self._reload_slots = []
+            self._retire(new)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the gateway with multiple worker processes")
+    parser.add_argument("--host", default=config.api_host)
+    parser.add_argument("--port", type=int, default=config.api_port)
+    parser.add_argument("--workers", type=int, default=default_worker_count())
+    parser.add_argument("--reuse-port", action="store_true", default=config.gateway_reuse_port)
+    parser.add_argument("--graceful-timeout", type=int, default=config.gateway_graceful_timeout)
+    parser.add_argument("--max-startup-failures", type=int, default=config.gateway_max_startup_failures)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    sys.exit(GatewayLauncher(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reuse_port=args.reuse_port,
+        graceful_timeout=args.graceful_timeout,
+        restart_backoff=config.gateway_restart_backoff,
+        max_startup_failures=args.max_startup_failures,
+    ).run())
+
+
+if __name__ == "__main__":
+    main()
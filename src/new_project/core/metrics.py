@@ -0,0 +1,202 @@
+"""
+Prometheus metrics for the gateway.
+
+Metric objects and their label children are created up front so the
+request path only does a dict lookup and an ``observe()``. Counters that
+components already keep (cache hits, queue depth, ...) are read at scrape
+time instead of being mirrored on every update.
+"""
+
+import platform
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    Info,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from kailash.tracking.models import TaskRun
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WORKFLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class StatsCollector:
+    """
+    Exposes a component's ``stats()`` dict as Prometheus metrics at scrape time.
+
+    Keys listed in ``counters`` are exported as counters, everything else
+    as gauges. ``stats_fn`` may return None while the component is down.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        stats_fn: Callable[[], Optional[Dict[str, Any]]],
+        counters: Iterable[str] = (),
+    ):
+        self.namespace = namespace
+        self.stats_fn = stats_fn
+        self.counters: Set[str] = set(counters)
+
+    def collect(self):
+        stats = self.stats_fn()
+        if not stats:
+            return
+        for key, value in stats.items():
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"{self.namespace}_{key}"
+            if key in self.counters:
+                yield CounterMetricFamily(name, f"{self.namespace} {key}", value=value)
+            else:
+                yield GaugeMetricFamily(name, f"{self.namespace} {key}", value=value)
+
+
+class GatewayMetrics:
+    """Metric definitions and recording helpers for the gateway."""
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None):
+        self.registry = registry or CollectorRegistry()
+
+        self.app_info = Info("app", "Application build information", registry=self.registry)
+        self.request_duration = Histogram(
+            "gateway_request_duration_seconds",
+            "HTTP request latency by route",
+            ["method", "route", "status"],
+            buckets=REQUEST_BUCKETS,
+            registry=self.registry,
+        )
+        self.workflow_duration = Histogram(
+            "workflow_duration_seconds",
+            "Workflow execution time",
+            ["workflow", "status"],
+            buckets=WORKFLOW_BUCKETS,
+            registry=self.registry,
+        )
+        self.node_duration = Histogram(
+            "workflow_node_duration_seconds",
+            "Node execution time within a workflow",
+            ["workflow", "node"],
+            buckets=WORKFLOW_BUCKETS,
+            registry=self.registry,
+        )
+        self.workflow_errors = Counter(
+            "workflow_errors",
+            "Workflow executions that raised an error",
+            ["workflow"],
+            registry=self.registry,
+        )
+        self.runs_in_flight = Gauge(
+            "workflow_runs_in_flight",
+            "Workflow executions currently running",
+            registry=self.registry,
+        )
+
+        self._request_children: Dict[Tuple[str, str, int], Any] = {}
+        self._workflow_children: Dict[Tuple[str, str], Any] = {}
+        self._node_children: Dict[Tuple[str, str], Any] = {}
+        self._error_children: Dict[str, Any] = {}
+
+    def set_app_info(self, name: str, version: str, environment: str) -> None:
+        self.app_info.info({
+            "name": name,
+            "version": version,
+            "environment": environment,
+            "python_version": platform.python_version(),
+        })
+
+    def register_workflow(self, name: str, node_ids: Iterable[str] = ()) -> None:
+        """Pre-create the label children used when ``name`` runs."""
+        for status in ("completed", "failed"):
+            self._workflow_children[(name, status)] = self.workflow_duration.labels(name, status)
+        self._error_children[name] = self.workflow_errors.labels(name)
+        for node_id in node_ids:
+            self._node_children[(name, node_id)] = self.node_duration.labels(name, node_id)
+
+    def add_collector(self, collector: Any) -> None:
+        self.registry.register(collector)
+
+    def track_in_flight(self, fn: Callable[[], float]) -> None:
+        """Read the in-flight run count from ``fn`` at scrape time."""
+        self.runs_in_flight.set_function(fn)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        child = self._request_children.get(key)
+        if child is None:
+            child = self._request_children[key] = self.request_duration.labels(method, route, str(status))
+        child.observe(seconds)
+
+    def observe_workflow(self, name: str, seconds: float, ok: bool) -> None:
+        if (name, "completed") not in self._workflow_children:
+            self.register_workflow(name)
+        status = "completed" if ok else "failed"
+        self._workflow_children[(name, status)].observe(seconds)
+        if not ok:
+            self._error_children[name].inc()
+
+    def observe_node(self, name: str, task: TaskRun) -> None:
+        if task.started_at is None or task.ended_at is None:
+            return
+        key = (name, task.node_id)
+        child = self._node_children.get(key)
+        if child is None:
+            child = self._node_children[key] = self.node_duration.labels(name, task.node_id)
+        child.observe((task.ended_at - task.started_at).total_seconds())
+
+    def render(self) -> Tuple[bytes, str]:
+        """Render the exposition payload and its content type."""
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template.
+
+    The route is resolved from the endpoint the router matched, so path
+    parameters never end up as label values.
+    """
+
+    def __init__(self, app: Any, metrics: GatewayMetrics):
+        self.app = app
+        self.metrics = metrics
+        self._routes: Optional[Dict[Any, str]] = None
+
+    def _route_for(self, scope: Dict[str, Any]) -> str:
+        if self._routes is None:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._routes.get(scope.get("endpoint"), UNMATCHED_ROUTE)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.observe_request(
+                scope["method"], self._route_for(scope), status, time.perf_counter() - start
+            )
@@ -7,7 +7,7 @@ Follow the patterns from the reference apps.
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from pydantic import BaseModel as PydanticBaseModel, Field
 
@@ -32,6 +32,10 @@ class ExampleEntity(BaseModel):
     This is just a template - create your own models based on your app's needs.
     """
     __tablename__ = "example_entities"
+    __table_args__ = (
+        # Keyset pagination by creation time
+        Index("ix_example_entities_created_at_id", "created_at", "id"),
+    )
     
     name = Column(String(255), nullable=False, index=True)
     description = Column(String(1000))
@@ -0,0 +1,180 @@
+"""
+Per-node profiling for gateway-triggered workflow runs.
+
+A profiler observes node start and finish events of a single run and
+records wall time, CPU time, peak traced memory and payload sizes for
+each node. Profiles are written in collapsed-stack format
+(``workflow;node <microseconds>``), which speedscope and flamegraph.pl
+open directly.
+"""
+
+import logging
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from kailash.tracking.models import TaskRun
+from kailash.workflow.graph import Workflow
+
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# tracemalloc is process-wide; it runs while at least one profiler is active
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+def _start_tracing() -> None:
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _payload_size(value: Any) -> int:
+    try:
+        return len(dumps(value))
+    except TypeError:
+        return 0
+
+
+def _resolve(value: Any, path: str) -> Any:
+    """Follow a dotted output path such as ``result.rows`` into a node's outputs."""
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+@dataclass
+class NodeProfile:
+    """Measurements for one node of a profiled run."""
+
+    node_id: str
+    node_type: str
+    status: str = "running"
+    start_ms: float = 0.0  # offset from the start of the run
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    peak_memory_bytes: int = 0
+    input_bytes: int = 0
+    output_bytes: int = 0
+
+
+class WorkflowProfiler:
+    """
+    Collects node measurements for one run of a sync workflow.
+
+    Use as a context manager around the run. Peak memory comes from
+    tracemalloc, which is process-wide, so it is approximate when other
+    runs execute at the same time.
+    """
+
+    def __init__(self, workflow_name: str, workflow: Workflow):
+        self.workflow_name = workflow_name
+        self.workflow = workflow
+        self.nodes: Dict[str, NodeProfile] = {}
+        self._starts: Dict[str, tuple] = {}
+        self._origin = time.perf_counter()
+        self._wall_ms = 0.0
+
+    def __enter__(self) -> "WorkflowProfiler":
+        _start_tracing()
+        self._origin = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._wall_ms = (time.perf_counter() - self._origin) * 1000
+        _stop_tracing()
+
+    def on_node_started(self, task: TaskRun) -> None:
+        # Reset the peak so it reflects this node only
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        self._starts[task.node_id] = (time.perf_counter(), time.thread_time(), current)
+        self.nodes[task.node_id] = NodeProfile(
+            node_id=task.node_id,
+            node_type=task.node_type,
+            start_ms=(time.perf_counter() - self._origin) * 1000,
+        )
+
+    def on_node_finished(self, task: TaskRun) -> None:
+        profile = self.nodes.get(task.node_id)
+        start = self._starts.pop(task.node_id, None)
+        if profile is None or start is None:
+            return
+
+        wall_start, cpu_start, memory_start = start
+        _, peak = tracemalloc.get_traced_memory()
+        profile.status = task.status.value
+        profile.wall_ms = (time.perf_counter() - wall_start) * 1000
+        profile.cpu_ms = (time.thread_time() - cpu_start) * 1000
+        profile.peak_memory_bytes = max(0, peak - memory_start)
+        profile.output_bytes = _payload_size(task.result)
+
+    def _measure_inputs(self, results: Dict[str, Any]) -> None:
+        for connection in self.workflow.connections:
+            profile = self.nodes.get(connection.target_node)
+            if profile is None:
+                continue
+            value = _resolve(results.get(connection.source_node), connection.source_output)
+            profile.input_bytes += _payload_size(value)
+
+    def summary(self, results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Summarize the run; ``results`` are used to size node inputs."""
+        if results:
+            self._measure_inputs(results)
+        nodes: List[NodeProfile] = sorted(self.nodes.values(), key=lambda node: node.start_ms)
+        return {
+            "workflow": self.workflow_name,
+            "wall_ms": round(self._wall_ms, 3),
+            "node_wall_ms": round(sum(node.wall_ms for node in nodes), 3),
+            "node_cpu_ms": round(sum(node.cpu_ms for node in nodes), 3),
+            "nodes": [asdict(node) for node in nodes],
+        }
+
+    def write_collapsed(self, directory: str, run_id: str, max_files: int = 0) -> Path:
+        """
+        Write node wall times as a collapsed-stack profile and return its path.
+
+        With ``max_files``, the oldest profiles in ``directory`` are deleted
+        so that at most that many are kept.
+        """
+        path = Path(directory) / f"{self.workflow_name}-{run_id}.folded"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [
+            f"{self.workflow_name};{node.node_id} ({node.node_type}) {int(node.wall_ms * 1000)}"
+            for node in sorted(self.nodes.values(), key=lambda node: node.start_ms)
+        ]
+        path.write_text("\n".join(lines) + "\n")
+        logger.info(f"Wrote profile for run {run_id} to {path}")
+        if max_files > 0:
+            _prune_profiles(path.parent, max_files)
+        return path
+
+
+def _prune_profiles(directory: Path, max_files: int) -> None:
+    """Delete the oldest ``.folded`` files beyond the newest ``max_files``."""
+    profiles = []
+    for candidate in directory.glob("*.folded"):
+        try:
+            profiles.append((candidate.stat().st_mtime, candidate))
+        except FileNotFoundError:  # Pruned by a concurrent writer
+            continue
+    profiles.sort(reverse=True)
+    for _, stale in profiles[max_files:]:
+        stale.unlink(missing_ok=True)
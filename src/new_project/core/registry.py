@@ -0,0 +1,226 @@
+"""
+Workflow registry for the gateway.
+
+This module keeps track of the workflows the gateway can execute and
+caches their built form, so a workflow graph is constructed and validated
+once instead of on every request. Workflows are either registered
+directly or discovered from a package and imported on first use.
+"""
+
+import importlib
+import logging
+import pkgutil
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from kailash.workflow.builder import WorkflowBuilder
+from kailash.workflow.graph import Workflow
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkflowSpec:
+    """Registration entry for a named workflow."""
+
+    name: str
+    factory: Callable[[], WorkflowBuilder]
+    version: str = "1"
+    description: str = ""
+    cache_ttl: Optional[float] = None  # seconds; results are cached only when set
+
+
+class WorkflowRegistry:
+    """
+    Registry of named workflows with a bounded cache of built workflows.
+
+    Built ``Workflow`` objects are cached by ``(name, version)`` and evicted
+    in least-recently-used order once ``max_size`` is reached. Registering a
+    new version of a workflow drops the cached build of the old one.
+
+    Lookups are dict-based, so the number of registered workflows does not
+    affect dispatch cost.
+    """
+
+    def __init__(self, max_size: int = 128):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._specs: Dict[str, WorkflowSpec] = {}
+        self._modules: Dict[str, str] = {}  # discovered but not yet imported
+        self._load_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], Workflow]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], WorkflowBuilder],
+        version: str = "1",
+        description: str = "",
+        cache_ttl: Optional[float] = None,
+    ) -> None:
+        """
+        Register a workflow factory under a name.
+
+        Set ``cache_ttl`` only for idempotent workflows: their results are
+        then reused for identical request bodies for that many seconds.
+        """
+        with self._lock:
+            previous = self._specs.get(name)
+            if previous is not None and previous.version != version:
+                self._cache.pop((name, previous.version), None)
+            self._specs[name] = WorkflowSpec(name, factory, version, description, cache_ttl)
+
+    def discover(self, package: str) -> List[str]:
+        """
+        Register every public module of ``package`` without importing it.
+
+        Each module is registered under its own name and must define
+        ``create_workflow()``; ``VERSION``, ``DESCRIPTION`` and ``CACHE_TTL``
+        are optional. Modules are imported on first lookup.
+
+        Returns:
+            Names of the discovered workflows.
+        """
+        found = []
+        for module in pkgutil.iter_modules(importlib.import_module(package).__path__):
+            if module.name.startswith("_") or module.ispkg:
+                continue
+            if module.name not in self._specs:
+                self._modules[module.name] = f"{package}.{module.name}"
+            found.append(module.name)
+
+        logger.info(f"Discovered {len(found)} workflow(s) in {package}")
+        return found
+
+    def _load(self, name: str) -> Optional[WorkflowSpec]:
+        """Import a discovered workflow module and register it."""
+        with self._load_lock:
+            spec = self._specs.get(name)
+            if spec is not None:
+                return spec
+            module_path = self._modules.get(name)
+            if module_path is None:
+                return None
+
+            module = importlib.import_module(module_path)
+            self.register(
+                name,
+                module.create_workflow,
+                version=str(getattr(module, "VERSION", "1")),
+                description=getattr(module, "DESCRIPTION", (module.__doc__ or "").strip()),
+                cache_ttl=getattr(module, "CACHE_TTL", None),
+            )
+            del self._modules[name]
+
+        logger.info(f"Loaded workflow '{name}' from {module_path}")
+        return self._specs[name]
+
+    def has(self, name: str) -> bool:
+        """Check whether a workflow is registered or discovered."""
+        return name in self._specs or name in self._modules
+
+    def get_spec(self, name: str) -> Optional[WorkflowSpec]:
+        """Get the registration entry for a workflow, importing it if needed."""
+        spec = self._specs.get(name)
+        if spec is None and name in self._modules:
+            spec = self._load(name)
+        return spec
+
+    def names(self) -> List[str]:
+        """List the names of all registered and discovered workflows."""
+        return sorted(set(self._specs) | set(self._modules))
+
+    def is_loaded(self, name: str) -> bool:
+        """Check whether a workflow's module has been imported."""
+        return name in self._specs
+
+    def warm(self, names: List[str]) -> None:
+        """Import and build the given workflows ahead of their first request."""
+        for name in names:
+            if not self.has(name):
+                logger.warning(f"Cannot preload unknown workflow '{name}'")
+                continue
+            self.get(name)
+
+    def get(self, name: str) -> Workflow:
+        """
+        Get the built workflow for a name, building it on a cache miss.
+
+        Raises:
+            KeyError: If no workflow is registered under ``name``.
+        """
+        spec = self.get_spec(name)
+        if spec is None:
+            raise KeyError(name)
+
+        key = (name, spec.version)
+        with self._lock:
+            workflow = self._cache.get(key)
+            if workflow is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return workflow
+            self.misses += 1
+
+        # Build outside the lock so a slow build does not block cache hits
+        workflow = spec.factory().build()
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                # Another caller built it first; keep a single instance
+                self._cache.move_to_end(key)
+                return cached
+            self._cache[key] = workflow
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+        logger.info(f"Built workflow '{name}' (version {spec.version})")
+        return workflow
+
+    def invalidate(self, name: Optional[str] = None) -> int:
+        """
+        Drop cached builds so they are rebuilt on next use.
+
+        Args:
+            name: Workflow to invalidate; all workflows when omitted.
+
+        Returns:
+            Number of cache entries removed.
+        """
+        with self._lock:
+            if name is None:
+                removed = len(self._cache)
+                self._cache.clear()
+            else:
+                keys = [key for key in self._cache if key[0] == name]
+                for key in keys:
+                    del self._cache[key]
+                removed = len(keys)
+
+        logger.info(f"Invalidated {removed} cached workflow(s)")
+        return removed
+
+    def list_workflows(self) -> List[WorkflowSpec]:
+        """List workflows whose modules have been imported."""
+        return list(self._specs.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._cache),
+            "max_size": self.max_size,
+        }
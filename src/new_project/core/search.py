@@ -0,0 +1,84 @@
+"""
+Indexed substring search over entity names.
+
+A ``name ILIKE '%q%'`` filter cannot use the btree index on ``name``, so
+every search scans the table. The search indexes created by the
+migrations in ``migrations/versions`` are used instead:
+
+- PostgreSQL: a pg_trgm GIN index on ``name``, which serves ILIKE
+  substring matches; results are ranked by ``word_similarity``.
+- SQLite: an FTS5 table with the trigram tokenizer, kept in sync by
+  triggers; results are ranked by ``bm25``.
+
+Queries shorter than a trigram, and databases without the search index
+(e.g. tables made with ``create_all``), fall back to a plain ILIKE filter
+with shorter names ranked first.
+"""
+
+import time
+import weakref
+from typing import List
+
+from sqlalchemy import Float, func, inspect, select, text
+from sqlalchemy.orm import Session
+
+from .models import ExampleEntity
+
+# FTS5 table over example_entities.name on SQLite
+SQLITE_SEARCH_TABLE = "example_entities_fts"
+
+# The trigram indexes need this many characters to narrow a search
+MIN_INDEXED_QUERY = 3
+
+# How long a missing SQLite search table is remembered before checking again
+INDEX_RECHECK_SECONDS = 60.0
+
+# SQLite engine -> (has the search table, monotonic time it was checked)
+_sqlite_indexed = weakref.WeakKeyDictionary()
+
+
+def _escape_like(query: str) -> str:
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _has_sqlite_index(db: Session) -> bool:
+    engine = db.get_bind()
+    found, checked_at = _sqlite_indexed.get(engine, (False, None))
+    # A missing table is checked again now and then, so migrating a running app takes effect
+    if not found and (checked_at is None or time.monotonic() - checked_at >= INDEX_RECHECK_SECONDS):
+        found = inspect(engine).has_table(SQLITE_SEARCH_TABLE)
+        _sqlite_indexed[engine] = (found, time.monotonic())
+    return found
+
+
+def search_entities(db: Session, query: str, limit: int = 100, offset: int = 0) -> List[ExampleEntity]:
+    """Active entities whose name contains ``query`` (case-insensitive), best matches first."""
+    pattern = f"%{_escape_like(query)}%"
+    statement = select(ExampleEntity).where(ExampleEntity.is_active == True)
+    dialect = db.get_bind().dialect.name
+
+    if len(query) >= MIN_INDEXED_QUERY and dialect == "postgresql":
+        # The ILIKE is answered from the gin_trgm_ops index
+        statement = statement.where(ExampleEntity.name.ilike(pattern, escape="\\")).order_by(
+            func.word_similarity(query, ExampleEntity.name).desc(),
+            ExampleEntity.id,
+        )
+    elif len(query) >= MIN_INDEXED_QUERY and dialect == "sqlite" and _has_sqlite_index(db):
+        # A quoted string is matched as a phrase of its trigrams, i.e. as a substring
+        phrase = '"' + query.replace('"', '""') + '"'
+        matches = text(
+            f"SELECT rowid AS id, bm25({SQLITE_SEARCH_TABLE}) AS rank "
+            f"FROM {SQLITE_SEARCH_TABLE} WHERE {SQLITE_SEARCH_TABLE} MATCH :phrase"
+        ).bindparams(phrase=phrase).columns(id=ExampleEntity.id.type, rank=Float).subquery()
+        # bm25 is lower for better matches
+        statement = statement.join(matches, matches.c.id == ExampleEntity.id).order_by(
+            matches.c.rank,
+            ExampleEntity.id,
+        )
+    else:
+        statement = statement.where(ExampleEntity.name.ilike(pattern, escape="\\")).order_by(
+            func.length(ExampleEntity.name),
+            ExampleEntity.id,
+        )
+
+    return list(db.scalars(statement.limit(limit).offset(offset)))
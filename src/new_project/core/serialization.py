@@ -0,0 +1,134 @@
+"""
+Fast JSON serialization for workflow results.
+
+Workflow results can be large (e.g. DataFrames turned into lists of
+records). FastAPI's default path walks them with ``jsonable_encoder``
+before encoding; the helpers here encode them in a single pass with
+orjson, handling numpy and pandas values directly, and can stream
+result arrays as NDJSON instead of building one large string.
+"""
+
+import datetime
+import decimal
+import json
+from typing import Any, Dict, Iterator
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library encoder
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Lines are buffered into chunks of roughly this size before being sent
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# DataFrames are converted to records this many rows at a time when streaming
+FRAME_BATCH_ROWS = 1000
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Convert values the encoder does not support natively."""
+    if pd is not None:
+        if isinstance(obj, pd.DataFrame):
+            return obj.to_dict("records")
+        if isinstance(obj, pd.Series):
+            return obj.tolist()
+        if obj is pd.NaT:
+            return None
+        if isinstance(obj, pd.Timestamp):
+            return obj.isoformat()
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded in one pass, bypassing ``jsonable_encoder``."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _iter_items(value: Any) -> Iterator[Any]:
+    if pd is not None and isinstance(value, pd.DataFrame):
+        for start in range(0, len(value), FRAME_BATCH_ROWS):
+            yield from value.iloc[start:start + FRAME_BATCH_ROWS].to_dict("records")
+    else:
+        yield from value
+
+
+def _is_array(value: Any) -> bool:
+    if isinstance(value, (list, tuple)):
+        return True
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        return True
+    return np is not None and isinstance(value, np.ndarray)
+
+
+def _records(header: Dict[str, Any], results: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield {"type": "header", **header}
+    for node_id, outputs in results.items():
+        if not isinstance(outputs, dict):
+            yield {"type": "value", "node": node_id, "value": outputs}
+            continue
+        for output, value in outputs.items():
+            if _is_array(value):
+                for item in _iter_items(value):
+                    yield {"type": "item", "node": node_id, "output": output, "item": item}
+            else:
+                yield {"type": "value", "node": node_id, "output": output, "value": value}
+
+
+def iter_ndjson(header: Dict[str, Any], results: Dict[str, Any]) -> Iterator[bytes]:
+    """
+    Encode workflow results as NDJSON chunks.
+
+    The first line is ``header``. Array outputs of a node (lists, arrays,
+    Series and DataFrames) are emitted one element per line; every other
+    output is emitted as a single line.
+    """
+    buffer = bytearray()
+    for record in _records(header, results):
+        buffer += dumps(record)
+        buffer += b"\n"
+        if len(buffer) >= STREAM_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
@@ -4,9 +4,27 @@ Business logic services for the app.
 Put your business logic here, separate from API endpoints and data models.
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import insert, select, tuple_, update
 from sqlalchemy.orm import Session
 from .models import ExampleEntity, ExampleEntityCreate, ExampleEntityUpdate
+from . import search
+
+# Columns get_entities_after can page by
+KEYSET_ORDERS = ("id", "created_at")
+
+
+def _parse_cursor(cursor: str, order_by: str) -> Tuple:
+    """Sort key encoded in a get_entities_after cursor."""
+    try:
+        if order_by == "created_at":
+            created_at, entity_id = cursor.rsplit(",", 1)
+            return datetime.fromisoformat(created_at), int(entity_id)
+        return (int(cursor),)
+    except ValueError:
+        # Also raised when there is no comma to split on
+        raise ValueError("invalid cursor") from None
 
 
 class BaseService:
@@ -39,11 +57,75 @@ class ExampleService(BaseService):
         ).first()
     
     def get_entities(self, skip: int = 0, limit: int = 100) -> List[ExampleEntity]:
-        """Get list of entities."""
+        """
+        Get list of entities.
+        
+        Offset paging reads and discards every skipped row, so deep pages
+        get slower; prefer get_entities_after for paging through results.
+        """
         return self.db.query(ExampleEntity).filter(
             ExampleEntity.is_active == True
         ).offset(skip).limit(limit).all()
     
+    def get_entities_after(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        order_by: str = "id",
+    ) -> Tuple[List[ExampleEntity], Optional[str]]:
+        """
+        Get one page of entities using keyset (seek) pagination.
+        
+        Returns the page and the cursor for the next one, or None after the
+        last page. Each page starts from the sort key of the previous page's
+        last row, so every page costs the same however deep it is. Pass the
+        same order_by ("id" or "created_at") for every page; a cursor that
+        does not match it raises ValueError("invalid cursor").
+        """
+        if order_by not in KEYSET_ORDERS:
+            raise ValueError(f"order_by must be one of {KEYSET_ORDERS}")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        
+        # Rejected before any query runs
+        after = _parse_cursor(cursor, order_by) if cursor else None
+        
+        query = select(ExampleEntity).where(ExampleEntity.is_active == True)
+        if order_by == "created_at":
+            # created_at is not unique; id breaks ties
+            query = query.order_by(ExampleEntity.created_at, ExampleEntity.id)
+            if after:
+                query = query.where(tuple_(ExampleEntity.created_at, ExampleEntity.id) > tuple_(*after))
+        else:
+            query = query.order_by(ExampleEntity.id)
+            if after:
+                query = query.where(ExampleEntity.id > after[0])
+        
+        entities = list(self.db.scalars(query.limit(limit)))
+        if len(entities) < limit:
+            return entities, None
+        last = entities[-1]
+        if order_by == "created_at":
+            return entities, f"{last.created_at.isoformat()},{last.id}"
+        return entities, str(last.id)
+    
+    def iter_entities(self, batch_size: int = 1000) -> Iterator[ExampleEntity]:
+        """
+        Yield every active entity in id order, for exports.
+        
+        Rows are fetched batch_size at a time from a server-side cursor
+        where the database supports one, so memory use stays flat. Finish
+        or close the iterator before using the session for anything else.
+        """
+        query = select(ExampleEntity).where(
+            ExampleEntity.is_active == True
+        ).order_by(ExampleEntity.id).execution_options(yield_per=batch_size)
+        result = self.db.scalars(query)
+        try:
+            yield from result
+        finally:
+            result.close()
+    
     def update_entity(self, entity_id: int, entity_data: ExampleEntityUpdate) -> Optional[ExampleEntity]:
         """Update an entity."""
         entity = self.get_entity(entity_id)
@@ -68,12 +150,73 @@ class ExampleService(BaseService):
         self.db.commit()
         return True
     
-    def search_entities(self, query: str) -> List[ExampleEntity]:
-        """Search entities by name."""
-        return self.db.query(ExampleEntity).filter(
-            ExampleEntity.name.ilike(f"%{query}%"),
-            ExampleEntity.is_active == True
-        ).all()
+    def create_entities(self, entities_data: List[ExampleEntityCreate]) -> List[ExampleEntity]:
+        """
+        Create many entities in one transaction.
+        
+        The rows go to the database as batched INSERT ... RETURNING statements
+        rather than one round trip and refresh per entity. The new entities
+        are returned in ID order.
+        """
+        if not entities_data:
+            return []
+        # Asking RETURNING for parameter order makes SQLite insert row by row
+        entity_ids = list(self.db.scalars(
+            insert(ExampleEntity).returning(ExampleEntity.id),
+            [entity_data.dict() for entity_data in entities_data],
+        ))
+        self.db.commit()
+        # One refresh for the whole batch
+        return list(self.db.scalars(
+            select(ExampleEntity).where(ExampleEntity.id.in_(entity_ids)).order_by(ExampleEntity.id)
+        ))
+    
+    def update_entities(self, updates: Dict[int, ExampleEntityUpdate]) -> List[int]:
+        """
+        Update many entities in one transaction.
+        
+        Takes the changes for each entity ID and returns the IDs that were
+        updated; IDs that do not exist or are deleted are skipped.
+        """
+        if not updates:
+            return []
+        entity_ids = list(self.db.scalars(
+            select(ExampleEntity.id).where(
+                ExampleEntity.id.in_(updates),
+                ExampleEntity.is_active == True
+            )
+        ))
+        now = datetime.utcnow()
+        rows = [
+            {"id": entity_id, "updated_at": now, **updates[entity_id].dict(exclude_unset=True)}
+            for entity_id in entity_ids
+        ]
+        if rows:
+            # Bulk UPDATE by primary key: one executemany per set of changed columns
+            self.db.execute(update(ExampleEntity), rows)
+        self.db.commit()
+        return entity_ids
+    
+    def delete_entities(self, entity_ids: List[int]) -> int:
+        """Soft delete many entities with a single UPDATE; returns how many were deleted."""
+        if not entity_ids:
+            return 0
+        result = self.db.execute(
+            update(ExampleEntity).where(
+                ExampleEntity.id.in_(entity_ids),
+                ExampleEntity.is_active == True
+            ).values(is_active=False, updated_at=datetime.utcnow())
+        )
+        self.db.commit()
+        return result.rowcount
+    
+    def search_entities(self, query: str, limit: int = 100, offset: int = 0) -> List[ExampleEntity]:
+        """
+        Search entities by name, best matches first.
+        
+        Uses the trigram search index on PostgreSQL and SQLite; see search.py.
+        """
+        return search.search_entities(self.db, query, limit=limit, offset=offset)
 
 
 # Add your app-specific services here
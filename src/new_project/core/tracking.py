@@ -0,0 +1,75 @@
+"""
+Node-level execution tracking for gateway runs.
+
+The SDK reports node progress through a TaskManager. This module provides
+a TaskManager that forwards node status changes to callbacks, so the
+gateway can observe node progress without polling the tracking store.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from kailash.tracking.manager import TaskManager
+from kailash.tracking.models import TaskRun, TaskStatus
+
+try:
+    from kailash.tracking.storage.deferred import DeferredStorageBackend
+except ImportError:  # Older SDK releases only ship persistent backends
+    DeferredStorageBackend = None
+
+logger = logging.getLogger(__name__)
+
+NodeCallback = Callable[[TaskRun], None]
+
+# Statuses after which a node will not change again within a run
+FINAL_STATUSES = {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.SKIPPED, TaskStatus.CANCELLED}
+
+
+class NodeEventTaskManager(TaskManager):
+    """
+    TaskManager that calls ``on_node_finished`` when a node reaches a final status.
+
+    ``on_node_started`` is called when a node starts running. Both callbacks
+    run on the thread executing the node. Tracking data is kept in memory
+    when the SDK supports it, so observing a run adds no disk I/O to the
+    execution path. Callback errors are logged and never fail the run.
+    """
+
+    def __init__(
+        self,
+        on_node_finished: NodeCallback,
+        storage_backend: Any = None,
+        on_node_started: Optional[NodeCallback] = None,
+    ):
+        if storage_backend is None and DeferredStorageBackend is not None:
+            storage_backend = DeferredStorageBackend()
+        super().__init__(storage_backend=storage_backend)
+        self.on_node_finished = on_node_finished
+        self.on_node_started = on_node_started
+
+    def update_task_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        ended_at: Any = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        super().update_task_status(
+            task_id, status, result=result, error=error, ended_at=ended_at, metadata=metadata
+        )
+        if status in FINAL_STATUSES:
+            callback = self.on_node_finished
+        elif status == TaskStatus.RUNNING:
+            callback = self.on_node_started
+        else:
+            return
+
+        task = self.get_task(task_id) if callback is not None else None
+        if task is None:
+            return
+        try:
+            callback(task)
+        except Exception as e:
+            logger.warning(f"Node callback failed for {task.node_id}: {e}")
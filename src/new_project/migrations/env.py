@@ -0,0 +1,70 @@
+"""
+Alembic environment for the app's database migrations.
+
+Uses the database URL from config.py and the SQLAlchemy models in
+core/models.py for autogenerate.
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from config import config as app_config
+from core.models import Base
+from core.search import SQLITE_SEARCH_TABLE
+
+alembic_config = context.config
+if alembic_config.config_file_name is not None:
+    fileConfig(alembic_config.config_file_name)
+alembic_config.set_main_option("sqlalchemy.url", app_config.get_database_url().replace("%", "%%"))
+
+target_metadata = Base.metadata
+
+# Search indexes created by raw DDL in migrations, not declared on the models
+UNMANAGED_INDEXES = {"ix_example_entities_name_trgm"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping the search indexes."""
+    if type_ == "table" and name.startswith(SQLITE_SEARCH_TABLE):
+        return False
+    if type_ == "index" and name in UNMANAGED_INDEXES:
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL without connecting to the database."""
+    context.configure(
+        url=alembic_config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run the migrations against the database."""
+    connectable = engine_from_config(
+        alembic_config.get_section(alembic_config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
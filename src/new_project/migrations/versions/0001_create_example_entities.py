@@ -0,0 +1,35 @@
+"""
+Create example_entities.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "example_entities",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.String(length=1000)),
+    )
+    op.create_index("ix_example_entities_id", "example_entities", ["id"])
+    op.create_index("ix_example_entities_name", "example_entities", ["name"])
+    op.create_index("ix_example_entities_created_at_id", "example_entities", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("example_entities")
@@ -0,0 +1,62 @@
+"""
+Add the search index for example_entities.name.
+
+PostgreSQL gets a pg_trgm GIN index, which ILIKE substring filters use.
+SQLite gets an FTS5 table with the trigram tokenizer (SQLite 3.34+),
+kept in sync with example_entities by triggers. See core/search.py.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_example_entities_name_trgm",
+            "example_entities",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE example_entities_fts USING fts5("
+            "name, content='example_entities', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER example_entities_fts_insert AFTER INSERT ON example_entities BEGIN "
+            "INSERT INTO example_entities_fts(rowid, name) VALUES (new.id, new.name); END"
+        )
+        op.execute(
+            "CREATE TRIGGER example_entities_fts_delete AFTER DELETE ON example_entities BEGIN "
+            "INSERT INTO example_entities_fts(example_entities_fts, rowid, name) VALUES ('delete', old.id, old.name); END"
+        )
+        op.execute(
+            "CREATE TRIGGER example_entities_fts_update AFTER UPDATE OF name ON example_entities BEGIN "
+            "INSERT INTO example_entities_fts(example_entities_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+            "INSERT INTO example_entities_fts(rowid, name) VALUES (new.id, new.name); END"
+        )
+        # Index the rows that already exist
+        op.execute("INSERT INTO example_entities_fts(example_entities_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_example_entities_name_trgm", table_name="example_entities")
+    elif dialect == "sqlite":
+        for trigger in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER IF EXISTS example_entities_fts_{trigger}")
+        op.execute("DROP TABLE IF EXISTS example_entities_fts")
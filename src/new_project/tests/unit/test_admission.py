@@ -0,0 +1,121 @@
+"""Unit tests for workflow admission control."""
+
+import asyncio
+
+import pytest
+
+from src.new_project.core.admission import AdmissionController, AdmissionRejectedError
+
+
+def controller(**overrides):
+    options = {
+        "capacity": 1,
+        "classes": {"interactive": (3.0, 100), "batch": (1.0, 100)},
+        "default_class": "batch",
+        "queue_timeout": 5.0,
+    }
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_grants_immediately_while_slots_are_free():
+    admission = controller(capacity=2)
+    assert await admission.acquire("interactive") == "interactive"
+    assert await admission.acquire() == "batch"
+    assert admission.active == 2
+    admission.release("interactive")
+    admission.release("batch")
+    assert admission.active == 0
+
+
+async def test_unknown_class_uses_default():
+    admission = controller()
+    assert await admission.acquire("nonexistent") == "batch"
+
+
+async def test_freed_slots_are_shared_by_weight():
+    admission = controller()
+    await admission.acquire("batch")
+    granted = []
+
+    async def wait_for_slot(name):
+        granted.append(await admission.acquire(name))
+
+    # Batch requests queue first, so a FIFO queue would serve them all first
+    waiters = [asyncio.create_task(wait_for_slot("batch")) for _ in range(8)]
+    await settle()
+    waiters += [asyncio.create_task(wait_for_slot("interactive")) for _ in range(8)]
+    await settle()
+
+    last = "batch"
+    for _ in range(16):
+        admission.release(last)
+        await settle()
+        last = granted[-1]
+    await asyncio.gather(*waiters)
+
+    # Weights 3:1 while both classes are waiting
+    assert granted[:8].count("interactive") == 6
+    assert sorted(granted) == ["batch"] * 8 + ["interactive"] * 8
+
+
+async def test_full_queue_sheds_new_requests():
+    admission = controller(classes={"batch": (1.0, 2)})
+    await admission.acquire()
+    queued = [asyncio.create_task(admission.acquire()) for _ in range(2)]
+    await settle()
+
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        await admission.acquire()
+    assert "queue is full" in rejected.value.reason
+    assert admission.stats()["batch_shed"] == 1
+
+    for _ in range(2):
+        admission.release("batch")
+        await settle()
+    await asyncio.gather(*queued)
+
+
+async def test_queue_timeout_rejects_and_dequeues():
+    admission = controller(queue_timeout=0.05)
+    await admission.acquire()
+
+    with pytest.raises(AdmissionRejectedError):
+        await admission.acquire()
+    stats = admission.stats()
+    assert stats["batch_timed_out"] == 1
+    assert stats["batch_queued"] == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    admission = controller()
+    await admission.acquire()
+    waiter = asyncio.create_task(admission.acquire())
+    await settle()
+    waiter.cancel()
+    await settle()
+
+    assert admission.stats()["batch_queued"] == 0
+    admission.release("batch")
+    assert admission.active == 0
+
+
+async def test_tenant_limit_does_not_block_other_tenants():
+    admission = controller(capacity=3, tenant_limit=1)
+    await admission.acquire(tenant="a")
+    second_a = asyncio.create_task(admission.acquire(tenant="a"))
+    await settle()
+
+    # Capacity is free, but tenant "a" is at its limit
+    assert not second_a.done()
+    assert await admission.acquire(tenant="b") == "batch"
+
+    admission.release("batch", tenant="a")
+    await settle()
+    assert second_a.done()
+    assert admission.active == 2
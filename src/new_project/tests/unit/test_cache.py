@@ -0,0 +1,114 @@
+"""Unit tests for the workflow result cache."""
+
+import asyncio
+
+import pytest
+
+from src.new_project.core.cache import ResultCache, canonical_key
+
+
+def test_canonical_key_ignores_dict_order():
+    assert canonical_key("wf", {"a": 1, "b": 2}) == canonical_key("wf", {"b": 2, "a": 1})
+    assert canonical_key("wf", {"a": 1}).startswith("wf:")
+    assert canonical_key("wf", {"a": 1}) != canonical_key("wf", {"a": 2})
+
+
+async def test_concurrent_callers_share_one_run():
+    cache = ResultCache()
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    callers = [asyncio.create_task(cache.get_or_compute("k", 60, compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers)
+
+    assert calls == 1
+    assert [value for value, _ in results] == ["result"] * 5
+    assert sorted(status for _, status in results) == ["coalesced"] * 4 + ["miss"]
+    assert await cache.get_or_compute("k", 60, compute) == ("result", ResultCache.HIT)
+
+
+async def test_failures_are_not_cached():
+    cache = ResultCache()
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute("k", 60, fail)
+
+    async def succeed():
+        return 1
+
+    assert await cache.get_or_compute("k", 60, succeed) == (1, ResultCache.MISS)
+
+
+async def test_expired_entries_are_recomputed():
+    cache = ResultCache()
+    values = iter([1, 2])
+
+    async def compute():
+        return next(values)
+
+    assert (await cache.get_or_compute("k", 0, compute))[0] == 1
+    assert (await cache.get_or_compute("k", 0, compute))[0] == 2
+
+
+async def test_lru_eviction():
+    cache = ResultCache(max_size=2)
+
+    async def compute():
+        return "v"
+
+    for key in ("a", "b", "a", "c"):
+        await cache.get_or_compute(key, 60, compute)
+
+    assert cache.stats()["evictions"] == 1
+    assert (await cache.get_or_compute("a", 60, compute))[1] == ResultCache.HIT
+    assert (await cache.get_or_compute("b", 60, compute))[1] == ResultCache.MISS
+
+
+async def test_invalidate_by_prefix():
+    cache = ResultCache()
+
+    async def compute():
+        return "v"
+
+    for key in ("wf1:a", "wf1:b", "wf2:a"):
+        await cache.get_or_compute(key, 60, compute)
+
+    assert cache.invalidate("wf1:") == 2
+    assert (await cache.get_or_compute("wf2:a", 60, compute))[1] == ResultCache.HIT
+    assert (await cache.get_or_compute("wf1:a", 60, compute))[1] == ResultCache.MISS
+    assert cache.invalidate() == 2
+
+
+@pytest.mark.parametrize("prefix", [None, "wf:"])
+async def test_run_in_progress_during_invalidate_is_not_cached(prefix):
+    cache = ResultCache()
+    release = asyncio.Event()
+
+    async def stale():
+        await release.wait()
+        return "stale"
+
+    async def fresh():
+        return "fresh"
+
+    first = asyncio.create_task(cache.get_or_compute("wf:k", 60, stale))
+    await asyncio.sleep(0)
+    cache.invalidate(prefix)
+
+    # Callers after the invalidation do not join the stale run
+    assert await asyncio.wait_for(cache.get_or_compute("wf:k", 60, fresh), 1) == ("fresh", ResultCache.MISS)
+
+    release.set()
+    assert await first == ("stale", ResultCache.MISS)
+    assert await cache.get_or_compute("wf:k", 60, stale) == ("fresh", ResultCache.HIT)
@@ -0,0 +1,73 @@
+"""Unit tests for the background job queue."""
+
+import asyncio
+
+import pytest
+
+from src.new_project.core.admission import AdmissionController
+from src.new_project.core.executor import WorkflowExecutor
+from src.new_project.core.jobs import JobManager, JobStatus
+from src.new_project.core.registry import WorkflowRegistry
+from src.new_project.workflows.get_status import create_workflow
+
+
+@pytest.fixture
+async def jobs():
+    admission = AdmissionController(
+        capacity=1,
+        classes={"batch": (1.0, 10)},
+        default_class="batch",
+        queue_timeout=0.05,
+        retry_after=0,
+    )
+    registry = WorkflowRegistry()
+    registry.register("get_status", create_workflow)
+    manager = JobManager(
+        WorkflowExecutor(max_concurrency=1, admission=admission),
+        registry,
+        workers=1,
+        slot_timeout=0.3,
+    )
+    await manager.start()
+    yield manager, admission
+    await manager.stop()
+
+
+async def wait_done(job, timeout=5.0):
+    async def poll():
+        while not job.done:
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_run_completes(jobs):
+    manager, _ = jobs
+    job = manager.submit("get_status", {})
+    await wait_done(job)
+    assert job.status == JobStatus.COMPLETED
+    assert job.results["status_check"]["result"]["status"] == "healthy"
+
+
+async def test_rejected_run_retries_until_a_slot_frees(jobs):
+    manager, admission = jobs
+    await admission.acquire()
+    job = manager.submit("get_status", {})
+    await asyncio.sleep(0.15)
+    assert job.status == JobStatus.RUNNING
+
+    admission.release("batch")
+    await wait_done(job)
+    assert job.status == JobStatus.COMPLETED
+
+
+async def test_rejected_run_fails_after_slot_timeout(jobs):
+    manager, admission = jobs
+    await admission.acquire()
+    job = manager.submit("get_status", {})
+
+    await wait_done(job)
+    assert job.status == JobStatus.FAILED
+    assert "No execution slot within 0.3s" in job.error
+    assert "rejected by admission control" in job.error
+    assert [event["type"] for event in job.events] == ["run_started", "run_failed"]
+    admission.release("batch")
@@ -0,0 +1,39 @@
+"""Unit tests for workflow run profiling."""
+
+import os
+import tracemalloc
+
+from kailash.workflow.builder import WorkflowBuilder
+
+from src.new_project.core.profiler import WorkflowProfiler
+
+
+def build_workflow():
+    builder = WorkflowBuilder()
+    builder.add_node("PythonCodeNode", "step", {"code": "result = 1"})
+    return builder.build()
+
+
+def test_tracing_runs_only_while_profiling():
+    was_tracing = tracemalloc.is_tracing()
+    with WorkflowProfiler("wf", build_workflow()):
+        assert tracemalloc.is_tracing()
+    assert tracemalloc.is_tracing() == was_tracing
+
+
+def test_write_collapsed_keeps_newest_profiles(tmp_path):
+    profiler = WorkflowProfiler("wf", build_workflow())
+    for run in range(5):
+        path = profiler.write_collapsed(str(tmp_path), f"run{run}", max_files=3)
+        # Distinct mtimes so the age order is deterministic
+        os.utime(path, (run, run))
+
+    assert sorted(p.name for p in tmp_path.glob("*.folded")) == ["wf-run2.folded", "wf-run3.folded", "wf-run4.folded"]
+
+
+def test_write_collapsed_without_limit_keeps_everything(tmp_path):
+    profiler = WorkflowProfiler("wf", build_workflow())
+    for run in range(5):
+        profiler.write_collapsed(str(tmp_path), f"run{run}")
+
+    assert len(list(tmp_path.glob("*.folded"))) == 5
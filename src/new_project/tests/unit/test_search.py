@@ -0,0 +1,133 @@
+"""Unit tests for entity name search on SQLite."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from src.new_project.core import search
+from src.new_project.core.models import Base, ExampleEntity
+
+APP_DIR = Path(__file__).resolve().parents[2]
+
+NAMES = ["Invoice processing", "invoice", "Receipts", "50% discount", "Pro_invoice archive"]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(ExampleEntity(name=name) for name in NAMES)
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def inspections(monkeypatch):
+    calls = []
+
+    def inspect(engine):
+        calls.append(engine)
+        return real_inspect(engine)
+
+    real_inspect = search.inspect
+    monkeypatch.setattr(search, "inspect", inspect)
+    return calls
+
+
+def create_search_table(db):
+    # The SQLite DDL from migrations/versions/0002_example_entity_search.py
+    db.execute(text(
+        f"CREATE VIRTUAL TABLE {search.SQLITE_SEARCH_TABLE} USING fts5("
+        "name, content='example_entities', content_rowid='id', tokenize='trigram')"
+    ))
+    db.execute(text(f"INSERT INTO {search.SQLITE_SEARCH_TABLE}({search.SQLITE_SEARCH_TABLE}) VALUES ('rebuild')"))
+    db.commit()
+
+
+def names(entities):
+    return [entity.name for entity in entities]
+
+
+def test_fallback_ranks_shorter_names_first(db):
+    assert names(search.search_entities(db, "INVOICE")) == ["invoice", "Invoice processing", "Pro_invoice archive"]
+    # LIKE wildcards in the query match literally
+    assert names(search.search_entities(db, "%")) == ["50% discount"]
+    assert names(search.search_entities(db, "o_i")) == ["Pro_invoice archive"]
+
+
+def test_trigram_index_matches_substrings(db):
+    create_search_table(db)
+    assert set(names(search.search_entities(db, "nvoic"))) == {"invoice", "Invoice processing", "Pro_invoice archive"}
+    assert names(search.search_entities(db, "receipt", limit=1)) == ["Receipts"]
+
+
+def test_inactive_entities_are_not_found(db):
+    create_search_table(db)
+    db.query(ExampleEntity).filter(ExampleEntity.name == "Receipts").update({"is_active": False})
+    db.commit()
+    assert search.search_entities(db, "receipt") == []
+
+
+def test_missing_index_is_rechecked_after_a_delay(db, inspections, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(search.time, "monotonic", lambda: now[0])
+
+    search.search_entities(db, "invoice")
+    search.search_entities(db, "invoice")
+    assert len(inspections) == 1
+
+    # Migrating a running app is picked up once the recheck delay has passed
+    create_search_table(db)
+    now[0] += search.INDEX_RECHECK_SECONDS
+    search.search_entities(db, "invoice")
+    assert len(inspections) == 2
+
+    # A table that exists is not checked again
+    now[0] += search.INDEX_RECHECK_SECONDS
+    search.search_entities(db, "invoice")
+    assert len(inspections) == 2
+
+
+@pytest.fixture
+def migrated_db(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    # alembic has to run from the app directory; see alembic.ini
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=APP_DIR,
+        env={**os.environ, "DATABASE_URL": url},
+        check=True,
+        capture_output=True,
+    )
+    engine = create_engine(url)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def test_migrated_search_table_follows_entity_changes(migrated_db):
+    db = migrated_db
+    # Searches go through the FTS table, not the ILIKE fallback
+    assert search._has_sqlite_index(db)
+    entity = ExampleEntity(name="Quarterly invoice run")
+    db.add(entity)
+    db.commit()
+    assert names(search.search_entities(db, "invoice")) == ["Quarterly invoice run"]
+
+    entity.name = "Quarterly receipt run"
+    db.commit()
+    assert search.search_entities(db, "invoice") == []
+    assert names(search.search_entities(db, "receipt")) == ["Quarterly receipt run"]
+
+    db.delete(entity)
+    db.commit()
+    assert search.search_entities(db, "receipt") == []
+    # The FTS table itself has no rows left, not just no matching entities
+    assert db.execute(text(f"SELECT count(*) FROM {search.SQLITE_SEARCH_TABLE}")).scalar() == 0
@@ -0,0 +1,148 @@
+"""Unit tests for the entity service, against in-memory SQLite."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.new_project.core.models import Base, ExampleEntity, ExampleEntityCreate, ExampleEntityUpdate
+from src.new_project.core.services import ExampleService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def service(db):
+    return ExampleService(db)
+
+
+def add_entities(db, count, created_at=None):
+    start = datetime(2024, 1, 1)
+    # Pairs of rows share a created_at, so ties must be broken by id
+    entities = [
+        ExampleEntity(name=f"entity {number}", created_at=created_at or start - timedelta(minutes=number // 2))
+        for number in range(count)
+    ]
+    db.add_all(entities)
+    db.commit()
+    return entities
+
+
+def all_pages(service, limit, order_by):
+    pages, cursor = [], None
+    while True:
+        page, cursor = service.get_entities_after(cursor, limit=limit, order_by=order_by)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 100])
+def test_keyset_pages_by_id(db, service, limit):
+    entities = add_entities(db, 12)
+    service.delete_entity(entities[5].id)
+
+    pages = all_pages(service, limit, "id")
+    ids = [entity.id for page in pages for entity in page]
+    assert ids == [entity.id for entity in entities if entity.id != entities[5].id]
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 100])
+def test_keyset_pages_by_created_at(db, service, limit):
+    entities = add_entities(db, 12)
+
+    pages = all_pages(service, limit, "created_at")
+    ids = [entity.id for page in pages for entity in page]
+    expected = sorted(entities, key=lambda entity: (entity.created_at, entity.id))
+    assert ids == [entity.id for entity in expected]
+
+
+def test_cursor_round_trip(db, service):
+    entities = add_entities(db, 4)
+
+    page, cursor = service.get_entities_after(limit=2, order_by="id")
+    assert cursor == str(page[-1].id)
+
+    page, cursor = service.get_entities_after(limit=2, order_by="created_at")
+    created_at, entity_id = cursor.rsplit(",", 1)
+    assert (datetime.fromisoformat(created_at), int(entity_id)) == (page[-1].created_at, page[-1].id)
+    rest, _ = service.get_entities_after(cursor, limit=10, order_by="created_at")
+    assert {entity.id for entity in page + rest} == {entity.id for entity in entities}
+
+
+@pytest.mark.parametrize("cursor, order_by", [
+    ("abc", "id"),
+    ("2024-01-01T00:00:00,3", "id"),
+    ("3", "created_at"),
+    ("yesterday,3", "created_at"),
+    ("2024-01-01T00:00:00,x", "created_at"),
+])
+def test_malformed_cursor_is_rejected(service, cursor, order_by):
+    with pytest.raises(ValueError, match="invalid cursor"):
+        service.get_entities_after(cursor, order_by=order_by)
+
+
+def test_unknown_order_is_rejected(service):
+    with pytest.raises(ValueError, match="order_by"):
+        service.get_entities_after(order_by="name")
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_non_positive_limit_is_rejected(db, service, limit):
+    add_entities(db, 3)
+    with pytest.raises(ValueError, match="limit"):
+        service.get_entities_after(limit=limit)
+
+
+def test_create_entities(service):
+    created = service.create_entities([
+        ExampleEntityCreate(name="first", description="one"),
+        ExampleEntityCreate(name="second"),
+    ])
+    assert [entity.name for entity in created] == ["first", "second"]
+    assert created[0].id < created[1].id
+    assert created[0].description == "one"
+    assert all(entity.is_active and entity.created_at for entity in created)
+    assert service.create_entities([]) == []
+
+
+def test_update_entities_skips_missing_and_deleted(db, service):
+    entities = add_entities(db, 3)
+    service.delete_entity(entities[2].id)
+    before = entities[0].updated_at
+
+    updated = service.update_entities({
+        entities[0].id: ExampleEntityUpdate(name="renamed"),
+        entities[1].id: ExampleEntityUpdate(description="described"),
+        entities[2].id: ExampleEntityUpdate(name="deleted"),
+        999: ExampleEntityUpdate(name="missing"),
+    })
+    assert sorted(updated) == [entities[0].id, entities[1].id]
+
+    db.expire_all()
+    assert service.get_entity(entities[0].id).name == "renamed"
+    assert service.get_entity(entities[0].id).updated_at > before
+    # Fields not set in the update are left alone
+    assert service.get_entity(entities[1].id).name == "entity 1"
+    assert service.get_entity(entities[1].id).description == "described"
+    assert db.get(ExampleEntity, entities[2].id).name == "entity 2"
+    assert service.update_entities({}) == []
+
+
+def test_delete_entities_counts_only_active_rows(db, service):
+    entities = add_entities(db, 4)
+    service.delete_entity(entities[0].id)
+
+    assert service.delete_entities([entity.id for entity in entities[:3]] + [999]) == 2
+    db.expire_all()
+    assert [entity.id for entity in service.get_entities()] == [entities[3].id]
+    assert service.delete_entities([]) == 0
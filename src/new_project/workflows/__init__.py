@@ -0,0 +1,14 @@
+"""
+Workflow definitions served by the gateway.
+
+Every public module in this package is discovered at gateway startup and
+registered under its module name, without being imported. The module is
+imported the first time its workflow is requested.
+
+Workflow Module Conventions:
+1. Define create_workflow() returning a WorkflowBuilder
+2. Optionally set VERSION, DESCRIPTION and CACHE_TTL (seconds, idempotent
+   workflows only)
+3. Keep imports at module level cheap; they run on first request
+4. Prefix helper modules with an underscore so they are not registered
+"""
@@ -0,0 +1,39 @@
+"""
+Status check workflow.
+
+Reports application status and environment information.
+"""
+
+from kailash.workflow.builder import WorkflowBuilder
+
+from ..config import config
+
+VERSION = config.app_version
+DESCRIPTION = "Get application status and health information"
+CACHE_TTL = config.result_cache_ttl
+
+
+def create_workflow() -> WorkflowBuilder:
+    """Create the status check workflow."""
+    workflow = WorkflowBuilder()
+    
+    # Add a simple status check workflow
+    workflow.add_node(
+        "PythonCodeNode", 
+        "status_check",
+        {
+            "code": """
+import time
+import os
+
+result = {
+    "status": "healthy",
+    "timestamp": time.time(),
+    "environment": os.getenv("ENVIRONMENT", "development"),
+    "message": "Kailash SDK Template is running successfully"
+}
+"""
+        }
+    )
+    
+    return workflow
@@ -0,0 +1,16 @@
+"""
+Shared setup for tests of the deployment services.
+
+The gateway and registry modules are copied flat into their images and
+import each other as top-level modules, so their directories are put on
+the path the same way.
+"""
+
+import sys
+from pathlib import Path
+
+DOCKER_DIR = Path(__file__).resolve().parents[2] / "deployment" / "docker"
+
+for path in (DOCKER_DIR, DOCKER_DIR / "gateway"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
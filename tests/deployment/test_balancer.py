@@ -0,0 +1,69 @@
+"""Unit tests for replica balancing and its circuit breakers."""
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from balancer import ServiceBalancer
+from circuit import OPEN, BreakerSet, CircuitOpenError
+from upstream import UpstreamPool
+
+
+def service(name="svc", replicas=None):
+    api = {"replicas": replicas} if replicas else {}
+    return SimpleNamespace(name=name, api_port=8000, capabilities={"api": api}, endpoints=None)
+
+
+@pytest.mark.parametrize("replica", ["http://svc-1:80", "http://svc-1/api", "svc-1:80/", "HTTP://SVC-1"])
+async def test_failed_responses_open_the_replicas_breaker(replica):
+    breakers = BreakerSet(consecutive_failures=2)
+    balancer = ServiceBalancer(breakers)
+    svc = service(replicas=[replica])
+    await balancer.refresh(svc)
+
+    hook = UpstreamPool(breakers)._count_response(svc.name)
+    endpoint = balancer.pick(svc)
+    for _ in range(2):
+        # What the shared client's response hook sees for a request to this replica
+        request = httpx.Request("GET", f"{endpoint.url}/items")
+        await hook(httpx.Response(503, request=request))
+
+    assert endpoint.breaker.stats()["state"] == OPEN
+    with pytest.raises(CircuitOpenError):
+        balancer.pick(svc)
+
+
+async def test_transport_errors_are_recorded_against_the_replica():
+    breakers = BreakerSet(consecutive_failures=1)
+    balancer = ServiceBalancer(breakers)
+    svc = service(replicas=["http://svc-1:80/api"])
+    await balancer.refresh(svc)
+
+    UpstreamPool(breakers).record_error(svc.name, balancer.pick(svc).url)
+    assert balancer.circuit(svc)["state"] == OPEN
+
+
+async def test_removed_replicas_release_their_breakers():
+    breakers = BreakerSet()
+    balancer = ServiceBalancer(breakers)
+    await balancer.sync([service(replicas=["svc-1:8000", "svc-2:8000"]), service("other", ["svc-2:8000"])])
+    assert set(breakers.stats()) == {"http://svc-1:8000", "http://svc-2:8000"}
+
+    # svc-2 is still used by the other service
+    await balancer.sync([service(replicas=["svc-1:8000"]), service("other", ["svc-2:8000"])])
+    assert set(breakers.stats()) == {"http://svc-1:8000", "http://svc-2:8000"}
+
+    await balancer.sync([service(replicas=["svc-3:8000"])])
+    assert set(breakers.stats()) == {"http://svc-3:8000"}
+
+
+async def test_remaining_replicas_keep_their_state():
+    balancer = ServiceBalancer(BreakerSet())
+    await balancer.refresh(service(replicas=["svc-1:8000", "svc-2:8000"]))
+    kept = balancer.endpoints(service())[0]
+    kept.started()
+
+    await balancer.refresh(service(replicas=["svc-1:8000", "svc-3:8000"]))
+    assert balancer.endpoints(service())[0] is kept
+    assert kept.outstanding == 1
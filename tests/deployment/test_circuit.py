@@ -0,0 +1,142 @@
+"""Unit tests for the gateway's circuit breakers."""
+
+import pytest
+
+import circuit
+from circuit import CLOSED, HALF_OPEN, OPEN, BreakerSet, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit.time, "monotonic", fake)
+    return fake
+
+
+def breaker(**overrides):
+    settings = {
+        "window": 10.0,
+        "min_requests": 10,
+        "error_rate": 0.5,
+        "consecutive_failures": 3,
+        "open_seconds": 5.0,
+        "max_open_seconds": 20.0,
+    }
+    settings.update(overrides)
+    return CircuitBreaker("http://replica", **settings)
+
+
+def test_opens_after_consecutive_failures(clock):
+    b = breaker()
+    b.record_failure()
+    b.record_failure()
+    b.record_success()
+    b.record_failure()
+    b.record_failure()
+    assert b.state == CLOSED
+
+    b.record_failure()
+    assert b.state == OPEN
+    assert not b.allow()
+    with pytest.raises(CircuitOpenError) as error:
+        b.check()
+    assert error.value.retry_after == pytest.approx(5.0)
+
+
+def test_opens_on_error_rate_once_the_window_has_enough_calls(clock):
+    b = breaker(consecutive_failures=100)
+    for _ in range(4):
+        b.record_success()
+        b.record_failure()
+    # 50% errors, but only 8 calls so far
+    assert b.state == CLOSED
+
+    b.record_success()
+    b.record_failure()
+    assert b.state == OPEN
+
+
+def test_old_outcomes_leave_the_window(clock):
+    b = breaker(consecutive_failures=100)
+    for _ in range(9):
+        b.record_failure()
+    clock.advance(11)
+    b.record_success()
+    b.record_failure()
+    assert b.state == CLOSED
+    assert b.stats()["window_requests"] == 2
+
+
+def test_half_open_admits_one_trial_and_closes_on_success(clock):
+    b = breaker()
+    for _ in range(3):
+        b.record_failure()
+    clock.advance(5)
+
+    assert b.available()
+    assert b.allow()
+    assert b.state == HALF_OPEN
+    # Only one trial call at a time
+    assert not b.allow()
+
+    b.record_success()
+    assert b.state == CLOSED
+    assert b.ejections == 0
+    assert b.allow()
+
+
+def test_failed_trial_reopens_for_twice_as_long(clock):
+    b = breaker()
+    for _ in range(3):
+        b.record_failure()
+
+    expected = [10.0, 20.0, 20.0]  # doubling, capped at max_open_seconds
+    clock.advance(5)
+    for duration in expected:
+        assert b.allow()
+        b.record_failure()
+        assert b.state == OPEN
+        assert b.retry_after() == pytest.approx(duration)
+        clock.advance(duration)
+
+
+def test_trial_that_never_reports_back_is_replaced(clock):
+    b = breaker()
+    for _ in range(3):
+        b.record_failure()
+    clock.advance(5)
+    assert b.allow()
+
+    clock.advance(6)
+    assert b.allow()
+
+
+def test_stats_report_half_open_once_the_open_period_is_over(clock):
+    b = breaker()
+    for _ in range(3):
+        b.record_failure()
+    assert b.stats()["state"] == OPEN
+    clock.advance(5)
+    assert b.stats()["state"] == HALF_OPEN
+
+
+def test_breaker_set_creates_one_breaker_per_endpoint():
+    breakers = BreakerSet(consecutive_failures=1)
+    first = breakers.get("http://a")
+    assert breakers.get("http://a") is first
+    assert breakers.get("http://b") is not first
+    assert first.consecutive_failures == 1
+
+    breakers.remove("http://a")
+    assert set(breakers.stats()) == {"http://b"}
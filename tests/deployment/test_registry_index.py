@@ -0,0 +1,110 @@
+"""Unit tests for the AI registry search index."""
+
+import random
+
+import pytest
+
+import registry_index
+from registry_index import RegistryIndex
+
+WORDS = [
+    "fraud", "detection", "forecasting", "predictive", "maintenance", "finance",
+    "retail", "vision", "language", "model", "supply", "chain", "pricing",
+    "customer", "churn", "risk", "sensor", "anomaly", "recommendation", "demand",
+]
+CATEGORIES = ["Finance", "Retail", "Manufacturing", "Healthcare"]
+
+
+def entry(number, rng):
+    return {
+        "company": f"Company {number}",
+        "use_case": " ".join(rng.choices(WORDS, k=rng.randint(1, 4))),
+        "category": rng.choice(CATEGORIES),
+        "tags": rng.sample(WORDS, 2),
+        "implementation": " ".join(rng.choices(WORDS, k=rng.randint(5, 30))),
+    }
+
+
+@pytest.fixture
+def entries():
+    rng = random.Random(7)
+    return [entry(number, rng) for number in range(500)]
+
+
+def search_both_ways(monkeypatch, index, *args, **kwargs):
+    monkeypatch.setattr(registry_index, "EXHAUSTIVE_POSTINGS", 0)
+    threshold = index.search(*args, **kwargs)
+    monkeypatch.setattr(registry_index, "EXHAUSTIVE_POSTINGS", float("inf"))
+    exhaustive = index.search(*args, **kwargs)
+    return threshold, exhaustive
+
+
+@pytest.mark.parametrize("query", ["fraud", "fraud detection", "supply chain risk", "predictive maintenance model"])
+@pytest.mark.parametrize("limit", [1, 5, 50])
+def test_threshold_search_matches_exhaustive_scoring(monkeypatch, entries, query, limit):
+    index = RegistryIndex(entries)
+    threshold, exhaustive = search_both_ways(monkeypatch, index, query, limit=limit)
+    assert [item["company"] for item in threshold] == [item["company"] for item in exhaustive]
+    assert len(exhaustive) == limit
+
+
+def test_threshold_search_matches_exhaustive_within_category(monkeypatch, entries):
+    index = RegistryIndex(entries)
+    threshold, exhaustive = search_both_ways(monkeypatch, index, "customer churn", "retail", limit=10)
+    assert threshold == exhaustive
+    assert {item["category"] for item in exhaustive} == {"Retail"}
+
+
+def test_field_weights_rank_use_case_matches_first():
+    index = RegistryIndex([
+        {"company": "A", "use_case": "chatbot", "category": "Retail", "implementation": "vision"},
+        {"company": "B", "use_case": "vision inspection", "category": "Manufacturing"},
+    ])
+    assert [item["company"] for item in index.search("vision")] == ["B", "A"]
+
+
+def test_last_term_matches_as_prefix(entries):
+    index = RegistryIndex(entries)
+    results = index.search("predict")
+    assert results
+    assert all("predictive" in " ".join(str(value) for value in item.values()) for item in results)
+    # A single character is too short to expand
+    assert index.search("p") == []
+
+
+def test_empty_query_lists_entries_in_order(entries):
+    index = RegistryIndex(entries)
+    assert index.search(limit=3) == entries[:3]
+    assert index.search(category="Healthcare", limit=2) == [item for item in entries if item["category"] == "Healthcare"][:2]
+
+
+def test_non_positive_limit_returns_nothing(monkeypatch, entries):
+    index = RegistryIndex(entries)
+    monkeypatch.setattr(registry_index, "EXHAUSTIVE_POSTINGS", 0)
+    for limit in (0, -1):
+        assert index.search("fraud", limit=limit) == []
+        assert index.search(limit=limit) == []
+
+
+def test_update_and_remove_reindex_one_entry(monkeypatch, entries):
+    index = RegistryIndex(entries)
+    target = index.add({"company": "Zeta", "use_case": "quantum annealing", "category": "Research"})
+    assert index.search("quantum")[0]["company"] == "Zeta"
+    assert "Research" in index.categories()
+
+    index.update(target, {"company": "Zeta", "use_case": "fraud detection", "category": "Finance"})
+    assert index.search("quantum") == []
+    assert "Research" not in index.categories()
+    assert index.find_company("zeta")["use_case"] == "fraud detection"
+
+    index.remove(target)
+    assert index.find_company("Zeta") is None
+    assert len(index) == len(entries)
+    # Incremental changes leave the same rankings as a fresh build
+    threshold, exhaustive = search_both_ways(monkeypatch, index, "fraud detection", limit=20)
+    assert threshold == exhaustive == RegistryIndex(entries).search("fraud detection", limit=20)
+
+
+def test_resolved_entries_are_fetched_by_id(entries):
+    index = RegistryIndex(entries, resolve=entries.__getitem__)
+    assert index.search("fraud", limit=3) == RegistryIndex(entries).search("fraud", limit=3)
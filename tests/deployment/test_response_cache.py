@@ -0,0 +1,273 @@
+"""Unit tests for the gateway's HTTP response cache."""
+
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+
+import response_cache
+from response_cache import CachedResponse, ResponseCache, freshness, parse_cache_control
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(response_cache.time, "time", fake)
+    return fake
+
+
+class Upstream:
+    """Answers with queued (status, body, headers) responses and records the requests it received."""
+
+    def __init__(self, *responses, delay: float = 0.0):
+        self.responses = list(responses)
+        self.requests = []
+        self.delay = delay
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self.handle), base_url="http://upstream")
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status, body, headers = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        # A fresh, unread stream per request, as from a real upstream
+        return httpx.Response(status, headers={**headers, "content-length": str(len(body))}, stream=httpx.ByteStream(body))
+
+    async def fetch(self, validators):
+        request = self.client.build_request("GET", "/items", headers=validators)
+        return await self.client.send(request, stream=True)
+
+
+def response(body: bytes = b"payload", status: int = 200, **headers):
+    return status, body, {name.replace("_", "-"): value for name, value in headers.items()}
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('Max-Age=60, no-cache, private="set-cookie"') == {
+        "max-age": "60",
+        "no-cache": None,
+        "private": "set-cookie",
+    }
+
+
+def test_freshness_lifetime_and_age():
+    now = 1_700_000_000.0
+    date = email.utils.formatdate(now - 10, usegmt=True)
+
+    assert freshness(httpx.Headers({"cache-control": "max-age=60, s-maxage=120"}), now) == (120.0, 0.0)
+    assert freshness(httpx.Headers({"cache-control": "max-age=60", "age": "5"}), now) == (60.0, 5.0)
+    assert freshness(httpx.Headers({"cache-control": "max-age=60", "date": date}), now) == (60.0, 10.0)
+    expires = email.utils.formatdate(now + 30, usegmt=True)
+    assert freshness(httpx.Headers({"expires": expires, "date": email.utils.formatdate(now, usegmt=True)}), now)[0] == 30.0
+    assert freshness(httpx.Headers({"expires": "not a date"}), now)[0] == 0.0
+    assert freshness(httpx.Headers({}), now)[0] is None
+
+
+async def test_fresh_responses_are_served_from_memory(clock):
+    upstream = Upstream(response(cache_control="max-age=60"))
+    cache = ResponseCache()
+
+    first, status = await cache.fetch("svc/items", {}, upstream.fetch)
+    assert status == "MISS"
+    assert isinstance(first, CachedResponse) and first.body == b"payload"
+
+    clock.now += 30
+    second, status = await cache.fetch("svc/items", {}, upstream.fetch)
+    assert status == "HIT"
+    assert second.body == b"payload"
+    assert second.age() == pytest.approx(30)
+    assert len(upstream.requests) == 1
+
+
+async def test_stale_response_is_revalidated_with_its_etag(clock):
+    upstream = Upstream(
+        response(cache_control="max-age=10", etag='"v1"'),
+        response(b"", status=304, cache_control="max-age=100", etag='"v1"'),
+    )
+    cache = ResponseCache()
+    await cache.fetch("svc/items", {}, upstream.fetch)
+
+    clock.now += 11
+    entry, status = await cache.fetch("svc/items", {}, upstream.fetch)
+    assert status == "REVALIDATED"
+    assert upstream.requests[1].headers["if-none-match"] == '"v1"'
+    assert entry.body == b"payload"
+    # The 304's headers replace the stored ones
+    assert entry.lifetime == 100
+
+    clock.now += 50
+    assert (await cache.fetch("svc/items", {}, upstream.fetch))[1] == "HIT"
+    assert len(upstream.requests) == 2
+
+
+async def test_changed_resource_replaces_the_stored_response(clock):
+    upstream = Upstream(
+        response(b"old", cache_control="no-cache", etag='"v1"'),
+        response(b"new", cache_control="no-cache", etag='"v2"'),
+    )
+    cache = ResponseCache()
+    await cache.fetch("svc/items", {}, upstream.fetch)
+
+    # no-cache responses are revalidated on every use
+    entry, status = await cache.fetch("svc/items", {}, upstream.fetch)
+    assert status == "MISS"
+    assert entry.body == b"new"
+    assert entry.etag == '"v2"'
+
+
+async def test_request_no_cache_forces_revalidation(clock):
+    upstream = Upstream(
+        response(cache_control="max-age=60", etag='"v1"'),
+        response(b"", status=304, etag='"v1"'),
+    )
+    cache = ResponseCache()
+    await cache.fetch("svc/items", {}, upstream.fetch)
+
+    assert (await cache.fetch("svc/items", {"cache-control": "no-cache"}, upstream.fetch))[1] == "REVALIDATED"
+
+
+@pytest.mark.parametrize("headers", [
+    {"cache_control": "no-store"},
+    {"cache_control": "private, max-age=60"},
+    {"cache_control": "max-age=60", "set_cookie": "session=1"},
+    {"cache_control": "max-age=60", "vary": "*"},
+    {},  # no lifetime and no validator
+])
+async def test_uncacheable_responses_are_passed_through(clock, headers):
+    upstream = Upstream(response(**headers))
+    cache = ResponseCache()
+
+    result, status = await cache.fetch("svc/items", {}, upstream.fetch)
+    assert status == "BYPASS"
+    assert isinstance(result, httpx.Response)
+    assert b"".join([chunk async for chunk in result.aiter_raw()]) == b"payload"
+    await result.aclose()
+    assert cache.stats()["entries"] == 0
+
+
+async def test_authorized_requests_are_stored_only_when_marked_public(clock):
+    cache = ResponseCache()
+    authorized = {"authorization": "Bearer token"}
+
+    private = Upstream(response(cache_control="max-age=60"))
+    result, status = await cache.fetch("svc/a", authorized, private.fetch)
+    await result.aclose()
+    assert status == "BYPASS"
+
+    public = Upstream(response(cache_control="public, max-age=60"))
+    assert (await cache.fetch("svc/b", authorized, public.fetch))[1] == "MISS"
+
+
+async def test_concurrent_misses_share_one_upstream_request(clock):
+    upstream = Upstream(response(cache_control="max-age=60"), delay=0.05)
+    cache = ResponseCache()
+
+    results = await asyncio.gather(*(cache.fetch("svc/items", {}, upstream.fetch) for _ in range(10)))
+    assert len(upstream.requests) == 1
+    assert sorted(status for _, status in results) == ["HIT"] * 9 + ["MISS"]
+    assert cache.stats()["coalesced"] == 9
+
+
+async def test_vary_keeps_one_variant_per_key(clock):
+    upstream = Upstream(response(cache_control="max-age=60", vary="Accept-Language"))
+    cache = ResponseCache()
+
+    await cache.fetch("svc/items", {"accept-language": "en"}, upstream.fetch)
+    assert (await cache.fetch("svc/items", {"accept-language": "en"}, upstream.fetch))[1] == "HIT"
+    assert (await cache.fetch("svc/items", {"accept-language": "de"}, upstream.fetch))[1] == "MISS"
+
+
+async def test_memory_budget_evicts_least_recently_used(clock):
+    upstream = Upstream(response(b"x" * 100, cache_control="max-age=60"))
+    first = await ResponseCache().fetch("k", {}, upstream.fetch)
+    cache = ResponseCache(max_bytes=first[0].size() * 2)
+
+    for key in ("a", "b", "a", "c"):
+        await cache.fetch(key, {}, upstream.fetch)
+
+    assert cache.stats()["evictions"] == 1
+    assert await cache.get("a") is not None
+    assert await cache.get("b") is None
+
+
+async def test_invalidate_path_with_any_query(clock, tmp_path):
+    upstream = Upstream(response(cache_control="max-age=60"))
+    cache = ResponseCache(directory=str(tmp_path))
+    for key in ("svc/items/1", "svc/items/1?page=2", "svc/items/10", "svc/other"):
+        await cache.fetch(key, {}, upstream.fetch)
+
+    # Memory and disk copies of both matching keys
+    assert cache.invalidate("svc/items/1") == 4
+    assert await cache.get("svc/items/1?page=2") is None
+    assert await cache.get("svc/items/10") is not None
+    assert await cache.get("svc/other") is not None
+
+
+@pytest.mark.parametrize("directory", [False, True])
+async def test_response_in_flight_during_invalidate_is_not_stored(clock, tmp_path, directory):
+    upstream = Upstream(response(cache_control="max-age=60"), delay=0.05)
+    cache = ResponseCache(directory=str(tmp_path) if directory else None)
+
+    leader = asyncio.create_task(cache.fetch("svc/items", {}, upstream.fetch))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(cache.fetch("svc/items", {}, upstream.fetch))
+    await asyncio.sleep(0.01)
+    cache.invalidate("svc/items")
+
+    # The leader's caller still gets its response
+    entry, status = await leader
+    assert (entry.body, status) == (b"payload", "MISS")
+    # The waiter does not share the pre-invalidation response
+    result, status = await waiter
+    assert status == "BYPASS"
+    await result.aclose()
+
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["disk_entries"] == 0
+    assert list(tmp_path.iterdir()) == []
+    assert (await cache.fetch("svc/items", {}, upstream.fetch))[1] == "MISS"
+
+
+async def test_disk_tier_survives_a_restart(clock, tmp_path):
+    upstream = Upstream(response(cache_control="max-age=60", etag='"v1"'))
+    await ResponseCache(directory=str(tmp_path)).fetch("svc/items", {}, upstream.fetch)
+
+    restarted = ResponseCache(directory=str(tmp_path))
+    restarted.load_disk_index()
+    entry, status = await restarted.fetch("svc/items", {}, upstream.fetch)
+    assert status == "HIT"
+    assert entry.body == b"payload"
+    assert entry.etag == '"v1"'
+    assert len(upstream.requests) == 1
+
+
+async def test_invalidate_while_writing_to_disk_removes_the_file(clock, tmp_path):
+    upstream = Upstream(response(cache_control="max-age=60"))
+    cache = ResponseCache(directory=str(tmp_path))
+    write = cache._write_disk
+    writing = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def slow_write(filename, data):
+        write(filename, data)
+        loop.call_soon_threadsafe(writing.set)
+        time.sleep(0.05)
+
+    cache._write_disk = slow_write
+    fetch = asyncio.create_task(cache.fetch("svc/items", {}, upstream.fetch))
+    await writing.wait()
+    cache.invalidate("svc/items")
+    await fetch
+
+    assert cache.stats()["disk_entries"] == 0
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,50 @@
+"""Unit tests for pooled stdio MCP server processes."""
+
+import json
+import sys
+
+import pytest
+
+from stdio_pool import METHOD_NOT_FOUND, StdioMCPProcess
+
+# Before answering a tools/call, sends its own requests using the same id,
+# then echoes our replies to them back as the call's result
+SERVER = r"""
+import json, sys
+
+def send(message):
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+for line in sys.stdin:
+    message = json.loads(line)
+    if message.get("method") == "initialize":
+        send({"jsonrpc": "2.0", "id": message["id"], "result": {"capabilities": {}}})
+    elif message.get("method") == "tools/call":
+        send({"jsonrpc": "2.0", "method": "notifications/message", "params": {"level": "info"}})
+        replies = []
+        for method in ("sampling/createMessage", "ping"):
+            send({"jsonrpc": "2.0", "id": message["id"], "method": method, "params": {}})
+            replies.append(json.loads(sys.stdin.readline()))
+        send({"jsonrpc": "2.0", "id": message["id"], "result": {"replies": replies}})
+"""
+
+
+@pytest.fixture
+async def process(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    process = StdioMCPProcess("test", [sys.executable, str(script)], max_concurrency=4)
+    await process.start(timeout=10)
+    yield process
+    await process.stop()
+
+
+async def test_server_requests_with_our_id_are_not_taken_as_responses(process):
+    result = await process.request("tools/call", {"name": "echo"}, timeout=10)
+
+    sampling, ping = result["replies"]
+    assert sampling["id"] == ping["id"]
+    assert sampling["error"]["code"] == METHOD_NOT_FOUND
+    assert ping["result"] == {}
+    assert process.ready